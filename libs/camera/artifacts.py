@@ -0,0 +1,174 @@
+import abc
+import contextlib
+import io
+import os
+import threading
+import typing
+
+import cv2
+import numpy as np
+
+from ..casual_utils.parallel_computing import synchronized_method
+from ..image_processing.annotations import FrameAnnotation
+from .clips import ClipWriter
+
+
+__all__ = (
+    'BaseMediaArtifact',
+    'EncodedClip',
+    'EncodedImage',
+)
+
+
+class BaseMediaArtifact(abc.ABC):
+    """
+    Media that is encoded once and shared by several sinks (a messenger, a file storage, etc.).
+
+    It's encoded by the first sink that opens it and released when all `sinks_count` sinks are done.
+    A sink can open it several times, e.g. on retries, and must call `release` exactly once, when it's done for good.
+    Artifacts that aren't released, e.g. because their tasks are dropped on shutdown, are freed by `free_all`.
+    """
+
+    extension: str
+    _references: int
+    _lock: threading.RLock
+    _unreleased: typing.ClassVar[set['BaseMediaArtifact']] = set()
+    _unreleased_lock: typing.ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, *, sinks_count: int) -> None:
+        assert sinks_count > 0
+
+        self._references = sinks_count
+        self._lock = threading.RLock()
+
+        with self._unreleased_lock:
+            self._unreleased.add(self)
+
+    @property
+    @synchronized_method
+    def references(self) -> int:
+        return self._references
+
+    @contextlib.contextmanager
+    def open(self) -> typing.Iterator[typing.BinaryIO]:
+        with self._lock:
+            if self._references <= 0:
+                raise RuntimeError(f'{self} is already released.')
+
+            file = self._open()
+
+        with file:
+            yield file
+
+    @synchronized_method
+    def release(self) -> None:
+        if self._references <= 0:
+            raise RuntimeError(f'{self} is already released.')
+
+        self._references -= 1
+
+        if self._references == 0:
+            self._free_and_forget()
+
+    @classmethod
+    def free_all(cls) -> None:
+        """
+        Free artifacts that aren't released yet, e.g. temporary clips of dropped tasks on shutdown.
+        """
+
+        with cls._unreleased_lock:
+            artifacts = tuple(cls._unreleased)
+
+        for artifact in artifacts:
+            artifact.free()
+
+    @synchronized_method
+    def free(self) -> None:
+        """
+        Free it right away, even if not all sinks are done.
+        """
+
+        if self._references > 0:
+            self._references = 0
+            self._free_and_forget()
+
+    def _free_and_forget(self) -> None:
+        self._free()
+
+        with self._unreleased_lock:
+            self._unreleased.discard(self)
+
+    @abc.abstractmethod
+    def _open(self) -> typing.BinaryIO:
+        pass
+
+    @abc.abstractmethod
+    def _free(self) -> None:
+        pass
+
+
+class EncodedImage(BaseMediaArtifact):
+    extension = '.jpg'
+    _frame: np.ndarray | None
+    _annotation: FrameAnnotation | None
+    _content: bytes | None = None
+
+    def __init__(self, frame: np.ndarray, *, sinks_count: int, annotation: FrameAnnotation | None = None) -> None:
+        super().__init__(sinks_count=sinks_count)
+
+        self._frame = frame
+        self._annotation = annotation
+
+    def _open(self) -> typing.BinaryIO:
+        if self._content is None:
+            assert self._frame is not None
+
+            frame = self._frame if self._annotation is None else self._annotation.render(self._frame)
+            is_success, buffer = cv2.imencode(self.extension, frame)
+
+            if not is_success:
+                raise ValueError('Cannot encode the frame.')
+
+            self._content = buffer.tobytes()
+            self._frame = None
+
+        return io.BytesIO(self._content)
+
+    def _free(self) -> None:
+        self._frame = None
+        self._content = None
+
+
+class EncodedClip(BaseMediaArtifact):
+    """
+    The clip is finished by the first sink, so the producer isn't blocked by encoding.
+    """
+
+    extension = '.avi'
+    _clip_writer: ClipWriter
+    _path: str | None = None
+    _is_finished: bool = False
+
+    def __init__(self, clip_writer: ClipWriter, *, sinks_count: int) -> None:
+        super().__init__(sinks_count=sinks_count)
+
+        self._clip_writer = clip_writer
+
+    def _open(self) -> typing.BinaryIO:
+        if not self._is_finished:
+            self._is_finished = True
+            self._path = self._clip_writer.finish()
+
+        if self._path is None:
+            raise ValueError('The clip is empty.')
+
+        return open(self._path, 'rb')
+
+    def _free(self) -> None:
+        if not self._is_finished:
+            self._is_finished = True
+            self._path = self._clip_writer.finish()
+
+        if self._path is not None:
+            os.remove(self._path)
+            self._path = None
@@ -1,29 +1,62 @@
 import threading
 import typing
 
-from imutils.video import VideoStream
-
 from libs.camera.fps import FPSTracker
+from libs.camera.queues import DropOldestQueue
+from libs.camera.sources import BaseFrameSource
 
 
 class VideoCamera:
+    """
+    Capturing and processing of frames run in separate threads connected by a drop-oldest queue,
+    so slow processing lowers the processing rate instead of stalling capturing.
+    `max_fps` can be changed while the camera is running.
+
+    The camera doesn't split processing into more stages on purpose: the heavy stages already leave
+    the processing thread without the camera knowing about them. Motion detection can run in another process
+    (`ProcessMotionDetector`), clips and JPEG frames are encoded by threads of `ClipWriter` and `JPEGFrameBuffer`,
+    and frames are annotated only when they are sent or saved. What is left in the callback is cheap,
+    so one more queue per stage would add copies of frames and latency, not throughput.
+    """
+
     _is_run: threading.Event
-    _worker: threading.Thread | None = None
-    _video_stream: VideoStream
+    _capturing_worker: threading.Thread | None = None
+    _processing_worker: threading.Thread | None = None
+    _frame_source: BaseFrameSource
     _callback: typing.Callable
     _fps_tracker: FPSTracker
-
-    def __init__(self, *, video_stream: VideoStream, callback: typing.Callable, max_fps: int) -> None:
+    _processing_fps_tracker: FPSTracker
+    _frames: DropOldestQueue
+    max_fps: float
+
+    def __init__(
+        self,
+        *,
+        frame_source: BaseFrameSource,
+        callback: typing.Callable,
+        max_fps: float,
+        queue_size: int = 1,
+    ) -> None:
         self._fps_tracker = FPSTracker()
-        self._video_stream = video_stream
+        self._processing_fps_tracker = FPSTracker()
+        self._frame_source = frame_source
         self._callback = callback
         self._is_run = threading.Event()
-        self._max_fps = max_fps
+        self.max_fps = max_fps
+        self._frames = DropOldestQueue(maxsize=queue_size)
 
     @property
     def fps(self) -> float:
         return self._fps_tracker.fps()
 
+    @property
+    def processing_fps(self) -> float:
+        return self._processing_fps_tracker.fps()
+
+    @property
+    def dropped_frames_count(self) -> int:
+        return self._frames.dropped_count
+
     @property
     def is_run(self) -> bool:
         return self._is_run.is_set()
@@ -31,9 +64,12 @@ class VideoCamera:
     def start(self) -> None:
         self.stop()
         self._is_run.set()
+        self._frames.clear()
 
-        self._worker = threading.Thread(target=self._process_stream)
-        self._worker.start()
+        self._capturing_worker = threading.Thread(target=self._capture_frames)
+        self._processing_worker = threading.Thread(target=self._process_frames)
+        self._capturing_worker.start()
+        self._processing_worker.start()
 
     def stop(self) -> None:
         if not self._is_run.is_set():
@@ -41,19 +77,31 @@ class VideoCamera:
 
         self._is_run.clear()
 
-        if self._worker is not None:
-            self._worker.join()
+        for worker in (self._capturing_worker, self._processing_worker):
+            if worker is not None and worker is not threading.current_thread():
+                worker.join()
 
-    def _process_stream(self) -> None:
+    def _capture_frames(self) -> None:
         self._fps_tracker.start()
 
         while self._is_run.is_set():
-            frame = self._video_stream.read()
+            frame = self._frame_source.read()
 
             if frame is None:
                 self._is_run.clear()
                 break
 
-            self._callback(frame=frame, fps=self._fps_tracker.fps())
+            self._frames.put(frame)
+            self._fps_tracker.update(fps=self.max_fps)
+
+    def _process_frames(self) -> None:
+        self._processing_fps_tracker.start()
+
+        while self._is_run.is_set():
+            frame = self._frames.get(timeout=0.5)
+
+            if frame is None:
+                continue
 
-            self._fps_tracker.update(fps=self._max_fps)
+            self._callback(frame=frame, fps=self._processing_fps_tracker.fps())
+            self._processing_fps_tracker.update()
@@ -0,0 +1,461 @@
+import abc
+import collections
+import itertools
+import logging
+import threading
+import typing
+
+import cv2
+import numpy as np
+
+from ..casual_utils.parallel_computing import synchronized_method
+from ..image_processing.annotations import AnnotatedFrames, FrameAnnotation
+
+
+__all__ = (
+    'AnnotatedFrameBuffer',
+    'BaseFrameBuffer',
+    'EncodedFrames',
+    'FrameRingBuffer',
+    'JPEGFrameBuffer',
+    'create_frame_buffer',
+)
+
+
+class BaseFrameBuffer(abc.ABC):
+    """
+    Bounded history of frames addressed by absolute indices (the number of frames appended before).
+    """
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def total_count(self) -> int:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def first_index(self) -> int:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def capacity(self) -> int:
+        """
+        Count of frames that can be kept, it can be an estimation.
+        """
+
+    @abc.abstractmethod
+    def append(self, frame: np.ndarray) -> int:
+        pass
+
+    @abc.abstractmethod
+    def get_range(self, start: int, end: int | None = None, *, copy: bool = False) -> typing.Sequence[np.ndarray]:
+        """
+        With `copy` the frames don't change when new frames are appended, e.g. if they are read by another thread.
+        """
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FrameRingBuffer(BaseFrameBuffer):
+    """
+    Fixed-size history of frames in one array.
+
+    Frames are addressed by absolute indices (the number of frames appended before),
+    so the history can be referenced without copying it.
+    The size is limited by `max_bytes` or by `capacity`, the array grows up to it while frames come,
+    so memory isn't taken by history that isn't filled yet.
+    """
+
+    max_bytes: int | None
+    _capacity: int
+    _frames: np.ndarray | None = None
+    _total_count: int
+    _first_valid_index: int
+    # Index of the frame in the first slot, frames fill slots in order from it.
+    _first_slot_index: int = 0
+    _min_allocated_count: int = 16
+    _lock: threading.RLock
+
+    def __init__(self, *, max_bytes: int | None = None, capacity: int | None = None) -> None:
+        assert max_bytes is not None or capacity is not None
+
+        self.max_bytes = max_bytes
+        self._capacity = 0 if capacity is None else capacity
+        self._total_count = 0
+        self._first_valid_index = 0
+        self._lock = threading.RLock()
+
+    @synchronized_method
+    def __len__(self) -> int:
+        return min(self._total_count - self._first_valid_index, self._capacity)
+
+    @property
+    @synchronized_method
+    def total_count(self) -> int:
+        return self._total_count
+
+    @property
+    @synchronized_method
+    def first_index(self) -> int:
+        return self._total_count - len(self)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @synchronized_method
+    def append(self, frame: np.ndarray) -> int:
+        if self._frames is None or self._frames.shape[1:] != frame.shape or self._frames.dtype != frame.dtype:
+            self._allocate(frame)
+
+        assert self._frames is not None
+
+        index = self._total_count
+        slot = self._get_slot(index)
+
+        if slot >= len(self._frames):
+            self._grow()
+
+        self._frames[slot] = frame
+        self._total_count += 1
+
+        return index
+
+    @synchronized_method
+    def get(self, index: int) -> np.ndarray:
+        """
+        Return a view, it's valid until the slot is overwritten.
+        """
+
+        if not self.first_index <= index < self._total_count:
+            raise IndexError(f'Frame #{index} is not in the buffer.')
+
+        assert self._frames is not None
+
+        return self._frames[self._get_slot(index)]
+
+    @synchronized_method
+    def get_range(self, start: int, end: int | None = None, *, copy: bool = False) -> list[np.ndarray]:
+        """
+        Return views of frames with indices from `start` to `end` (exclusive) that are still in the buffer.
+        Like `get`, a view is valid until its slot is overwritten, i.e. for `capacity - len(self)` more frames,
+        so frames that are read later by another thread must be copied.
+        """
+
+        start = max(start, self.first_index)
+        end = self._total_count if end is None else min(end, self._total_count)
+
+        if self._frames is None or start >= end:
+            return []
+
+        frames = [self._frames[self._get_slot(index)] for index in range(start, end)]
+
+        return [frame.copy() for frame in frames] if copy else frames
+
+    @synchronized_method
+    def clear(self) -> None:
+        # Indices are not reset, so references to old frames just become missing.
+        self._first_valid_index = self._total_count
+
+    def _get_slot(self, index: int) -> int:
+        return (index - self._first_slot_index) % self._capacity
+
+    def _allocate(self, frame: np.ndarray) -> None:
+        if self.max_bytes is not None:
+            self._capacity = max(1, self.max_bytes // frame.nbytes)
+
+        self._frames = np.empty((min(self._capacity, self._min_allocated_count), *frame.shape), dtype=frame.dtype)
+        self._first_valid_index = self._total_count
+        self._first_slot_index = self._total_count
+
+    def _grow(self) -> None:
+        assert self._frames is not None
+
+        # Slots are filled in order until the capacity is reached, so the filled ones are at the start.
+        count = min(self._capacity, len(self._frames) * 2)
+        frames = np.empty((count, *self._frames.shape[1:]), dtype=self._frames.dtype)
+        frames[: len(self._frames)] = self._frames
+        self._frames = frames
+
+
+class EncodedFrames(typing.Sequence[np.ndarray]):
+    """
+    JPEG-encoded frames that are decoded only on access.
+    """
+
+    _items: list[bytes]
+
+    def __init__(self, items: typing.Iterable[bytes]) -> None:
+        self._items = list(items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @typing.overload
+    def __getitem__(self, index: int) -> np.ndarray: ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> 'EncodedFrames': ...
+
+    def __getitem__(self, index: int | slice) -> 'np.ndarray | EncodedFrames':
+        if isinstance(index, slice):
+            return EncodedFrames(self._items[index])
+
+        return cv2.imdecode(np.frombuffer(self._items[index], dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(item) for item in self._items)
+
+
+class JPEGFrameBuffer(BaseFrameBuffer):
+    """
+    History of JPEG-encoded frames, its size is limited by `max_bytes` of encoded data.
+
+    Frames are encoded on a background thread, so `append` is cheap for the caller.
+    The caller must not change a frame after appending it.
+    If the encoder falls behind by `max_pending` frames, `append` waits for it.
+    """
+
+    max_bytes: int
+    quality: int
+    max_pending: int
+    _encoded: collections.deque[bytes]
+    _encoded_bytes: int
+    _first_encoded_index: int
+    _pending: collections.deque[np.ndarray]
+    _total_count: int
+    _is_closed: bool
+    _worker: threading.Thread | None = None
+    _lock: threading.RLock
+    _condition: threading.Condition
+
+    def __init__(self, *, max_bytes: int, quality: int = 80, max_pending: int = 32) -> None:
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.max_pending = max_pending
+        self._encoded = collections.deque()
+        self._encoded_bytes = 0
+        self._first_encoded_index = 0
+        self._pending = collections.deque()
+        self._total_count = 0
+        self._is_closed = False
+        self._lock = threading.RLock()
+        self._condition = threading.Condition(self._lock)
+
+    @synchronized_method
+    def __len__(self) -> int:
+        return self._total_count - self._first_encoded_index
+
+    @property
+    @synchronized_method
+    def total_count(self) -> int:
+        return self._total_count
+
+    @property
+    @synchronized_method
+    def first_index(self) -> int:
+        return self._first_encoded_index
+
+    @property
+    @synchronized_method
+    def capacity(self) -> int:
+        if not self._encoded:
+            return self._total_count + self.max_pending + 1
+
+        return len(self._encoded) * self.max_bytes // max(self._encoded_bytes, 1)
+
+    @property
+    @synchronized_method
+    def nbytes(self) -> int:
+        return self._encoded_bytes
+
+    def append(self, frame: np.ndarray) -> int:
+        with self._lock:
+            if self._is_closed:
+                raise RuntimeError('The buffer is closed.')
+
+            self._start_worker()
+
+            # Back pressure, memory for raw frames is bounded too.
+            while len(self._pending) >= self.max_pending:
+                self._condition.wait()
+
+            index = self._total_count
+            self._total_count += 1
+            self._pending.append(frame)
+            self._condition.notify_all()
+
+            return index
+
+    def get_range(self, start: int, end: int | None = None, *, copy: bool = False) -> EncodedFrames:
+        """
+        Wait until the requested frames are encoded and return them without decoding.
+        Encoded frames are never changed, so they are not copied.
+        """
+
+        with self._lock:
+            end = self._total_count if end is None else min(end, self._total_count)
+
+            while self._first_encoded_index + len(self._encoded) < end:
+                self._condition.wait()
+
+            start = max(start, self._first_encoded_index) - self._first_encoded_index
+            end = min(end - self._first_encoded_index, len(self._encoded))
+
+            if start >= end:
+                return EncodedFrames(())
+
+            return EncodedFrames(itertools.islice(self._encoded, start, end))
+
+    @synchronized_method
+    def clear(self) -> None:
+        while self._pending:
+            self._condition.wait()
+
+        self._encoded.clear()
+        self._encoded_bytes = 0
+        self._first_encoded_index = self._total_count
+
+    def close(self) -> None:
+        with self._lock:
+            self._is_closed = True
+            self._condition.notify_all()
+            worker = self._worker
+
+        if worker is not None:
+            worker.join()
+
+    def _start_worker(self) -> None:
+        if self._worker is not None:
+            return
+
+        # Frames are encoded only by this thread, so they are stored in order.
+        self._worker = threading.Thread(target=self._encode_pending_frames, name='JPEGFrameBuffer', daemon=True)
+        self._worker.start()
+
+    def _encode_pending_frames(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._is_closed:
+                    self._condition.wait()
+
+                if not self._pending:
+                    return
+
+                frame = self._pending[0]
+
+            try:
+                encoded_frame = self._encode(frame)
+            except Exception as e:
+                logging.exception(e)
+                encoded_frame = None
+
+            with self._lock:
+                self._pending.popleft()
+
+                if encoded_frame is None:
+                    # Frames must be contiguous, so the history before the broken frame is dropped.
+                    self._first_encoded_index += len(self._encoded) + 1
+                    self._encoded.clear()
+                    self._encoded_bytes = 0
+                else:
+                    self._store(encoded_frame)
+
+                self._condition.notify_all()
+
+    def _encode(self, frame: np.ndarray) -> bytes:
+        is_success, buffer = cv2.imencode('.jpg', frame, (cv2.IMWRITE_JPEG_QUALITY, self.quality))
+
+        if not is_success:
+            raise ValueError('Cannot encode the frame.')
+
+        return buffer.tobytes()
+
+    def _store(self, encoded_frame: bytes) -> None:
+        self._encoded.append(encoded_frame)
+        self._encoded_bytes += len(encoded_frame)
+
+        while self._encoded_bytes > self.max_bytes and len(self._encoded) > 1:
+            self._encoded_bytes -= len(self._encoded.popleft())
+            self._first_encoded_index += 1
+
+
+class AnnotatedFrameBuffer:
+    """
+    Keeps raw frames in `buffer` and their annotations by the same indices,
+    frames are rendered only when they are read.
+    """
+
+    buffer: BaseFrameBuffer
+    _annotations: dict[int, FrameAnnotation | None]
+    _first_annotation_index: int
+    _lock: threading.RLock
+
+    def __init__(self, buffer: BaseFrameBuffer) -> None:
+        self.buffer = buffer
+        self._annotations = {}
+        self._first_annotation_index = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    @property
+    def total_count(self) -> int:
+        return self.buffer.total_count
+
+    @property
+    def first_index(self) -> int:
+        return self.buffer.first_index
+
+    @synchronized_method
+    def append(self, frame: np.ndarray, annotation: FrameAnnotation | None = None) -> int:
+        index = self.buffer.append(frame)
+        self._annotations[index] = annotation
+        first_index = self.buffer.first_index
+
+        while self._first_annotation_index < first_index:
+            self._annotations.pop(self._first_annotation_index, None)
+            self._first_annotation_index += 1
+
+        return index
+
+    @synchronized_method
+    def get_range(self, start: int, end: int | None = None, *, copy: bool = False) -> AnnotatedFrames:
+        end = self.buffer.total_count if end is None else min(end, self.buffer.total_count)
+        frames = self.buffer.get_range(start, end, copy=copy)
+        # Frames can be evicted from the start only, so they always finish at `end`.
+        annotations = tuple(self._annotations.get(index) for index in range(end - len(frames), end))
+
+        return AnnotatedFrames(frames, annotations)
+
+    @synchronized_method
+    def clear(self) -> None:
+        self.buffer.clear()
+        self._annotations.clear()
+        self._first_annotation_index = self.buffer.first_index
+
+    def close(self) -> None:
+        self.buffer.close()
+
+
+def create_frame_buffer(*, max_bytes: int, jpeg_quality: int | None = None) -> BaseFrameBuffer:
+    """
+    Return a buffer of raw frames or of JPEG-encoded frames if `jpeg_quality` is set.
+    """
+
+    if jpeg_quality is None:
+        return FrameRingBuffer(max_bytes=max_bytes)
+
+    return JPEGFrameBuffer(max_bytes=max_bytes, quality=jpeg_quality)
@@ -0,0 +1,121 @@
+import logging
+import os
+import queue
+import tempfile
+import threading
+import typing
+
+import cv2
+import numpy as np
+
+from ..image_processing.annotations import AnnotatedFrames, FrameAnnotation
+
+
+__all__ = (
+    'ClipWriter',
+    'write_clip',
+)
+
+
+class ClipWriter:
+    """
+    Encodes frames into a video file while they come, on a background thread,
+    so the clip is ready right after the last frame.
+
+    The caller owns the file returned by `finish` and removes it.
+    """
+
+    fps: float
+    frames_count: int
+    path: str
+    _queue: queue.Queue
+    _worker: threading.Thread
+    _video_writer: cv2.VideoWriter | None = None
+    _frame_size: tuple[int, int] | None = None
+    _is_failed: bool = False
+    _fourcc: str
+
+    def __init__(self, *, fps: float, max_pending: int = 64, suffix: str = '.avi', fourcc: str = 'DIVX') -> None:
+        self.fps = fps
+        self.frames_count = 0
+        self._fourcc = fourcc
+        self._queue = queue.Queue(maxsize=max_pending)
+
+        file_descriptor, self.path = tempfile.mkstemp(suffix=suffix)
+        os.close(file_descriptor)
+
+        self._worker = threading.Thread(target=self._write_frames, name='ClipWriter', daemon=True)
+        self._worker.start()
+
+    def write(self, frame: np.ndarray, annotation: FrameAnnotation | None = None) -> None:
+        """
+        The frame must not be changed after writing, it's rendered and encoded later.
+        """
+
+        self.write_many(AnnotatedFrames((frame,), (annotation,)))
+
+    def write_many(self, frames: typing.Sequence[np.ndarray]) -> None:
+        """
+        Frames are read on the background thread, so lazy sequences are decoded and rendered there.
+        """
+
+        self.frames_count += len(frames)
+        self._queue.put(frames)
+
+    def finish(self) -> str | None:
+        """
+        Wait for the encoding and return the path to the clip or `None` if there is nothing to send.
+        """
+
+        self._queue.put(None)
+        self._worker.join()
+
+        if self._video_writer is not None:
+            self._video_writer.release()
+
+        if self._video_writer is None or self._is_failed:
+            os.remove(self.path)
+            return None
+
+        return self.path
+
+    def _write_frames(self) -> None:
+        while True:
+            frames = self._queue.get()
+
+            if frames is None:
+                return
+
+            if self._is_failed:
+                continue
+
+            try:
+                for frame in frames:
+                    self._write_frame(frame)
+            except Exception as e:
+                logging.exception(e)
+                self._is_failed = True
+
+    def _write_frame(self, frame: np.ndarray) -> None:
+        height, width = frame.shape[:2]
+
+        if self._video_writer is None:
+            self._frame_size = (width, height)
+            self._video_writer = cv2.VideoWriter(
+                filename=self.path,
+                fourcc=cv2.VideoWriter_fourcc(*self._fourcc),
+                fps=self.fps,
+                frameSize=self._frame_size,
+            )
+
+        if (width, height) != self._frame_size:
+            frame = cv2.resize(frame, self._frame_size)
+
+        self._video_writer.write(frame)
+
+
+def write_clip(frames: typing.Sequence[np.ndarray], *, fps: float) -> str | None:
+    clip_writer = ClipWriter(fps=fps)
+    clip_writer.write_many(frames)
+
+    return clip_writer.finish()
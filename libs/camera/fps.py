@@ -25,7 +25,7 @@ class FPSTracker:
 
         self._finished_at = datetime.datetime.now()
 
-    def update(self, fps: int | None = None) -> None:
+    def update(self, fps: float | None = None) -> None:
         """
         Increment the total number of frames examined during the
         start and end intervals.
@@ -68,7 +68,6 @@ class FPSTracker:
         end interval.
         """
 
-        assert self._finished_at is not None
         assert self._started_at is not None
 
         finished_at = self._finished_at or datetime.datetime.now()
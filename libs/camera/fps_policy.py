@@ -0,0 +1,120 @@
+import dataclasses
+import datetime
+import threading
+
+from ..casual_utils.parallel_computing import synchronized_method
+
+
+__all__ = (
+    'AdaptiveFPSPolicy',
+    'FPSInfo',
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class FPSInfo:
+    current: float
+    target: float
+
+
+class AdaptiveFPSPolicy:
+    """
+    Chooses the target frame rate of a camera.
+
+    It's `idle_fps` when nothing is moving and `max_fps` during motion and `motion_hold` after it.
+    When the system is overloaded (CPU is hot or tasks are delayed), the rate is halved on every update
+    down to `min_fps`, and it's restored step by step when the load goes down.
+    """
+
+    max_fps: float
+    idle_fps: float
+    min_fps: float
+    motion_hold: datetime.timedelta
+    max_cpu_temperature: float | None
+    max_task_queue_delay: datetime.timedelta | None
+    recovery_step: float = 0.25
+    _backoff_factor: float
+    _last_motion_at: datetime.datetime | None = None
+    _is_active: bool = False
+    _lock: threading.RLock
+
+    def __init__(
+        self,
+        *,
+        max_fps: float,
+        idle_fps: float,
+        min_fps: float = 1,
+        motion_hold: datetime.timedelta = datetime.timedelta(seconds=10),
+        max_cpu_temperature: float | None = None,
+        max_task_queue_delay: datetime.timedelta | None = None,
+    ) -> None:
+        assert 0 < min_fps <= idle_fps <= max_fps
+
+        self.max_fps = max_fps
+        self.idle_fps = idle_fps
+        self.min_fps = min_fps
+        self.motion_hold = motion_hold
+        self.max_cpu_temperature = max_cpu_temperature
+        self.max_task_queue_delay = max_task_queue_delay
+        self._backoff_factor = 1
+        self._lock = threading.RLock()
+
+    @property
+    @synchronized_method
+    def target_fps(self) -> float:
+        if self._is_active or self._has_recent_motion():
+            fps = self.max_fps
+        else:
+            fps = self.idle_fps
+
+        return max(self.min_fps, fps * self._backoff_factor)
+
+    @synchronized_method
+    def on_motion(self) -> None:
+        self._last_motion_at = datetime.datetime.now()
+
+    @synchronized_method
+    def update(
+        self,
+        *,
+        is_active: bool = False,
+        cpu_temperature: float | None = None,
+        task_queue_delay: datetime.timedelta | None = None,
+    ) -> float:
+        """
+        `is_active` keeps the full rate without motion (e.g. during recording).
+        """
+
+        self._is_active = is_active
+
+        if self._is_overloaded(cpu_temperature=cpu_temperature, task_queue_delay=task_queue_delay):
+            self._backoff_factor = max(self._backoff_factor / 2, self.min_fps / self.max_fps)
+        else:
+            self._backoff_factor = min(1, self._backoff_factor + self.recovery_step)
+
+        return self.target_fps
+
+    def _has_recent_motion(self) -> bool:
+        return (
+            self._last_motion_at is not None
+            and datetime.datetime.now() - self._last_motion_at <= self.motion_hold
+        )
+
+    def _is_overloaded(
+        self,
+        *,
+        cpu_temperature: float | None,
+        task_queue_delay: datetime.timedelta | None,
+    ) -> bool:
+        if (
+            cpu_temperature is not None
+            and self.max_cpu_temperature is not None
+            and cpu_temperature >= self.max_cpu_temperature
+        ):
+            return True
+
+        return (
+            task_queue_delay is not None
+            and self.max_task_queue_delay is not None
+            and task_queue_delay >= self.max_task_queue_delay
+        )
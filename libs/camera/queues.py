@@ -0,0 +1,70 @@
+import collections
+import threading
+import typing
+
+from ..casual_utils.parallel_computing import synchronized_method
+
+
+__all__ = ('DropOldestQueue',)
+
+
+class DropOldestQueue:
+    """
+    Bounded queue between pipeline stages.
+    A producer is never blocked: when the queue is full, the oldest item is dropped,
+    so a slow consumer gets fresh items at a lower rate.
+    """
+
+    maxsize: int
+    dropped_count: int
+    _items: collections.deque
+    _lock: threading.Lock
+    _not_empty: threading.Condition
+
+    def __init__(self, *, maxsize: int = 1) -> None:
+        assert maxsize > 0
+
+        self.maxsize = maxsize
+        self.dropped_count = 0
+        self._items = collections.deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+
+    @synchronized_method
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: typing.Any) -> bool:
+        """
+        Return `True` if the oldest item was dropped.
+        """
+
+        with self._lock:
+            is_dropped = len(self._items) >= self.maxsize
+
+            if is_dropped:
+                self._items.popleft()
+                self.dropped_count += 1
+
+            self._items.append(item)
+            self._not_empty.notify()
+
+        return is_dropped
+
+    def get(self, *, timeout: float | None = None) -> typing.Any:
+        """
+        Return `None` if there is no item after `timeout`.
+        """
+
+        with self._lock:
+            if not self._items:
+                self._not_empty.wait(timeout)
+
+            if not self._items:
+                return None
+
+            return self._items.popleft()
+
+    @synchronized_method
+    def clear(self) -> None:
+        self._items.clear()
@@ -0,0 +1,101 @@
+import dataclasses
+import threading
+import time
+
+from ..casual_utils.parallel_computing import synchronized_method
+
+
+__all__ = ('DetectionScheduler',)
+
+
+@dataclasses.dataclass
+class _CameraTurn:
+    last_granted_turn: int = -1
+    waiting_since: float | None = None
+
+
+class DetectionScheduler:
+    """
+    Shares a CPU budget for motion detection between cameras.
+
+    `cpu_budget` is seconds of detection per second for all cameras together (e.g. `1.5` is one and a half cores),
+    it isn't limited if it's `None`. The budget is refilled continuously, so frames that come when it's spent
+    are not detected. When the budget is scarce, cameras get turns in round-robin order,
+    and a camera that doesn't ask for a turn doesn't take a share from others.
+    """
+
+    cpu_budget: float | None
+    max_burst: float
+    waiting_timeout: float
+    _cameras: dict[str, _CameraTurn]
+    _tokens: float
+    _turn: int
+    _refilled_at: float
+    _lock: threading.RLock
+
+    def __init__(self, *, cpu_budget: float | None, max_burst: float = 1, waiting_timeout: float = 1) -> None:
+        assert cpu_budget is None or cpu_budget > 0
+
+        self.cpu_budget = cpu_budget
+        self.max_burst = max_burst
+        self.waiting_timeout = waiting_timeout
+        self._cameras = {}
+        self._tokens = max_burst
+        self._turn = 0
+        self._refilled_at = time.monotonic()
+        self._lock = threading.RLock()
+
+    @synchronized_method
+    def remove(self, name: str) -> None:
+        self._cameras.pop(name, None)
+
+    @synchronized_method
+    def acquire(self, name: str) -> bool:
+        """
+        Return `True` if the camera can detect motion in the current frame.
+        The time of the detection is reported by `report` after it.
+        """
+
+        if self.cpu_budget is None:
+            return True
+
+        now = time.monotonic()
+        self._refill(now)
+        camera = self._cameras.setdefault(name, _CameraTurn())
+
+        if self._tokens <= 0 or self._has_earlier_turn(camera, now=now):
+            if camera.waiting_since is None:
+                camera.waiting_since = now
+
+            return False
+
+        camera.waiting_since = None
+        camera.last_granted_turn = self._turn
+        self._turn += 1
+
+        return True
+
+    @synchronized_method
+    def report(self, elapsed: float) -> None:
+        if self.cpu_budget is None:
+            return
+
+        self._refill(time.monotonic())
+        # The budget can go into debt, so a long detection delays next ones.
+        self._tokens -= elapsed
+
+    def _refill(self, now: float) -> None:
+        assert self.cpu_budget is not None
+
+        self._tokens = min(self.max_burst, self._tokens + (now - self._refilled_at) * self.cpu_budget)
+        self._refilled_at = now
+
+    def _has_earlier_turn(self, camera: _CameraTurn, *, now: float) -> bool:
+        # Cameras that stopped sending frames don't hold the turn.
+        return any(
+            other.waiting_since is not None
+            and now - other.waiting_since <= self.waiting_timeout
+            and other.last_granted_turn < camera.last_granted_turn
+            for other in self._cameras.values()
+            if other is not camera
+        )
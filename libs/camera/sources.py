@@ -0,0 +1,420 @@
+import abc
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from ..casual_utils.parallel_computing import synchronized_method
+from ..image_processing.synthetic import SyntheticScene
+
+
+__all__ = (
+    'BaseFrameSource',
+    'BasePlaybackFrameSource',
+    'ImageDirFrameSource',
+    'SyntheticFrameSource',
+    'VideoFileFrameSource',
+    'WebcamFrameSource',
+    'create_frame_source',
+    'frame_source_is_available',
+)
+
+SYNTHETIC_SOURCE = 'synthetic'
+IMAGE_EXTENSIONS = ('.bmp', '.jpeg', '.jpg', '.png')
+
+
+class BaseFrameSource(abc.ABC):
+    """
+    Frames for `VideoCamera`. `read` returns the next frame or `None` if the source is finished or broken.
+    """
+
+    @abc.abstractmethod
+    def start(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def read(self) -> np.ndarray | None:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def last_frame(self) -> np.ndarray | None:
+        """
+        The latest frame without waiting for a new one, it's `None` if the source is finished or broken.
+        """
+
+    @abc.abstractmethod
+    def stop(self) -> None:
+        pass
+
+    def capture_snapshot(self) -> np.ndarray | None:
+        """
+        A frame in the best quality the source has, it's the latest frame by default.
+        """
+
+        return self.last_frame
+
+
+class WebcamFrameSource(BaseFrameSource):
+    """
+    A USB camera or a stream URL. Frames are grabbed by a background thread, so `read` returns the latest one.
+
+    With `snapshot_resolution` the camera is switched to it for a moment to capture a snapshot,
+    so the stream stays cheap and only snapshots have the high resolution.
+    Frames of another size than the first one, e.g. buffered frames of a snapshot, are skipped by the stream.
+    """
+
+    src: int | str
+    resolution: tuple[int, int]
+    snapshot_resolution: tuple[int, int] | None
+    max_snapshot_attempts: int = 5
+    _capture: cv2.VideoCapture | None = None
+    _frame: np.ndarray | None = None
+    _frame_size: tuple[int, int] | None = None
+    _worker: threading.Thread | None = None
+    _is_run: threading.Event
+    _capture_lock: threading.Lock
+
+    def __init__(
+        self,
+        src: int | str,
+        *,
+        resolution: tuple[int, int],
+        snapshot_resolution: tuple[int, int] | None = None,
+    ) -> None:
+        self.src = src
+        self.resolution = resolution
+        self.snapshot_resolution = snapshot_resolution
+        self._is_run = threading.Event()
+        self._capture_lock = threading.Lock()
+
+    def start(self) -> None:
+        self._capture = cv2.VideoCapture(self.src)
+        self._set_resolution(self.resolution)
+        is_success, frame = self._capture.read()
+        self._frame = frame if is_success else None
+        # It's the size that the camera really gives, it can differ from `resolution`.
+        self._frame_size = frame.shape[:2] if is_success else None
+
+        self._is_run.set()
+        self._worker = threading.Thread(target=self._grab_frames, name='WebcamFrameSource', daemon=True)
+        self._worker.start()
+
+    def read(self) -> np.ndarray | None:
+        return self._frame
+
+    @property
+    def last_frame(self) -> np.ndarray | None:
+        return self._frame
+
+    def capture_snapshot(self) -> np.ndarray | None:
+        """
+        It blocks the stream for a few frames, so it shouldn't be called from the thread that processes frames.
+        """
+
+        if self.snapshot_resolution is None:
+            return self.last_frame
+
+        snapshot = None
+        width, height = self.snapshot_resolution
+
+        with self._capture_lock:
+            if self._capture is None:
+                return self.last_frame
+
+            if not self._set_resolution(self.snapshot_resolution):
+                return self.last_frame
+
+            try:
+                # Frames that were captured before the switch can come first.
+                for _ in range(self.max_snapshot_attempts):
+                    is_success, frame = self._capture.read()
+
+                    if not is_success:
+                        break
+
+                    if frame.shape[:2] == (height, width):
+                        snapshot = frame
+                        break
+            finally:
+                self._set_resolution(self.resolution)
+
+        return self.last_frame if snapshot is None else snapshot
+
+    def stop(self) -> None:
+        self._is_run.clear()
+
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+        with self._capture_lock:
+            if self._capture is not None:
+                self._capture.release()
+                self._capture = None
+
+        self._frame = None
+
+    def _grab_frames(self) -> None:
+        assert self._capture is not None
+
+        while self._is_run.is_set():
+            with self._capture_lock:
+                is_success, frame = self._capture.read()
+
+            if not is_success:
+                self._frame = None
+                break
+
+            if self._frame_size is not None and frame.shape[:2] != self._frame_size:
+                continue
+
+            self._frame = frame
+
+    def _set_resolution(self, resolution: tuple[int, int]) -> bool:
+        assert self._capture is not None
+
+        width, height = resolution
+        is_width_set = self._capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        is_height_set = self._capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+        return is_width_set and is_height_set
+
+
+class BasePlaybackFrameSource(BaseFrameSource, abc.ABC):
+    """
+    Plays prepared frames with `fps` in real time or as fast as they are read if `realtime` is `False`.
+    With `loop` the playback starts over at the end, so the source never finishes.
+    """
+
+    fps: float
+    realtime: bool
+    loop: bool
+    _last_frame: np.ndarray | None = None
+    _last_read_at: float | None = None
+    _is_finished: bool = False
+    _lock: threading.RLock
+
+    def __init__(self, *, fps: float, realtime: bool = True, loop: bool = False) -> None:
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self._lock = threading.RLock()
+
+    @synchronized_method
+    def start(self) -> None:
+        self._is_finished = False
+        self._last_frame = None
+        self._last_read_at = None
+        self._open()
+
+    @synchronized_method
+    def read(self) -> np.ndarray | None:
+        if self._is_finished:
+            return None
+
+        frame = self._read_next()
+
+        if frame is None and self.loop:
+            self._rewind()
+            frame = self._read_next()
+
+        if frame is None:
+            self._is_finished = True
+            self._last_frame = None
+            return None
+
+        if self.realtime:
+            self._wait_for_next_frame()
+
+        self._last_frame = frame
+
+        return frame
+
+    @property
+    def last_frame(self) -> np.ndarray | None:
+        return self._last_frame
+
+    @synchronized_method
+    def stop(self) -> None:
+        self._is_finished = True
+        self._last_frame = None
+        self._close()
+
+    def _wait_for_next_frame(self) -> None:
+        now = time.monotonic()
+
+        if self._last_read_at is not None:
+            time_to_sleep = 1 / self.fps - (now - self._last_read_at)
+
+            if time_to_sleep > 0:
+                time.sleep(time_to_sleep)
+                now += time_to_sleep
+
+        self._last_read_at = now
+
+    @abc.abstractmethod
+    def _open(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _read_next(self) -> np.ndarray | None:
+        pass
+
+    def _rewind(self) -> None:
+        self._close()
+        self._open()
+
+    def _close(self) -> None:
+        pass
+
+
+class VideoFileFrameSource(BasePlaybackFrameSource):
+    """
+    Frames of a video file, it's played with the frame rate of the file if `fps` isn't set.
+    """
+
+    path: str
+    _capture: cv2.VideoCapture | None = None
+
+    def __init__(self, path: str, *, fps: float | None = None, realtime: bool = True, loop: bool = False) -> None:
+        super().__init__(fps=fps or 0, realtime=realtime, loop=loop)
+
+        self.path = path
+
+    def _open(self) -> None:
+        self._capture = cv2.VideoCapture(self.path)
+
+        if not self.fps:
+            self.fps = self._capture.get(cv2.CAP_PROP_FPS) or 10
+
+    def _read_next(self) -> np.ndarray | None:
+        if self._capture is None:
+            return None
+
+        is_success, frame = self._capture.read()
+
+        return frame if is_success else None
+
+    def _close(self) -> None:
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+
+class ImageDirFrameSource(BasePlaybackFrameSource):
+    """
+    Images of a directory in the order of their names.
+    """
+
+    path: str
+    _file_names: list[str]
+    _position: int = 0
+
+    def __init__(self, path: str, *, fps: float, realtime: bool = True, loop: bool = False) -> None:
+        super().__init__(fps=fps, realtime=realtime, loop=loop)
+
+        self.path = path
+        self._file_names = []
+
+    def _open(self) -> None:
+        self._file_names = _get_image_file_names(self.path)
+        self._position = 0
+
+    def _read_next(self) -> np.ndarray | None:
+        while self._position < len(self._file_names):
+            file_name = self._file_names[self._position]
+            self._position += 1
+            frame = cv2.imread(os.path.join(self.path, file_name))
+
+            if frame is not None:
+                return frame
+
+        return None
+
+
+class SyntheticFrameSource(BasePlaybackFrameSource):
+    """
+    Generated frames of `SyntheticScene` with scripted motion, no camera or files are needed.
+    """
+
+    scene: SyntheticScene
+    _position: int = 0
+
+    def __init__(
+        self,
+        *,
+        fps: float,
+        scene: SyntheticScene | None = None,
+        realtime: bool = True,
+        loop: bool = False,
+    ) -> None:
+        super().__init__(fps=fps, realtime=realtime, loop=loop)
+
+        self.scene = SyntheticScene() if scene is None else scene
+
+    def _open(self) -> None:
+        self._position = 0
+
+    def _read_next(self) -> np.ndarray | None:
+        if self._position >= self.scene.frames_count:
+            return None
+
+        frame = self.scene.render(self._position)
+        self._position += 1
+
+        return frame
+
+
+def create_frame_source(
+    src: int | str,
+    *,
+    resolution: tuple[int, int],
+    fps: float,
+    realtime: bool = True,
+    loop: bool = True,
+    snapshot_resolution: tuple[int, int] | None = None,
+) -> BaseFrameSource:
+    """
+    `src` is a camera index, `synthetic`, a directory with images, a video file or a stream URL.
+    """
+
+    if isinstance(src, int):
+        return WebcamFrameSource(src, resolution=resolution, snapshot_resolution=snapshot_resolution)
+
+    if src == SYNTHETIC_SOURCE:
+        width, height = resolution
+        return SyntheticFrameSource(
+            fps=fps,
+            scene=SyntheticScene(width=width, height=height, frames_count=round(fps * 60)),
+            realtime=realtime,
+            loop=loop,
+        )
+
+    if os.path.isdir(src):
+        return ImageDirFrameSource(src, fps=fps, realtime=realtime, loop=loop)
+
+    if os.path.isfile(src):
+        return VideoFileFrameSource(src, realtime=realtime, loop=loop)
+
+    return WebcamFrameSource(src, resolution=resolution, snapshot_resolution=snapshot_resolution)
+
+
+def frame_source_is_available(src: int | str) -> bool:
+    if src == SYNTHETIC_SOURCE:
+        return True
+
+    if isinstance(src, str) and os.path.isdir(src):
+        return bool(_get_image_file_names(src))
+
+    capture = cv2.VideoCapture(src)
+    is_available = capture.isOpened()
+    capture.release()
+
+    return is_available
+
+
+def _get_image_file_names(path: str) -> list[str]:
+    return sorted(file_name for file_name in os.listdir(path) if file_name.lower().endswith(IMAGE_EXTENSIONS))
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+from libs.camera.artifacts import EncodedClip, EncodedImage
+from libs.camera.clips import ClipWriter
+
+
+def test_encoded_image():
+    image = EncodedImage(np.zeros((8, 8, 3), dtype=np.uint8), sinks_count=2)
+
+    with image.open() as file:
+        first_content = file.read()
+
+    with image.open() as file:
+        assert file.read() == first_content
+
+    # A retry opens it again, it's released only by the sink.
+    with image.open() as file:
+        assert file.read() == first_content
+
+    assert image.references == 2
+
+    image.release()
+    image.release()
+
+    assert first_content.startswith(b'\xff\xd8')
+    assert image.references == 0
+
+    with pytest.raises(RuntimeError), image.open():
+        pass
+
+
+def test_encoded_clip():
+    clip_writer = ClipWriter(fps=10)
+
+    for _ in range(3):
+        clip_writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+
+    clip = EncodedClip(clip_writer, sinks_count=2)
+
+    with clip.open() as file:
+        path = file.name
+        assert file.read()
+
+    assert os.path.exists(path)
+
+    clip.release()
+    assert os.path.exists(path)
+
+    clip.release()
+    assert not os.path.exists(path)
+
+
+def test_unreleased_artifacts_are_freed():
+    clip_writer = ClipWriter(fps=10)
+    clip_writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+
+    clip = EncodedClip(clip_writer, sinks_count=2)
+
+    with clip.open() as file:
+        path = file.name
+
+    clip.release()
+    EncodedClip.free_all()
+
+    assert clip.references == 0
+    assert not os.path.exists(path)
+
+    with pytest.raises(RuntimeError):
+        clip.release()
@@ -0,0 +1,27 @@
+import time
+
+import numpy as np
+
+from libs.camera.base import VideoCamera
+
+
+class _FrameSource:
+    def read(self) -> np.ndarray:
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+def test_slow_processing_does_not_stall_capturing():
+    processed_frames = []
+
+    def _process_frame(*, frame: np.ndarray, fps: float) -> None:
+        time.sleep(0.05)
+        processed_frames.append(frame)
+
+    video_camera = VideoCamera(frame_source=_FrameSource(), callback=_process_frame, max_fps=200)
+    video_camera.start()
+    time.sleep(0.5)
+    video_camera.stop()
+
+    assert processed_frames
+    assert video_camera.dropped_frames_count > 0
+    assert video_camera.fps > video_camera.processing_fps * 2
@@ -0,0 +1,101 @@
+import datetime
+
+import numpy as np
+
+from libs.camera.buffers import AnnotatedFrameBuffer, FrameRingBuffer, JPEGFrameBuffer
+from libs.image_processing.annotations import FrameAnnotation
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_frame_ring_buffer():
+    buffer = FrameRingBuffer(max_bytes=_frame(0).nbytes * 3)
+
+    assert len(buffer) == 0
+    assert len(buffer.get_range(0)) == 0
+
+    for i in range(5):
+        assert buffer.append(_frame(i)) == i
+
+    assert buffer.capacity == 3
+    assert len(buffer) == 3
+    assert buffer.first_index == 2
+    assert buffer.total_count == 5
+    assert buffer.get(4)[0, 0, 0] == 4
+    assert [frame[0, 0, 0] for frame in buffer.get_range(0)] == [2, 3, 4]
+    assert [frame[0, 0, 0] for frame in buffer.get_range(3, 4)] == [3]
+
+    buffer.clear()
+
+    assert len(buffer) == 0
+    assert buffer.append(_frame(5)) == 5
+    assert [frame[0, 0, 0] for frame in buffer.get_range(0)] == [5]
+
+
+def test_jpeg_frame_buffer():
+    buffer = JPEGFrameBuffer(max_bytes=2**20, quality=100)
+    buffer.append(_frame(0))
+    frame_size = buffer.get_range(0).nbytes
+    buffer.close()
+
+    buffer = JPEGFrameBuffer(max_bytes=frame_size * 3, quality=100, max_pending=2)
+
+    try:
+        for i in range(5):
+            assert buffer.append(_frame(i * 50)) == i
+
+        frames = buffer.get_range(0)
+
+        assert buffer.total_count == 5
+        assert buffer.first_index == 2
+        assert len(frames) == 3
+        assert frames.nbytes <= frame_size * 3
+        assert [int(frame[0, 0, 0]) // 10 * 10 for frame in frames] == [100, 150, 200]
+        assert frames[0].shape == (4, 6, 3)
+        assert len(buffer.get_range(3, 4)) == 1
+
+        buffer.clear()
+
+        assert len(buffer) == 0
+        assert buffer.append(_frame(0)) == 5
+        assert len(buffer.get_range(0)) == 1
+    finally:
+        buffer.close()
+
+
+def test_annotated_frame_buffer():
+    buffer = AnnotatedFrameBuffer(FrameRingBuffer(capacity=2))
+    annotation = FrameAnnotation(captured_at=datetime.datetime(2024, 1, 1), boxes=((0, 0, 2, 2),))
+
+    buffer.append(_frame(0), annotation)
+    buffer.append(_frame(1))
+    buffer.append(_frame(2), annotation)
+
+    frames = buffer.get_range(0)
+
+    assert len(frames) == 2
+    assert frames.annotations == (None, annotation)
+    assert frames[0][0, 0, 0] == 1
+    assert (frames[1] != _frame(2)).any()
+    assert (frames.frames[1] == _frame(2)).all()
+
+
+def test_frame_ring_buffer_grows_and_returns_views():
+    buffer = FrameRingBuffer(max_bytes=_frame(0).nbytes * 100)
+
+    for i in range(20):
+        buffer.append(_frame(i))
+
+    assert buffer.capacity == 100
+    assert [frame[0, 0, 0] for frame in buffer.get_range(0)] == list(range(20))
+
+    for i in range(20, 130):
+        buffer.append(_frame(i % 256))
+
+    frames = buffer.get_range(120)
+
+    assert len(buffer) == 100
+    assert [frame[0, 0, 0] for frame in buffer.get_range(0)] == list(range(30, 130))
+    assert all(np.shares_memory(frame, buffer.get(120 + i)) for i, frame in enumerate(frames))
@@ -0,0 +1,92 @@
+import os
+import threading
+import typing
+
+import cv2
+import numpy as np
+
+from libs.camera.buffers import AnnotatedFrameBuffer, FrameRingBuffer
+from libs.camera.clips import ClipWriter, write_clip
+
+
+def test_clip_writer():
+    clip_writer = ClipWriter(fps=10)
+
+    for i in range(15):
+        clip_writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+
+    path = clip_writer.finish()
+
+    assert path is not None
+
+    try:
+        capture = cv2.VideoCapture(path)
+        frames_count = 0
+
+        while capture.read()[0]:
+            frames_count += 1
+
+        capture.release()
+
+        assert clip_writer.frames_count == 15
+        assert frames_count == 15
+    finally:
+        os.remove(path)
+
+
+def test_write_empty_clip():
+    assert write_clip((), fps=10) is None
+
+
+class _WaitingFrames(typing.Sequence[np.ndarray]):
+    """
+    No frames, but the writer waits for `event` to read them, so it falls behind.
+    """
+
+    def __init__(self, event: threading.Event) -> None:
+        self.event = event
+
+    def __len__(self) -> int:
+        return 0
+
+    def __getitem__(self, index):
+        raise IndexError(index)
+
+    def __iter__(self) -> typing.Iterator[np.ndarray]:
+        self.event.wait()
+        return iter(())
+
+
+def test_clip_writer_with_history_that_is_overwritten():
+    frames = AnnotatedFrameBuffer(FrameRingBuffer(capacity=20))
+    is_captured = threading.Event()
+
+    for i in range(20):
+        frames.append(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+
+    clip_writer = ClipWriter(fps=10)
+    clip_writer.write_many(_WaitingFrames(is_captured))
+    clip_writer.write_many(frames.get_range(0, copy=True))
+
+    # Capturing goes on before the writer reads the history.
+    for i in range(20, 30):
+        frames.append(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+
+    is_captured.set()
+
+    path = clip_writer.finish()
+
+    assert path is not None
+
+    try:
+        capture = cv2.VideoCapture(path)
+        values = []
+
+        while (result := capture.read())[0]:
+            values.append(round(float(result[1].mean()) / 8))
+
+        capture.release()
+
+        assert values == list(range(20))
+    finally:
+        os.remove(path)
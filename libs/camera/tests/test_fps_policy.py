@@ -0,0 +1,35 @@
+import datetime
+
+from libs.camera.fps_policy import AdaptiveFPSPolicy
+
+
+def test_adaptive_fps_policy():
+    fps_policy = AdaptiveFPSPolicy(
+        max_fps=20,
+        idle_fps=4,
+        min_fps=2,
+        max_cpu_temperature=70,
+        max_task_queue_delay=datetime.timedelta(seconds=5),
+    )
+
+    assert fps_policy.target_fps == 4
+    assert fps_policy.update(is_active=True) == 20
+
+    fps_policy.update()
+    fps_policy.on_motion()
+
+    assert fps_policy.target_fps == 20
+    assert fps_policy.update(cpu_temperature=75) == 10
+    assert fps_policy.update(task_queue_delay=datetime.timedelta(seconds=10)) == 5
+    assert fps_policy.update(cpu_temperature=80) == 2.5
+    assert fps_policy.update(cpu_temperature=80) == 2
+    assert fps_policy.update(cpu_temperature=50) > 2
+
+    for _ in range(5):
+        fps_policy.update(cpu_temperature=50)
+
+    assert fps_policy.target_fps == 20
+
+    fps_policy.motion_hold = datetime.timedelta(0)
+
+    assert fps_policy.target_fps == 4
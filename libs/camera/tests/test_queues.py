@@ -0,0 +1,14 @@
+from libs.camera.queues import DropOldestQueue
+
+
+def test_drop_oldest_queue():
+    frames_queue = DropOldestQueue(maxsize=2)
+
+    assert frames_queue.put(1) is False
+    assert frames_queue.put(2) is False
+    assert frames_queue.put(3) is True
+    assert frames_queue.dropped_count == 1
+    assert len(frames_queue) == 2
+    assert frames_queue.get() == 2
+    assert frames_queue.get() == 3
+    assert frames_queue.get(timeout=0.01) is None
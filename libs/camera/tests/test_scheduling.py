@@ -0,0 +1,41 @@
+import time
+
+from libs.camera.scheduling import DetectionScheduler
+
+
+def test_unlimited_budget():
+    scheduler = DetectionScheduler(cpu_budget=None)
+
+    assert all(scheduler.acquire('main') for _ in range(100))
+
+
+def test_budget_is_shared_by_turns():
+    scheduler = DetectionScheduler(cpu_budget=0.5, max_burst=0.1)
+
+    assert scheduler.acquire('first')
+    scheduler.report(0.2)
+
+    # The budget is spent.
+    assert not scheduler.acquire('second')
+    assert not scheduler.acquire('first')
+
+    time.sleep(0.3)
+
+    # The second camera waits longer, so it goes first.
+    assert not scheduler.acquire('first')
+    assert scheduler.acquire('second')
+    scheduler.report(0.01)
+    assert scheduler.acquire('first')
+
+
+def test_removed_camera_does_not_hold_the_turn():
+    scheduler = DetectionScheduler(cpu_budget=10)
+
+    assert scheduler.acquire('first')
+    scheduler.report(1.05)
+    assert not scheduler.acquire('second')
+
+    time.sleep(0.1)
+    scheduler.remove('second')
+
+    assert scheduler.acquire('first')
@@ -0,0 +1,159 @@
+import os
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from libs.camera import sources
+from libs.camera.base import VideoCamera
+from libs.camera.clips import write_clip
+from libs.camera.sources import (
+    ImageDirFrameSource,
+    SyntheticFrameSource,
+    VideoFileFrameSource,
+    WebcamFrameSource,
+    create_frame_source,
+    frame_source_is_available,
+)
+from libs.image_processing.synthetic import SyntheticScene
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full((16, 16, 3), value, dtype=np.uint8)
+
+
+def _read_all(source) -> list[np.ndarray]:
+    frames = []
+    source.start()
+
+    try:
+        while (frame := source.read()) is not None:
+            frames.append(frame)
+    finally:
+        source.stop()
+
+    return frames
+
+
+def test_video_file_frame_source():
+    path = write_clip([_frame(i * 40) for i in range(5)], fps=10)
+    assert path is not None
+
+    try:
+        assert frame_source_is_available(path)
+        assert isinstance(create_frame_source(path, resolution=(16, 16), fps=10), VideoFileFrameSource)
+
+        frames = _read_all(VideoFileFrameSource(path, realtime=False))
+        assert len(frames) == 5
+
+        source = VideoFileFrameSource(path, realtime=False, loop=True)
+        source.start()
+        assert all(source.read() is not None for _ in range(12))
+        assert source.last_frame is not None
+        source.stop()
+    finally:
+        os.remove(path)
+
+
+def test_image_dir_frame_source():
+    with tempfile.TemporaryDirectory() as path:
+        for i in (2, 0, 1):
+            cv2.imwrite(os.path.join(path, f'{i}.png'), _frame(i * 100))
+
+        assert frame_source_is_available(path)
+        assert isinstance(create_frame_source(path, resolution=(16, 16), fps=10), ImageDirFrameSource)
+
+        frames = _read_all(ImageDirFrameSource(path, fps=10, realtime=False))
+        assert [int(frame[0, 0, 0]) for frame in frames] == [0, 100, 200]
+
+
+def test_synthetic_frame_source_in_real_time():
+    scene = SyntheticScene(frames_count=6, width=32, height=24, motion_ranges=((2, 4),))
+    assert [scene.has_motion(i) for i in range(6)] == [False, False, True, True, False, False]
+
+    started_at = time.monotonic()
+    frames = _read_all(SyntheticFrameSource(fps=50, scene=scene))
+
+    assert len(frames) == 6
+    assert frames[0].shape == (24, 32, 3)
+    # 5 intervals between 6 frames.
+    assert time.monotonic() - started_at >= 5 / 50 * 0.9
+
+
+def test_video_camera_stops_at_the_end_of_the_source():
+    scene = SyntheticScene(frames_count=20, width=32, height=24)
+    source = SyntheticFrameSource(fps=1_000, scene=scene, realtime=False)
+    processed_frames = []
+    is_processed = threading.Event()
+
+    def _process_frame(*, frame: np.ndarray, fps: float) -> None:
+        processed_frames.append(frame)
+
+        if len(processed_frames) == 1:
+            is_processed.set()
+
+    source.start()
+    video_camera = VideoCamera(frame_source=source, callback=_process_frame, max_fps=1_000, queue_size=20)
+    video_camera.start()
+
+    assert is_processed.wait(timeout=5)
+
+    for _ in range(50):
+        if not video_camera.is_run:
+            break
+
+        time.sleep(0.1)
+
+    video_camera.stop()
+
+    assert not video_camera.is_run
+    assert 0 < len(processed_frames) <= 20
+
+
+class _FakeCapture:
+    def __init__(self, src) -> None:
+        self.width, self.height = 16, 16
+        self.buffered_frames = []
+
+    def set(self, prop_id: int, value: float) -> bool:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        else:
+            self.height = int(value)
+
+        return True
+
+    def read(self) -> tuple[bool, np.ndarray]:
+        time.sleep(0.001)
+
+        if self.buffered_frames:
+            return True, self.buffered_frames.pop(0)
+
+        return True, np.zeros((self.height, self.width, 3), dtype=np.uint8)
+
+    def release(self) -> None:
+        pass
+
+
+def test_webcam_frame_source_skips_frames_of_snapshots(monkeypatch):
+    monkeypatch.setattr(sources.cv2, 'VideoCapture', _FakeCapture)
+
+    source = WebcamFrameSource(0, resolution=(16, 16), snapshot_resolution=(64, 48))
+    source.start()
+
+    try:
+        assert source.capture_snapshot().shape == (48, 64, 3)
+
+        # Frames in the high resolution that were captured before the switch back.
+        source._capture.buffered_frames = [np.zeros((48, 64, 3), dtype=np.uint8)] * 10  # noqa: SLF001
+        frame_shapes = set()
+
+        for _ in range(30):
+            frame_shapes.add(source.read().shape)
+            time.sleep(0.001)
+
+        assert frame_shapes == {(16, 16, 3)}
+    finally:
+        source.stop()
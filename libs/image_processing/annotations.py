@@ -0,0 +1,115 @@
+import dataclasses
+import datetime
+import typing
+
+import cv2
+import numpy as np
+
+from .utils import add_timestamp_in_frame
+
+
+__all__ = (
+    'AnnotatedFrames',
+    'Box',
+    'FrameAnnotation',
+)
+
+Box = tuple[int, int, int, int]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class FrameAnnotation:
+    """
+    Overlay of a frame, it's rendered only for frames that are sent, saved or shown.
+    Without `is_occupied` only the timestamp is rendered.
+    """
+
+    captured_at: datetime.datetime
+    is_occupied: bool | None = None
+    boxes: tuple[Box, ...] = ()
+    fps: float | None = None
+    max_fps: float | None = None
+
+    def scale(self, scale_x: float, scale_y: float) -> 'FrameAnnotation':
+        """
+        Return the annotation for the same frame with another resolution.
+        """
+
+        return dataclasses.replace(
+            self,
+            boxes=tuple(
+                (round(x * scale_x), round(y * scale_y), round(w * scale_x), round(h * scale_y))
+                for x, y, w, h in self.boxes
+            ),
+        )
+
+    def render(self, frame: np.ndarray) -> np.ndarray:
+        marked_frame = np.copy(frame)
+
+        for x, y, w, h in self.boxes:
+            cv2.rectangle(marked_frame, (x, y), (x + w, y + h), (0, 0, 255), 1)
+
+        if self.is_occupied is not None:
+            cv2.putText(
+                img=marked_frame,
+                text=f'Status: {"Occupied" if self.is_occupied else "Unoccupied"}',
+                org=(10, 20),
+                fontFace=cv2.FONT_HERSHEY_SIMPLEX,
+                fontScale=0.5,
+                color=(0, 0, 255) if self.is_occupied else (0, 255, 0),
+                thickness=1,
+            )
+
+        if self.fps is not None:
+            current_fps = round(self.fps, 2)
+            is_slow = self.max_fps is not None and self.max_fps - current_fps > 0.1
+            cv2.putText(
+                img=marked_frame,
+                text=f'FPS: {current_fps}',
+                org=(10, 50),
+                fontFace=cv2.FONT_HERSHEY_SIMPLEX,
+                fontScale=0.5,
+                color=(0, 0, 255) if is_slow else (0, 255, 0),
+                thickness=1,
+            )
+
+        add_timestamp_in_frame(marked_frame, timestamp=self.captured_at)
+
+        return marked_frame
+
+
+class AnnotatedFrames(typing.Sequence[np.ndarray]):
+    """
+    Raw frames with their annotations, a frame is rendered on access.
+    """
+
+    frames: typing.Sequence[np.ndarray]
+    annotations: typing.Sequence[FrameAnnotation | None]
+
+    def __init__(
+        self,
+        frames: typing.Sequence[np.ndarray],
+        annotations: typing.Sequence[FrameAnnotation | None],
+    ) -> None:
+        assert len(frames) == len(annotations)
+
+        self.frames = frames
+        self.annotations = annotations
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @typing.overload
+    def __getitem__(self, index: int) -> np.ndarray: ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> 'AnnotatedFrames': ...
+
+    def __getitem__(self, index: int | slice) -> 'np.ndarray | AnnotatedFrames':
+        if isinstance(index, slice):
+            return AnnotatedFrames(self.frames[index], self.annotations[index])
+
+        annotation = self.annotations[index]
+        frame = self.frames[index]
+
+        return frame if annotation is None else annotation.render(frame)
@@ -0,0 +1,350 @@
+"""
+Benchmark of motion engines of `MotionDetector`.
+
+Usage:
+    python3 -m libs.image_processing.benchmarks [clip.avi ...] --output motion_detection.json
+
+Without clips synthetic clips with labelled motion are generated, so no camera is needed.
+Recorded clips can be labelled by `<clip>.labels.json` with `[[start, end], ...]` ranges of frames with motion.
+Precision and recall of detection are reported for labelled clips, and `--min-precision`/`--min-recall`
+make the run fail if detection gets worse.
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+import typing
+
+import cv2
+import numpy as np
+
+from .motion_detector import MotionDetector
+from .motion_engines import MOTION_ENGINES
+from .profiling import StageTimer
+from .synthetic import SyntheticScene
+
+
+__all__ = (
+    'DetectionQuality',
+    'LabelledClip',
+    'check_quality',
+    'generate_labelled_clip',
+    'generate_synthetic_clip',
+    'generate_synthetic_clips',
+    'get_max_rss_mb',
+    'read_clip',
+    'read_labelled_clip',
+    'run_engines_benchmark',
+)
+
+
+@dataclasses.dataclass
+class LabelledClip:
+    frames: list[np.ndarray]
+    # `True` for frames with motion, `None` if the clip isn't labelled.
+    labels: list[bool] | None = None
+
+
+@dataclasses.dataclass
+class DetectionQuality:
+    true_positives: int = 0
+    false_positives: int = 0
+    false_negatives: int = 0
+
+    @property
+    def precision(self) -> float:
+        detected = self.true_positives + self.false_positives
+        return self.true_positives / detected if detected else 1
+
+    @property
+    def recall(self) -> float:
+        expected = self.true_positives + self.false_negatives
+        return self.true_positives / expected if expected else 1
+
+    def add(self, *, is_detected: bool, is_expected: bool) -> None:
+        if is_detected and is_expected:
+            self.true_positives += 1
+        elif is_detected:
+            self.false_positives += 1
+        elif is_expected:
+            self.false_negatives += 1
+
+    def as_dict(self) -> dict[str, typing.Any]:
+        return {
+            'precision': round(self.precision, 3),
+            'recall': round(self.recall, 3),
+            'true_positives': self.true_positives,
+            'false_positives': self.false_positives,
+            'false_negatives': self.false_negatives,
+        }
+
+
+def generate_labelled_clip(
+    *,
+    frames_count: int = 300,
+    width: int = 640,
+    height: int = 480,
+    seed: int = 0,
+    motion_ranges: typing.Sequence[tuple[int, int]] | None = None,
+    lighting_drift: float = 20,
+) -> LabelledClip:
+    """
+    Frames of `SyntheticScene`, frames with the moving rectangle are labelled as motion.
+    """
+
+    scene = SyntheticScene(
+        frames_count=frames_count,
+        width=width,
+        height=height,
+        seed=seed,
+        motion_ranges=motion_ranges,
+        lighting_drift=lighting_drift,
+    )
+
+    return LabelledClip(
+        frames=[scene.render(i) for i in range(frames_count)],
+        labels=[scene.has_motion(i) for i in range(frames_count)],
+    )
+
+
+def generate_synthetic_clip(
+    *,
+    frames_count: int = 300,
+    width: int = 640,
+    height: int = 480,
+    seed: int = 0,
+) -> list[np.ndarray]:
+    return generate_labelled_clip(frames_count=frames_count, width=width, height=height, seed=seed).frames
+
+
+def generate_synthetic_clips(*, width: int = 640, height: int = 480) -> dict[str, LabelledClip]:
+    """
+    Scenes that are hard in different ways: one long motion, short motions and lighting changes without motion.
+    """
+
+    return {
+        'synthetic': generate_labelled_clip(width=width, height=height),
+        'short_motions': generate_labelled_clip(
+            width=width,
+            height=height,
+            seed=1,
+            motion_ranges=((60, 90), (150, 170), (240, 250)),
+        ),
+        'lighting_changes': generate_labelled_clip(
+            width=width,
+            height=height,
+            seed=2,
+            motion_ranges=(),
+            lighting_drift=60,
+        ),
+    }
+
+
+def read_clip(path: str) -> list[np.ndarray]:
+    capture = cv2.VideoCapture(path)
+    frames = []
+
+    try:
+        while True:
+            is_success, frame = capture.read()
+
+            if not is_success:
+                break
+
+            frames.append(frame)
+    finally:
+        capture.release()
+
+    return frames
+
+
+def read_labelled_clip(path: str) -> LabelledClip:
+    frames = read_clip(path)
+    labels_path = f'{path}.labels.json'
+
+    if not os.path.exists(labels_path):
+        return LabelledClip(frames=frames)
+
+    with open(labels_path) as file:
+        motion_ranges = json.load(file)
+
+    labels = [any(start <= i < end for start, end in motion_ranges) for i in range(len(frames))]
+
+    return LabelledClip(frames=frames, labels=labels)
+
+
+def run_engines_benchmark(
+    clips: dict[str, LabelledClip],
+    *,
+    engines: typing.Iterable[str] = tuple(MOTION_ENGINES),
+    processing_width: int | None = None,
+    measure_memory: bool = True,
+) -> dict[str, typing.Any]:
+    """
+    Speed is measured without tracing of memory, so the peak memory is measured by a separate run.
+    """
+
+    results: dict[str, typing.Any] = {}
+
+    for clip_name, clip in clips.items():
+        clip_results = results[clip_name] = {}
+
+        for engine_name in engines:
+            stage_timer = StageTimer()
+            motion_detector = _create_motion_detector(
+                engine_name,
+                processing_width=processing_width,
+                stage_timer=stage_timer,
+            )
+            quality = DetectionQuality()
+            occupied_frames = 0
+
+            started_at = time.perf_counter()
+            started_cpu_at = time.process_time()
+
+            for i, frame in enumerate(clip.frames):
+                motion_detector.process_new_frame(frame.copy(), fps=0)
+                occupied_frames += motion_detector.is_occupied
+
+                if clip.labels is not None:
+                    quality.add(is_detected=motion_detector.is_occupied, is_expected=clip.labels[i])
+
+            elapsed = time.perf_counter() - started_at
+            cpu_time = time.process_time() - started_cpu_at
+            frames_count = len(clip.frames)
+
+            clip_results[engine_name] = {
+                'frames': frames_count,
+                'fps': round(frames_count / elapsed, 2),
+                'cpu_ms_per_frame': round(cpu_time / frames_count * 1_000, 3),
+                'stages_ms_per_frame': stage_timer.get_ms_per_frame(frames_count),
+                'occupied_frames': occupied_frames,
+                'quality': None if clip.labels is None else quality.as_dict(),
+            }
+
+            if measure_memory:
+                clip_results[engine_name]['peak_memory_mb'] = _measure_peak_memory(
+                    engine_name,
+                    clip=clip,
+                    processing_width=processing_width,
+                )
+
+    return results
+
+
+def _create_motion_detector(
+    engine_name: str,
+    *,
+    processing_width: int | None,
+    stage_timer: StageTimer | None = None,
+) -> MotionDetector:
+    return MotionDetector(
+        show_frames=False,
+        max_fps=1_000,
+        processing_width=processing_width,
+        engine=MOTION_ENGINES[engine_name](),
+        stage_timer=stage_timer,
+    )
+
+
+def _measure_peak_memory(engine_name: str, *, clip: LabelledClip, processing_width: int | None) -> float:
+    """
+    Peak of memory that is allocated by detection (numpy arrays are traced too), in MB.
+    """
+
+    tracemalloc.start()
+
+    try:
+        motion_detector = _create_motion_detector(engine_name, processing_width=processing_width)
+
+        for frame in clip.frames:
+            motion_detector.process_new_frame(frame.copy(), fps=0)
+
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return round(peak / 2**20, 2)
+
+
+def get_max_rss_mb() -> float:
+    # It's in kilobytes on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10, 2)
+
+
+def check_quality(
+    results: dict[str, typing.Any],
+    *,
+    min_precision: float = 0,
+    min_recall: float = 0,
+) -> list[str]:
+    """
+    Return descriptions of results that are worse than the thresholds.
+    """
+
+    failures = []
+
+    for clip_name, clip_results in results.items():
+        for engine_name, engine_results in clip_results.items():
+            quality = engine_results['quality']
+
+            if quality is None:
+                continue
+
+            if quality['precision'] < min_precision or quality['recall'] < min_recall:
+                failures.append(
+                    f'{clip_name}/{engine_name}: precision {quality["precision"]}, recall {quality["recall"]}',
+                )
+
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of motion engines.')
+    parser.add_argument('clips', nargs='*', help='Paths to recorded clips, synthetic clips are used by default.')
+    parser.add_argument('--engines', nargs='+', choices=tuple(MOTION_ENGINES), default=tuple(MOTION_ENGINES))
+    parser.add_argument('--processing-width', type=int, default=None)
+    parser.add_argument('--min-precision', type=float, default=0)
+    parser.add_argument('--min-recall', type=float, default=0)
+    parser.add_argument('--output', help='Path to save JSON, stdout by default.')
+    args = parser.parse_args()
+
+    if args.clips:
+        clips = {path: read_labelled_clip(path) for path in args.clips}
+    else:
+        clips = generate_synthetic_clips()
+
+    engines_results = run_engines_benchmark(
+        clips,
+        engines=args.engines,
+        processing_width=args.processing_width,
+    )
+    failures = check_quality(engines_results, min_precision=args.min_precision, min_recall=args.min_recall)
+    result = {
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'processing_width': args.processing_width,
+        'max_rss_mb': get_max_rss_mb(),
+        'engines': engines_results,
+        'failures': failures,
+    }
+    dumped_result = json.dumps(result, indent=4)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(dumped_result)
+    else:
+        sys.stdout.write(f'{dumped_result}\n')
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
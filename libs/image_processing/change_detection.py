@@ -0,0 +1,84 @@
+import datetime
+import time
+
+import cv2
+import numpy as np
+
+
+__all__ = (
+    'FrameChangeDetector',
+    'get_difference_hash',
+    'get_hamming_distance',
+)
+
+
+def get_difference_hash(frame: np.ndarray, *, hash_size: int = 16) -> int:
+    """
+    Perceptual hash that compares brightness of neighbouring cells of the frame,
+    so noise and smooth lighting changes don't change it, but objects do.
+    """
+
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    cells = cv2.resize(frame, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (cells[:, 1:] > cells[:, :-1]).flatten()
+
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def get_hamming_distance(first_hash: int, second_hash: int) -> int:
+    return (first_hash ^ second_hash).bit_count()
+
+
+class FrameChangeDetector:
+    """
+    Decides whether a frame differs enough from the last accepted one.
+    With `keep_alive_interval` a frame is accepted at least once per the interval, even if nothing is changed.
+    """
+
+    min_distance: int
+    keep_alive_interval: datetime.timedelta | None
+    hash_size: int
+    _last_hash: int | None = None
+    _last_accepted_at: float | None = None
+
+    def __init__(
+        self,
+        *,
+        min_distance: int,
+        keep_alive_interval: datetime.timedelta | None = None,
+        hash_size: int = 16,
+    ) -> None:
+        self.min_distance = min_distance
+        self.keep_alive_interval = keep_alive_interval
+        self.hash_size = hash_size
+
+    def accept(self, frame: np.ndarray) -> bool:
+        """
+        Return `True` and remember the frame if it's changed or the keep-alive interval is passed.
+        """
+
+        frame_hash = get_difference_hash(frame, hash_size=self.hash_size)
+        now = time.monotonic()
+
+        if not self._is_changed(frame_hash) and not self._is_keep_alive_time(now):
+            return False
+
+        self._last_hash = frame_hash
+        self._last_accepted_at = now
+
+        return True
+
+    def reset(self) -> None:
+        self._last_hash = None
+        self._last_accepted_at = None
+
+    def _is_changed(self, frame_hash: int) -> bool:
+        return self._last_hash is None or get_hamming_distance(self._last_hash, frame_hash) >= self.min_distance
+
+    def _is_keep_alive_time(self, now: float) -> bool:
+        if self.keep_alive_interval is None or self._last_accepted_at is None:
+            return False
+
+        return now - self._last_accepted_at >= self.keep_alive_interval.total_seconds()
@@ -1,183 +1,246 @@
+import contextlib
 import datetime
+import typing
 
 import cv2
 import imutils
 import imutils.video
 import numpy as np
 
+from .annotations import Box, FrameAnnotation
+from .motion_engines import BaseMotionEngine, TargetFrameEngine
+from .profiling import StageTimer
+
 
 class MotionDetector:
-    target_frame: np.ndarray | None = None
+    """
+    Detects motion by comparing frames with a background model of `engine` (a target frame by default).
+
+    `processing_width` - width of the downscaled copy that is used for detection, boxes are mapped back to
+    the full frame. `regions_of_interest` and `masks` are boxes `(x, y, w, h)` in coordinates of the full frame:
+    only regions of interest are checked (the whole frame if they aren't set), masks are skipped.
+    With `lazy_annotation` the frame isn't copied and marked, only `annotation` is created,
+    so the overlay can be rendered later for frames that are really used.
+    `stage_timer` collects time of processing stages for benchmarks.
+    """
+
+    engine: BaseMotionEngine
+    lazy_annotation: bool
+    # The last processed frame and its annotation, they are `None` if the frame wasn't compared.
+    frame: np.ndarray | None = None
+    annotation: FrameAnnotation | None = None
+    # Frames are processed right away, it's for compatibility with `ProcessMotionDetector`.
+    frame_in_detection: np.ndarray | None = None
+    # The rendered annotation, it isn't updated in the lazy mode.
     marked_frame: np.ndarray | None = None
     is_occupied: bool = False
+    boxes: list[Box]
+    processing_width: int | None
+    regions_of_interest: tuple[Box, ...]
+    masks: tuple[Box, ...]
     _max_fps: int
     _min_area: int = 500
-    _movement_ttl = datetime.timedelta(seconds=20)
-    _last_changed_at: datetime.datetime | None = None
+    _blur_size: int = 0
     _need_to_show_frames: bool
-
-    def __init__(self, *, show_frames: bool, max_fps: int) -> None:
+    _frame_shape: tuple[int, ...] | None = None
+    _scale: float = 1
+    _processing_size: tuple[int, int] | None = None
+    _crop: Box | None = None
+    _mask: np.ndarray | None = None
+    stage_timer: StageTimer | None = None
+
+    def __init__(
+        self,
+        *,
+        show_frames: bool,
+        max_fps: int,
+        processing_width: int | None = None,
+        regions_of_interest: typing.Iterable[typing.Sequence[int]] = (),
+        masks: typing.Iterable[typing.Sequence[int]] = (),
+        engine: BaseMotionEngine | None = None,
+        lazy_annotation: bool = False,
+        stage_timer: StageTimer | None = None,
+    ) -> None:
+        self.engine = TargetFrameEngine() if engine is None else engine
+        self.lazy_annotation = lazy_annotation
+        self.stage_timer = stage_timer
         self._need_to_show_frames = show_frames
         self._max_fps = max_fps
+        self.processing_width = processing_width
+        self.regions_of_interest = tuple(tuple(box) for box in regions_of_interest)  # type: ignore
+        self.masks = tuple(tuple(box) for box in masks)  # type: ignore
+        self.boxes = []
 
     def process_new_frame(self, frame: np.ndarray, *, fps: float) -> None:
-        now = datetime.datetime.now()
-
-        # Convert frame to grayscale, and blur it
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(
-            gray,
-            (
-                21,
-                21,
-            ),
-            0,
-        )
+        if frame.shape != self._frame_shape:
+            self._prepare_geometry(frame.shape)
+
+        assert self._crop is not None
+
         self.is_occupied = False
+        self.boxes = []
 
-        # If the target frame is None, initialize it
-        if (
-            self.target_frame is None
-            or self._last_changed_at is None
-            or (now - self._last_changed_at) > self._movement_ttl
-        ):
-            self.target_frame = gray
-            self._last_changed_at = now
+        if not self._crop[2] or not self._crop[3]:
+            # Regions of interest are outside of the frame, there is nothing to check.
+            self._annotate(frame, fps=fps)
             return
 
-        # Compute the absolute difference between the current frame and first frame
-        frame_delta = cv2.absdiff(self.target_frame, gray)
-        thresh = cv2.threshold(frame_delta, 25, 255, cv2.THRESH_BINARY)[1]
-
-        # Dilate the thresholded image to fill in holes, then find contours
-        # on thresholded image
-        thresh = cv2.dilate(thresh, None, iterations=2)
-        contours = cv2.findContours(
-            image=thresh,
-            mode=cv2.RETR_EXTERNAL,
-            method=cv2.CHAIN_APPROX_SIMPLE,
-        )
-        contours = imutils.grab_contours(contours)
-
-        # Loop over the contours
-        for contour in contours:
-            # If the contour is too small, ignore it
-            if cv2.contourArea(contour) < self._min_area:
-                continue
-
-            # Compute the bounding box for the contour, draw it on the frame,
-            # and update the text
-            x, y, w, h = cv2.boundingRect(contour)
-            cv2.rectangle(
-                frame,
-                (
-                    x,
-                    y,
-                ),
-                (
-                    x + w,
-                    y + h,
-                ),
-                (
-                    0,
+        # Downscale the frame, cut the regions of interest, convert it to grayscale, and blur it
+        with self._measure('resize'):
+            if self._processing_size is not None:
+                processing_frame = cv2.resize(frame, self._processing_size, interpolation=cv2.INTER_AREA)
+            else:
+                processing_frame = frame
+
+            crop_x, crop_y, crop_w, crop_h = self._crop
+            processing_frame = processing_frame[crop_y : crop_y + crop_h, crop_x : crop_x + crop_w]
+
+        with self._measure('cvtColor'):
+            gray = cv2.cvtColor(processing_frame, cv2.COLOR_BGR2GRAY)
+
+        if self._blur_size:
+            with self._measure('blur'):
+                gray = cv2.GaussianBlur(
+                    gray,
+                    (
+                        self._blur_size,
+                        self._blur_size,
+                    ),
                     0,
-                    255,
-                ),
-                1,
-            )
-            self.is_occupied = True
+                )
 
-        self._draw_result(
-            frame=frame,
-            thresh=thresh,
-            frame_delta=frame_delta,
-            fps=fps,
-        )
+        self.frame = None
+        self.annotation = None
+
+        with self._measure('diff'):
+            # Compute the difference between the current frame and the background
+            frame_delta = self.engine.apply(gray)
+
+            if frame_delta is None:
+                return
+
+            thresh = cv2.threshold(frame_delta, 25, 255, cv2.THRESH_BINARY)[1]
+
+            # Dilate the thresholded image to fill in holes, then find contours
+            # on thresholded image
+            thresh = cv2.dilate(thresh, None, iterations=2)
+
+            if self._mask is not None:
+                thresh = cv2.bitwise_and(thresh, self._mask)
+
+        with self._measure('contours'):
+            contours = cv2.findContours(
+                image=thresh,
+                mode=cv2.RETR_EXTERNAL,
+                method=cv2.CHAIN_APPROX_SIMPLE,
+            )
+            contours = imutils.grab_contours(contours)
+            min_area = self._min_area * self._scale**2
+
+            # Loop over the contours
+            for contour in contours:
+                # If the contour is too small, ignore it
+                if cv2.contourArea(contour) < min_area:
+                    continue
+
+                # Compute the bounding box for the contour in the full frame
+                x, y, w, h = cv2.boundingRect(contour)
+                x = round((x + crop_x) / self._scale)
+                y = round((y + crop_y) / self._scale)
+                w = round(w / self._scale)
+                h = round(h / self._scale)
+                self.boxes.append((x, y, w, h))
+                self.is_occupied = True
+
+        self._annotate(frame, fps=fps)
 
         if self._need_to_show_frames:
-            cv2.waitKey(1)
+            self._show_result(thresh=thresh, frame_delta=frame_delta)
+
+    def _annotate(self, frame: np.ndarray, *, fps: float) -> None:
+        with self._measure('annotate'):
+            self.frame = frame
+            self.annotation = FrameAnnotation(
+                captured_at=datetime.datetime.now(),
+                is_occupied=self.is_occupied,
+                boxes=tuple(self.boxes),
+                fps=fps,
+                max_fps=self._max_fps,
+            )
+
+            if not self.lazy_annotation or self._need_to_show_frames:
+                self.marked_frame = self.annotation.render(frame)
 
     def realese(self) -> None:
         if self._need_to_show_frames:
             cv2.destroyAllWindows()
 
-    def _draw_result(
-        self,
-        *,
-        frame: np.ndarray,
-        thresh: np.ndarray,
-        frame_delta: np.ndarray,
-        fps: float,
-    ) -> None:
-        self.marked_frame = np.copy(frame)
-
-        cv2.putText(
-            img=self.marked_frame,
-            text=f'Status: {"Occupied" if self.is_occupied else "Unoccupied"}',
-            org=(
-                10,
-                20,
-            ),
-            fontFace=cv2.FONT_HERSHEY_SIMPLEX,
-            fontScale=0.5,
-            color=(
-                (
-                    0,
-                    0,
-                    255,
-                )
-                if self.is_occupied
-                else (
-                    0,
-                    255,
-                    0,
-                )
-            ),
-            thickness=1,
-        )
-        current_fps = round(fps, 2)
-        cv2.putText(
-            img=self.marked_frame,
-            text=f'FPS: {current_fps}',
-            org=(
-                10,
-                50,
-            ),
-            fontFace=cv2.FONT_HERSHEY_SIMPLEX,
-            fontScale=0.5,
-            color=(
-                (
-                    0,
-                    0,
-                    255,
-                )
-                if self._max_fps - current_fps > 0.1
-                else (
-                    0,
-                    255,
-                    0,
-                )
-            ),
-            thickness=1,
-        )
-        cv2.putText(
-            img=self.marked_frame,
-            text=datetime.datetime.now().strftime('%d.%m.%Y, %H:%M:%S'),
-            org=(
-                10,
-                frame.shape[0] - 10,
-            ),
-            fontFace=cv2.FONT_HERSHEY_SIMPLEX,
-            fontScale=0.5,
-            color=(
-                0,
-                0,
-                255,
-            ),
-            thickness=1,
-        )
+    def _measure(self, stage: str) -> typing.ContextManager[None]:
+        if self.stage_timer is None:
+            return contextlib.nullcontext()
 
-        if self._need_to_show_frames:
-            cv2.imshow('Security Feed', self.marked_frame)
-            cv2.imshow('Thresh', thresh)
-            cv2.imshow('Frame Delta', frame_delta)
+        return self.stage_timer.measure(stage)
+
+    def _show_result(self, *, thresh: np.ndarray, frame_delta: np.ndarray) -> None:
+        cv2.imshow('Security Feed', self.marked_frame)
+        cv2.imshow('Thresh', thresh)
+        cv2.imshow('Frame Delta', frame_delta)
+        cv2.waitKey(1)
+
+    def _prepare_geometry(self, frame_shape: tuple[int, ...]) -> None:
+        height, width = frame_shape[:2]
+
+        if self.processing_width and self.processing_width < width:
+            self._scale = self.processing_width / width
+            self._processing_size = (
+                self.processing_width,
+                max(1, round(height * self._scale)),
+            )
+        else:
+            self._scale = 1
+            self._processing_size = None
+
+        processing_width, processing_height = self._processing_size or (width, height)
+
+        if self.regions_of_interest:
+            scaled_regions = tuple(self._scale_box(box) for box in self.regions_of_interest)
+            # Regions are clamped to the frame, e.g. they can be outside of it after the resolution is changed.
+            left = min(max(0, min(x for x, y, w, h in scaled_regions)), processing_width)
+            top = min(max(0, min(y for x, y, w, h in scaled_regions)), processing_height)
+            right = max(min(processing_width, max(x + w for x, y, w, h in scaled_regions)), left)
+            bottom = max(min(processing_height, max(y + h for x, y, w, h in scaled_regions)), top)
+            self._crop = (left, top, right - left, bottom - top)
+        else:
+            scaled_regions = ()
+            self._crop = (0, 0, processing_width, processing_height)
+
+        if len(scaled_regions) > 1 or self.masks:
+            self._mask = np.zeros((self._crop[3], self._crop[2]), dtype=np.uint8)
+
+            for box in scaled_regions or (self._crop,):
+                self._fill_box(self._mask, box, 255)
+
+            for box in self.masks:
+                self._fill_box(self._mask, self._scale_box(box), 0)
+        else:
+            self._mask = None
+
+        if self.engine.blur_size:
+            # The kernel must be odd.
+            self._blur_size = max(3, round(self.engine.blur_size * self._scale) // 2 * 2 + 1)
+        else:
+            self._blur_size = 0
+
+        self._frame_shape = frame_shape
+        self.engine.reset()
+
+    def _fill_box(self, mask: np.ndarray, box: Box, value: int) -> None:
+        assert self._crop is not None
+
+        x, y, w, h = box
+        x -= self._crop[0]
+        y -= self._crop[1]
+        mask[max(0, y) : max(0, y + h), max(0, x) : max(0, x + w)] = value
+
+    def _scale_box(self, box: Box) -> Box:
+        return typing.cast(Box, tuple(round(value * self._scale) for value in box))
@@ -0,0 +1,148 @@
+import abc
+import datetime
+
+import cv2
+import numpy as np
+
+
+__all__ = (
+    'MOTION_ENGINES',
+    'BaseMotionEngine',
+    'MOG2Engine',
+    'RunningAverageEngine',
+    'TargetFrameEngine',
+    'create_motion_engine',
+)
+
+
+class BaseMotionEngine(abc.ABC):
+    """
+    Background model for `MotionDetector`.
+    It gets prepared grayscale frames and returns the difference with the background.
+    """
+
+    # Size of the blur kernel for a full-size frame, `0` disables blurring.
+    blur_size: int = 0
+
+    @abc.abstractmethod
+    def apply(self, gray: np.ndarray) -> np.ndarray | None:
+        """
+        Return the frame delta (`uint8`, a higher value is a bigger change)
+        or `None` if the model is not ready to compare frames.
+        """
+
+    @abc.abstractmethod
+    def reset(self) -> None:
+        pass
+
+
+class TargetFrameEngine(BaseMotionEngine):
+    """
+    Compares frames with a target frame, that is replaced every `movement_ttl`.
+    """
+
+    blur_size = 21
+    movement_ttl: datetime.timedelta
+    target_frame: np.ndarray | None = None
+    _last_changed_at: datetime.datetime | None = None
+
+    def __init__(self, *, movement_ttl: datetime.timedelta = datetime.timedelta(seconds=20)) -> None:
+        self.movement_ttl = movement_ttl
+
+    def apply(self, gray: np.ndarray) -> np.ndarray | None:
+        now = datetime.datetime.now()
+
+        if (
+            self.target_frame is None
+            or self._last_changed_at is None
+            or (now - self._last_changed_at) > self.movement_ttl
+        ):
+            self.target_frame = gray
+            self._last_changed_at = now
+            return None
+
+        return cv2.absdiff(self.target_frame, gray)
+
+    def reset(self) -> None:
+        self.target_frame = None
+        self._last_changed_at = None
+
+
+class RunningAverageEngine(BaseMotionEngine):
+    """
+    Compares frames with an exponential running average of previous frames,
+    so slow changes of lighting are absorbed by the background.
+    """
+
+    blur_size = 7
+    alpha: float
+    _background: np.ndarray | None = None
+    _background_uint8: np.ndarray | None = None
+
+    def __init__(self, *, alpha: float = 0.05) -> None:
+        self.alpha = alpha
+
+    def apply(self, gray: np.ndarray) -> np.ndarray | None:
+        if self._background is None:
+            self._background = gray.astype(np.float32)
+            self._background_uint8 = gray.copy()
+            return None
+
+        assert self._background_uint8 is not None
+
+        frame_delta = cv2.absdiff(self._background_uint8, gray)
+        cv2.accumulateWeighted(gray, self._background, self.alpha)
+        cv2.convertScaleAbs(self._background, dst=self._background_uint8)
+
+        return frame_delta
+
+    def reset(self) -> None:
+        self._background = None
+        self._background_uint8 = None
+
+
+class MOG2Engine(BaseMotionEngine):
+    """
+    Gaussian mixture background model of OpenCV.
+    """
+
+    history: int
+    var_threshold: float
+    _subtractor: cv2.BackgroundSubtractorMOG2 | None = None
+
+    def __init__(self, *, history: int = 500, var_threshold: float = 16) -> None:
+        self.history = history
+        self.var_threshold = var_threshold
+
+    def apply(self, gray: np.ndarray) -> np.ndarray | None:
+        is_new = self._subtractor is None
+
+        if self._subtractor is None:
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(
+                history=self.history,
+                varThreshold=self.var_threshold,
+                detectShadows=False,
+            )
+
+        foreground_mask = self._subtractor.apply(gray)
+
+        return None if is_new else foreground_mask
+
+    def reset(self) -> None:
+        self._subtractor = None
+
+
+MOTION_ENGINES: dict[str, type[BaseMotionEngine]] = {
+    'target_frame': TargetFrameEngine,
+    'running_average': RunningAverageEngine,
+    'mog2': MOG2Engine,
+}
+
+
+def create_motion_engine(name: str) -> BaseMotionEngine:
+    try:
+        engine_class = MOTION_ENGINES[name]
+    except KeyError as e:
+        raise ValueError(f'Unknown motion engine "{name}", available: {", ".join(MOTION_ENGINES)}.') from e
+
+    return engine_class()
@@ -0,0 +1,237 @@
+import contextlib
+import logging
+import multiprocessing
+import multiprocessing.connection
+import typing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .annotations import Box, FrameAnnotation
+from .motion_detector import MotionDetector
+
+
+__all__ = ('ProcessMotionDetector',)
+
+
+class SharedFrames:
+    """
+    Slots for frames in shared memory, every slot is a numpy view without copying.
+    """
+
+    shape: tuple[int, ...]
+    dtype: np.dtype
+    slots: np.ndarray
+    _memory: shared_memory.SharedMemory
+    _is_owner: bool
+
+    def __init__(
+        self,
+        *,
+        slots_count: int,
+        shape: tuple[int, ...],
+        dtype: typing.Any,
+        name: str | None = None,
+    ) -> None:
+        self.shape = shape
+        self.dtype = np.dtype(dtype)
+        self._is_owner = name is None
+
+        if name is None:
+            size = slots_count * int(np.prod(shape)) * self.dtype.itemsize
+            self._memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+
+        self.slots = np.ndarray((slots_count, *shape), dtype=self.dtype, buffer=self._memory.buf)
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def close(self) -> None:
+        # Views must be released before closing of the memory.
+        del self.slots
+        self._memory.close()
+
+        if self._is_owner:
+            self._memory.unlink()
+
+
+class ProcessMotionDetector:
+    """
+    Runs `MotionDetector` in a separate process, so detection doesn't share the GIL with the bot.
+
+    Frames are written to shared memory slots, only results go back through a pipe:
+    occupancy, boxes and the slot with the marked frame.
+    Detection is pipelined: `process_new_frame` submits a frame and takes the result of the previous one,
+    so the next frame is processed while the caller handles the result.
+    `marked_frame` is copied out of the slot, so it can be kept after the slot is reused.
+    In the lazy annotation mode only `annotation` comes back and `frame` is the submitted frame itself.
+    """
+
+    frame: np.ndarray | None = None
+    annotation: FrameAnnotation | None = None
+    marked_frame: np.ndarray | None = None
+    is_occupied: bool = False
+    boxes: list[Box]
+    slots_count: int = 2
+    result_timeout: float = 10
+    _detector_kwargs: dict[str, typing.Any]
+    _process: multiprocessing.process.BaseProcess | None = None
+    _connection: multiprocessing.connection.Connection | None = None
+    _frames: SharedFrames | None = None
+    _marked_frames: SharedFrames | None = None
+    _submitted_count: int = 0
+    _pending_frame: np.ndarray | None = None
+
+    def __init__(self, **detector_kwargs) -> None:
+        self._detector_kwargs = {
+            **detector_kwargs,
+            # A window can't be shown from the child process.
+            'show_frames': False,
+        }
+        self.boxes = []
+
+    @property
+    def frame_in_detection(self) -> np.ndarray | None:
+        """
+        The submitted frame, its result comes with the next one.
+        """
+
+        return self._pending_frame
+
+    def process_new_frame(self, frame: np.ndarray, *, fps: float) -> None:
+        if self._frames is None or self._frames.shape != frame.shape or self._frames.dtype != frame.dtype:
+            self.realese()
+            self._start(shape=frame.shape, dtype=frame.dtype)
+
+        assert self._frames is not None
+        assert self._connection is not None
+
+        slot = self._submitted_count % self.slots_count
+        self._frames.slots[slot] = frame
+        self._submitted_count += 1
+
+        if self._pending_frame is not None:
+            self._receive_result()
+
+        self._connection.send((slot, fps))
+        self._pending_frame = frame
+
+    def realese(self) -> None:
+        if self._connection is not None:
+            with contextlib.suppress(OSError):
+                self._connection.send(None)
+
+        if self._process is not None:
+            self._process.join(timeout=self.result_timeout)
+
+            if self._process.is_alive():
+                self._process.terminate()
+
+            self._process = None
+
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+        for shared_frames in (self._frames, self._marked_frames):
+            if shared_frames is not None:
+                shared_frames.close()
+
+        self._frames = None
+        self._marked_frames = None
+        self._pending_frame = None
+
+    def _start(self, *, shape: tuple[int, ...], dtype: np.dtype) -> None:
+        self._frames = SharedFrames(slots_count=self.slots_count, shape=shape, dtype=dtype)
+        self._marked_frames = SharedFrames(slots_count=self.slots_count, shape=shape, dtype=dtype)
+        self._connection, child_connection = multiprocessing.Pipe()
+
+        # Threads of the parent aren't safe to fork.
+        context = multiprocessing.get_context('spawn')
+        self._process = context.Process(
+            target=_run_motion_detector,
+            kwargs={
+                'connection': child_connection,
+                'frames_name': self._frames.name,
+                'marked_frames_name': self._marked_frames.name,
+                'slots_count': self.slots_count,
+                'shape': shape,
+                'dtype': dtype.str,
+                'detector_kwargs': self._detector_kwargs,
+            },
+            name='MotionDetector',
+            daemon=True,
+        )
+        self._process.start()
+        child_connection.close()
+
+    def _receive_result(self) -> None:
+        assert self._connection is not None
+        assert self._marked_frames is not None
+
+        if not self._connection.poll(self.result_timeout):
+            raise TimeoutError('Motion detector process does not respond.')
+
+        try:
+            slot, is_occupied, boxes, annotation, has_marked_frame = self._connection.recv()
+        except EOFError as e:
+            raise RuntimeError('Motion detector process is stopped.') from e
+
+        self.is_occupied = is_occupied
+        self.boxes = boxes
+        self.annotation = annotation
+        self.frame = None if annotation is None else self._pending_frame
+
+        if has_marked_frame:
+            self.marked_frame = np.copy(self._marked_frames.slots[slot])
+
+
+def _run_motion_detector(
+    *,
+    connection: multiprocessing.connection.Connection,
+    frames_name: str,
+    marked_frames_name: str,
+    slots_count: int,
+    shape: tuple[int, ...],
+    dtype: str,
+    detector_kwargs: dict[str, typing.Any],
+) -> None:
+    frames = SharedFrames(slots_count=slots_count, shape=shape, dtype=dtype, name=frames_name)
+    marked_frames = SharedFrames(slots_count=slots_count, shape=shape, dtype=dtype, name=marked_frames_name)
+    motion_detector = MotionDetector(**detector_kwargs)
+
+    try:
+        while True:
+            try:
+                message = connection.recv()
+            except (EOFError, OSError):
+                break
+
+            if message is None:
+                break
+
+            slot, fps = message
+            last_marked_frame = motion_detector.marked_frame
+            motion_detector.process_new_frame(frames.slots[slot], fps=fps)
+            has_marked_frame = motion_detector.marked_frame is not last_marked_frame
+
+            if has_marked_frame:
+                marked_frames.slots[slot] = motion_detector.marked_frame
+
+            connection.send((
+                slot,
+                motion_detector.is_occupied,
+                motion_detector.boxes,
+                motion_detector.annotation,
+                has_marked_frame,
+            ))
+    except Exception as e:
+        logging.exception(e)
+    finally:
+        motion_detector.realese()
+        frames.close()
+        marked_frames.close()
+        connection.close()
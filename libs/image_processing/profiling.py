@@ -0,0 +1,33 @@
+import collections
+import contextlib
+import time
+import typing
+
+
+__all__ = ('StageTimer',)
+
+
+class StageTimer:
+    """
+    Sums time of named stages of frame processing, it's used by benchmarks.
+    """
+
+    totals: collections.defaultdict[str, float]
+    counts: collections.defaultdict[str, int]
+
+    def __init__(self) -> None:
+        self.totals = collections.defaultdict(float)
+        self.counts = collections.defaultdict(int)
+
+    @contextlib.contextmanager
+    def measure(self, stage: str) -> typing.Iterator[None]:
+        started_at = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.totals[stage] += time.perf_counter() - started_at
+            self.counts[stage] += 1
+
+    def get_ms_per_frame(self, frames_count: int) -> dict[str, float]:
+        return {stage: round(total / max(frames_count, 1) * 1_000, 3) for stage, total in self.totals.items()}
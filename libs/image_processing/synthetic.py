@@ -0,0 +1,73 @@
+import typing
+
+import cv2
+import numpy as np
+
+
+__all__ = ('SyntheticScene',)
+
+
+class SyntheticScene:
+    """
+    Noisy static scene with slow lighting drift and a rectangle that moves across the frame in `motion_ranges`
+    (the middle third of `frames_count` by default). Frames are rendered one by one, so long scenes are cheap.
+    """
+
+    frames_count: int
+    width: int
+    height: int
+    motion_ranges: tuple[tuple[int, int], ...]
+    lighting_drift: float
+    _background: np.ndarray
+    _random: np.random.Generator
+
+    def __init__(
+        self,
+        *,
+        frames_count: int = 300,
+        width: int = 640,
+        height: int = 480,
+        seed: int = 0,
+        motion_ranges: typing.Sequence[tuple[int, int]] | None = None,
+        lighting_drift: float = 20,
+    ) -> None:
+        self.frames_count = frames_count
+        self.width = width
+        self.height = height
+        self.lighting_drift = lighting_drift
+
+        if motion_ranges is None:
+            self.motion_ranges = ((frames_count // 3, frames_count * 2 // 3),)
+        else:
+            self.motion_ranges = tuple((start, end) for start, end in motion_ranges)
+
+        self._random = np.random.default_rng(seed)
+        background = self._random.integers(40, 200, size=(height // 8, width // 8, 3), dtype=np.uint8)
+        self._background = cv2.resize(background, (width, height), interpolation=cv2.INTER_CUBIC)
+
+    def has_motion(self, index: int) -> bool:
+        return self._get_motion_range(index % self.frames_count) is not None
+
+    def render(self, index: int) -> np.ndarray:
+        """
+        Render the frame `index`, the scene repeats after `frames_count` frames.
+        """
+
+        index %= self.frames_count
+        brightness = self.lighting_drift * np.sin(index / self.frames_count * np.pi)
+        frame = cv2.add(self._background, np.full_like(self._background, int(brightness)))
+        noise = self._random.integers(0, 8, size=frame.shape, dtype=np.uint8)
+        frame = cv2.add(frame, noise)
+        motion_range = self._get_motion_range(index)
+
+        if motion_range is not None:
+            start, end = motion_range
+            progress = (index - start) / max(end - start, 1)
+            x = int(progress * (self.width - self.width // 5))
+            y = self.height // 3
+            cv2.rectangle(frame, (x, y), (x + self.width // 5, y + self.height // 4), (20, 20, 230), -1)
+
+        return frame
+
+    def _get_motion_range(self, index: int) -> tuple[int, int] | None:
+        return next(((start, end) for start, end in self.motion_ranges if start <= index < end), None)
@@ -1,6 +1,10 @@
 import cv2
+import pytest
 
+from libs.image_processing.benchmarks import check_quality, generate_labelled_clip, run_engines_benchmark
 from libs.image_processing.motion_detector import MotionDetector
+from libs.image_processing.motion_engines import MOTION_ENGINES, create_motion_engine
+from libs.image_processing.process_motion_detector import ProcessMotionDetector
 from project import config
 
 
@@ -17,3 +21,154 @@ def test_motion_detector():
     frame = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_2.png'))
     motion_detector.process_new_frame(frame, fps=1)
     assert motion_detector.is_occupied is True
+
+
+def test_motion_detector_with_processing_width():
+    motion_detector = MotionDetector(
+        max_fps=999999999999999,
+        show_frames=False,
+        processing_width=320,
+    )
+
+    frame = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_1.png'))
+    motion_detector.process_new_frame(frame, fps=1)
+    assert motion_detector.is_occupied is False
+
+    frame = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_2.png'))
+    motion_detector.process_new_frame(frame, fps=1)
+    assert motion_detector.is_occupied is True
+
+    height, width = frame.shape[:2]
+
+    for x, y, w, h in motion_detector.boxes:
+        assert 0 <= x < x + w <= width + 1
+        assert 0 <= y < y + h <= height + 1
+
+
+def test_motion_detector_with_regions():
+    frame_1 = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_1.png'))
+    frame_2 = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_2.png'))
+    height, width = frame_1.shape[:2]
+
+    motion_detector = MotionDetector(
+        max_fps=999999999999999,
+        show_frames=False,
+        regions_of_interest=((0, 0, 50, 50),),
+    )
+    motion_detector.process_new_frame(frame_1.copy(), fps=1)
+    motion_detector.process_new_frame(frame_2.copy(), fps=1)
+    assert motion_detector.is_occupied is False
+
+    motion_detector = MotionDetector(
+        max_fps=999999999999999,
+        show_frames=False,
+        masks=((0, 0, width, height),),
+    )
+    motion_detector.process_new_frame(frame_1.copy(), fps=1)
+    motion_detector.process_new_frame(frame_2.copy(), fps=1)
+    assert motion_detector.is_occupied is False
+
+
+def test_motion_detector_with_regions_outside_frame():
+    frame_1 = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_1.png'))
+    frame_2 = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_2.png'))
+    height, width = frame_1.shape[:2]
+
+    motion_detector = MotionDetector(
+        max_fps=999999999999999,
+        show_frames=False,
+        processing_width=320,
+        # E.g. regions for a higher resolution.
+        regions_of_interest=((width * 2, height * 2, 100, 100),),
+    )
+    motion_detector.process_new_frame(frame_1.copy(), fps=1)
+    motion_detector.process_new_frame(frame_2.copy(), fps=1)
+    assert motion_detector.is_occupied is False
+    assert motion_detector.annotation is not None
+    assert motion_detector.frame is not None
+
+
+@pytest.mark.parametrize('engine_name', tuple(MOTION_ENGINES))
+def test_motion_detector_engines(engine_name):
+    motion_detector = MotionDetector(
+        max_fps=999999999999999,
+        show_frames=False,
+        processing_width=320,
+        engine=create_motion_engine(engine_name),
+    )
+
+    frame = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_1.png'))
+
+    for _ in range(5):
+        motion_detector.process_new_frame(frame.copy(), fps=1)
+        assert motion_detector.is_occupied is False
+
+    frame = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_2.png'))
+    motion_detector.process_new_frame(frame, fps=1)
+    assert motion_detector.is_occupied is True
+
+
+def test_process_motion_detector():
+    motion_detector = ProcessMotionDetector(
+        max_fps=999999999999999,
+        show_frames=False,
+    )
+
+    try:
+        for file_name in ('frame_1.png', 'frame_2.png', 'frame_2.png'):
+            frame = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources' / file_name))
+            motion_detector.process_new_frame(frame, fps=1)
+
+        # Results come with a delay of one frame.
+        assert motion_detector.is_occupied is True
+        assert motion_detector.boxes
+        assert motion_detector.marked_frame is not None
+        assert motion_detector.marked_frame.shape == frame.shape
+    finally:
+        motion_detector.realese()
+
+
+def test_lazy_annotation():
+    motion_detector = MotionDetector(max_fps=10, show_frames=False, lazy_annotation=True)
+    frame_1 = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_1.png'))
+    frame_2 = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_2.png'))
+    raw_frame_2 = frame_2.copy()
+
+    motion_detector.process_new_frame(frame_1, fps=10)
+    assert motion_detector.annotation is None
+
+    motion_detector.process_new_frame(frame_2, fps=10)
+    assert motion_detector.marked_frame is None
+    assert motion_detector.frame is frame_2
+    assert (frame_2 == raw_frame_2).all()
+
+    annotation = motion_detector.annotation
+    assert annotation is not None
+    assert annotation.is_occupied is True
+    assert annotation.boxes == tuple(motion_detector.boxes)
+    assert (annotation.render(frame_2) != frame_2).any()
+
+
+def test_detection_quality_on_synthetic_clips():
+    clips = {
+        'long_motion': generate_labelled_clip(frames_count=90, width=320, height=240),
+        'short_motions': generate_labelled_clip(
+            frames_count=90,
+            width=320,
+            height=240,
+            seed=1,
+            motion_ranges=((20, 30), (60, 66)),
+        ),
+    }
+
+    results = run_engines_benchmark(clips, measure_memory=False)
+
+    assert not check_quality(results, min_precision=0.8, min_recall=0.95)
+    assert set(results['long_motion']['target_frame']['stages_ms_per_frame']) == {
+        'resize',
+        'cvtColor',
+        'blur',
+        'diff',
+        'contours',
+        'annotate',
+    }
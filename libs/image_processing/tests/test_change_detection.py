@@ -0,0 +1,41 @@
+import datetime
+import time
+
+from libs.image_processing.change_detection import FrameChangeDetector, get_difference_hash, get_hamming_distance
+from libs.image_processing.synthetic import SyntheticScene
+
+
+def test_hash_ignores_noise_and_lighting():
+    scene = SyntheticScene(lighting_drift=40)
+    first_hash = get_difference_hash(scene.render(0))
+
+    assert get_hamming_distance(first_hash, get_difference_hash(scene.render(1))) == 0
+    assert get_hamming_distance(first_hash, get_difference_hash(scene.render(99))) == 0
+    assert get_hamming_distance(first_hash, get_difference_hash(scene.render(150))) > 6
+
+
+def test_only_changed_frames_are_accepted():
+    scene = SyntheticScene()
+    detector = FrameChangeDetector(min_distance=6)
+
+    assert detector.accept(scene.render(0))
+    assert not detector.accept(scene.render(50))
+    assert detector.accept(scene.render(150))
+    assert not detector.accept(scene.render(150))
+    assert detector.accept(scene.render(250))
+
+    detector.reset()
+    assert detector.accept(scene.render(250))
+
+
+def test_keep_alive():
+    scene = SyntheticScene()
+    detector = FrameChangeDetector(min_distance=6, keep_alive_interval=datetime.timedelta(seconds=0.1))
+
+    assert detector.accept(scene.render(0))
+    assert not detector.accept(scene.render(1))
+
+    time.sleep(0.1)
+
+    assert detector.accept(scene.render(2))
+    assert not detector.accept(scene.render(3))
@@ -4,10 +4,13 @@ import cv2
 import numpy as np
 
 
-def add_timestamp_in_frame(frame: np.ndarray) -> None:
+def add_timestamp_in_frame(frame: np.ndarray, *, timestamp: datetime.datetime | None = None) -> None:
+    if timestamp is None:
+        timestamp = datetime.datetime.now()
+
     cv2.putText(
         img=frame,
-        text=datetime.datetime.now().strftime('%d.%m.%Y, %H:%M:%S'),
+        text=timestamp.strftime('%d.%m.%Y, %H:%M:%S'),
         org=(
             10,
             frame.shape[0] - 10,
@@ -4,6 +4,11 @@ import typing
 from dataclasses import dataclass
 
 from . import mixins
+from .constants import MessagePriorities
+
+
+if typing.TYPE_CHECKING:
+    from .sending import SendingStats
 
 
 class BaseMessenger(mixins.BaseCVMixin, abc.ABC):
@@ -19,15 +24,25 @@ class BaseMessenger(mixins.BaseCVMixin, abc.ABC):
         pass
 
     @abc.abstractmethod
-    def send_image(self, image: typing.Any, *, caption: str | None = None) -> None:
+    def notify(self, text: str, *, use_markdown: bool = False, priority: int = MessagePriorities.NORMAL) -> None:
+        """
+        Send a notification, notifications that come one after another can be merged into one message.
+        """
+
+    @abc.abstractmethod
+    def send_image(self, image: typing.Any, *, caption: str | None = None, priority: int | None = None) -> None:
         pass
 
     @abc.abstractmethod
-    def send_images(self, images: typing.Any) -> None:
+    def send_images(self, images: typing.Any, *, priority: int | None = None) -> None:
         pass
 
     @abc.abstractmethod
-    def send_file(self, file: typing.Any, *, caption: str | None = None) -> None:
+    def send_video(self, video: typing.Any, *, caption: str | None = None, priority: int | None = None) -> None:
+        pass
+
+    @abc.abstractmethod
+    def send_file(self, file: typing.Any, *, caption: str | None = None, priority: int | None = None) -> None:
         pass
 
     @abc.abstractmethod
@@ -49,6 +64,13 @@ class BaseMessenger(mixins.BaseCVMixin, abc.ABC):
     def close(self) -> None:
         pass
 
+    def collect_sending_stats(self) -> dict[int, 'SendingStats']:
+        """
+        Queue sizes and latencies of sending by priorities, see `SendingQueue.collect_stats`.
+        """
+
+        return {}
+
     @abc.abstractmethod
     def remove_message(self, message_id: int) -> None:
         pass
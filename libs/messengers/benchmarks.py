@@ -0,0 +1,292 @@
+"""
+Per-message overhead of the Telegram send path, measured with a local fake Bot API server.
+
+Scenarios:
+    direct: a coroutine awaits `Bot.send_message` with the shared session, it's the cost of HTTP itself.
+    queued: a thread sends messages through `SendingQueue` like `TelegramMessenger` does,
+        the difference with `direct` is the cost of the thread hop and the queue.
+    new_session: a new HTTP client is opened for every message, i.e. nothing is reused.
+    burst: messages are sent through the queue without waiting, concurrent requests share the pool.
+
+Usage:
+    python3 -m libs.messengers.benchmarks --messages 1000 --output telegram.json
+
+The result is JSON, so runs of different versions can be compared.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import platform
+import statistics
+import sys
+import threading
+import time
+import typing
+
+import telegram
+
+from .sending import SendingQueue
+from .session import create_bot_request, is_http2_available
+from .testing import FakeTelegramServer
+
+
+__all__ = ('run_benchmark',)
+
+TOKEN = '1:fake'  # noqa: S105
+CHAT_ID = 1
+
+
+def _get_percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+
+    values = sorted(values)
+
+    if len(values) == 1:
+        quantiles = [values[0]] * 99
+    else:
+        quantiles = statistics.quantiles(values, n=100, method='inclusive')
+
+    return {
+        'count': len(values),
+        'mean_ms': round(statistics.fmean(values) * 1_000, 3),
+        'p50_ms': round(quantiles[49] * 1_000, 3),
+        'p90_ms': round(quantiles[89] * 1_000, 3),
+        'p99_ms': round(quantiles[98] * 1_000, 3),
+        'max_ms': round(values[-1] * 1_000, 3),
+    }
+
+
+class _Scenario:
+    server: FakeTelegramServer
+    loop: asyncio.AbstractEventLoop
+    pool_size: int
+
+    def __init__(self, *, server: FakeTelegramServer, loop: asyncio.AbstractEventLoop, pool_size: int) -> None:
+        self.server = server
+        self.loop = loop
+        self.pool_size = pool_size
+
+    def create_bot(self) -> telegram.Bot:
+        return telegram.Bot(
+            token=TOKEN,
+            base_url=self.server.base_url,
+            request=create_bot_request(pool_size=self.pool_size),
+        )
+
+    def create_sending_queue(self) -> SendingQueue:
+        # Rate limits of Telegram are turned off, they would hide the overhead.
+        return SendingQueue(
+            loop=self.loop,
+            max_concurrency=self.pool_size,
+            global_rate=1_000_000,
+            chat_rate=1_000_000,
+        )
+
+    def run_coroutine(self, coroutine: typing.Coroutine) -> typing.Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def measure(self, func: typing.Callable[[], dict[str, typing.Any]]) -> dict[str, typing.Any]:
+        requests_count = self.server.requests_count
+        connections_count = self.server.connections_count
+        started_at = time.perf_counter()
+
+        result = func()
+
+        elapsed = time.perf_counter() - started_at
+        sent_messages = self.server.requests_count - requests_count
+
+        return {
+            **result,
+            'elapsed_sec': round(elapsed, 3),
+            'throughput_per_sec': round(sent_messages / elapsed, 3),
+            'opened_connections': self.server.connections_count - connections_count,
+        }
+
+
+def _run_direct(scenario: _Scenario, *, messages: int) -> dict[str, typing.Any]:
+    bot = scenario.create_bot()
+    scenario.run_coroutine(bot.initialize())
+
+    async def send_messages() -> list[float]:
+        latencies = []
+
+        for i in range(messages):
+            started_at = time.perf_counter()
+            await bot.send_message(chat_id=CHAT_ID, text=f'Message {i}')
+            latencies.append(time.perf_counter() - started_at)
+
+        return latencies
+
+    try:
+        return scenario.measure(lambda: {'latency': _get_percentiles(scenario.run_coroutine(send_messages()))})
+    finally:
+        scenario.run_coroutine(bot.shutdown())
+
+
+def _run_queued(scenario: _Scenario, *, messages: int) -> dict[str, typing.Any]:
+    bot = scenario.create_bot()
+    scenario.run_coroutine(bot.initialize())
+    sending_queue = scenario.create_sending_queue()
+
+    def send_messages() -> dict[str, typing.Any]:
+        latencies = []
+
+        for i in range(messages):
+            started_at = time.perf_counter()
+            sending_queue.submit(
+                lambda i=i: bot.send_message(chat_id=CHAT_ID, text=f'Message {i}'),
+                chat_id=CHAT_ID,
+            ).result()
+            latencies.append(time.perf_counter() - started_at)
+
+        return {'latency': _get_percentiles(latencies)}
+
+    try:
+        return scenario.measure(send_messages)
+    finally:
+        sending_queue.close()
+        scenario.run_coroutine(bot.shutdown())
+
+
+def _run_new_session(scenario: _Scenario, *, messages: int) -> dict[str, typing.Any]:
+    async def send_message(i: int) -> None:
+        async with telegram.Bot(token=TOKEN, base_url=scenario.server.base_url) as bot:
+            await bot.send_message(chat_id=CHAT_ID, text=f'Message {i}')
+
+    def send_messages() -> dict[str, typing.Any]:
+        latencies = []
+
+        for i in range(messages):
+            started_at = time.perf_counter()
+            scenario.run_coroutine(send_message(i))
+            latencies.append(time.perf_counter() - started_at)
+
+        return {'latency': _get_percentiles(latencies)}
+
+    return scenario.measure(send_messages)
+
+
+def _run_burst(scenario: _Scenario, *, messages: int) -> dict[str, typing.Any]:
+    bot = scenario.create_bot()
+    scenario.run_coroutine(bot.initialize())
+    sending_queue = scenario.create_sending_queue()
+
+    def send_messages() -> dict[str, typing.Any]:
+        futures = [
+            sending_queue.submit(
+                lambda i=i: bot.send_message(chat_id=CHAT_ID, text=f'Message {i}'),
+                chat_id=CHAT_ID,
+            )
+            for i in range(messages)
+        ]
+
+        for future in futures:
+            future.result()
+
+        stats = sending_queue.collect_stats()
+
+        return {
+            'latency': {
+                f'priority_{priority}': {
+                    'count': item.sent_count,
+                    'mean_ms': None if item.mean_latency is None else round(item.mean_latency * 1_000, 3),
+                    'max_ms': None if item.max_latency is None else round(item.max_latency * 1_000, 3),
+                }
+                for priority, item in stats.items()
+                if item.sent_count
+            },
+        }
+
+    try:
+        return scenario.measure(send_messages)
+    finally:
+        sending_queue.close()
+        scenario.run_coroutine(bot.shutdown())
+
+
+SCENARIOS: dict[str, typing.Callable[..., dict[str, typing.Any]]] = {
+    'direct': _run_direct,
+    'queued': _run_queued,
+    'new_session': _run_new_session,
+    'burst': _run_burst,
+}
+
+
+def run_benchmark(
+    *,
+    messages: int = 1000,
+    pool_size: int = 4,
+    server_latency: float = 0,
+    scenarios: typing.Iterable[str] = tuple(SCENARIOS),
+) -> dict[str, typing.Any]:
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    results = {}
+
+    try:
+        with FakeTelegramServer(latency=server_latency) as server:
+            scenario = _Scenario(server=server, loop=loop, pool_size=pool_size)
+
+            for name in scenarios:
+                results[name] = SCENARIOS[name](scenario, messages=messages)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    result: dict[str, typing.Any] = {
+        'created_at': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'telegram': telegram.__version__,
+        'http2': is_http2_available(),
+        'params': {
+            'messages': messages,
+            'pool_size': pool_size,
+            'server_latency_sec': server_latency,
+        },
+        'scenarios': results,
+    }
+
+    if 'direct' in results and 'queued' in results:
+        result['queue_overhead_ms'] = round(
+            results['queued']['latency']['mean_ms'] - results['direct']['latency']['mean_ms'],
+            3,
+        )
+
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of sending messages to Telegram.')
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--server-latency', type=float, default=0, help='Delay of every response in seconds.')
+    parser.add_argument('--scenario', choices=tuple(SCENARIOS), action='append', help='All scenarios by default.')
+    parser.add_argument('--output', help='Path to save JSON, stdout by default.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    result = run_benchmark(
+        messages=args.messages,
+        pool_size=args.pool_size,
+        server_latency=args.server_latency,
+        scenarios=args.scenario or tuple(SCENARIOS),
+    )
+    dumped_result = json.dumps(result, indent=4)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(dumped_result)
+    else:
+        sys.stdout.write(f'{dumped_result}\n')
+
+
+if __name__ == '__main__':
+    main()
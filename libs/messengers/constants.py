@@ -0,0 +1,19 @@
+__all__ = (
+    'MESSAGE_PRIORITY_NAMES',
+    'MessagePriorities',
+)
+
+
+class MessagePriorities:
+    # Alerts about water leaks, doors and motion.
+    CRITICAL = 1
+    NORMAL = 2
+    # Stats, videos and files.
+    BULK = 3
+
+
+MESSAGE_PRIORITY_NAMES = {
+    MessagePriorities.CRITICAL: 'critical',
+    MessagePriorities.NORMAL: 'normal',
+    MessagePriorities.BULK: 'bulk',
+}
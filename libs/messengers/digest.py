@@ -0,0 +1,127 @@
+import datetime
+import logging
+import threading
+import time
+import typing
+
+from .constants import MessagePriorities
+from .utils import escape_markdown
+
+
+if typing.TYPE_CHECKING:
+    from .base import BaseMessenger
+
+
+__all__ = ('MessageDigest',)
+
+
+class MessageDigest:
+    """
+    A single message is sent right away, messages that come within `window` after it are merged
+    and sent as one message when the window ends. So a burst of notifications is two messages instead of dozens.
+    Critical messages aren't delayed or merged.
+    """
+
+    messenger: 'BaseMessenger'
+    window: datetime.timedelta
+    max_length: int
+    _pending_messages: list[tuple[str, bool]]
+    _window_ends_at: float | None = None
+    _timer: threading.Timer | None = None
+    _lock: threading.RLock
+
+    def __init__(self, messenger: 'BaseMessenger', *, window: datetime.timedelta, max_length: int = 4096) -> None:
+        self.messenger = messenger
+        self.window = window
+        self.max_length = max_length
+        self._pending_messages = []
+        self._lock = threading.RLock()
+
+    def add(self, text: str, *, use_markdown: bool = False, priority: int = MessagePriorities.NORMAL) -> None:
+        if priority <= MessagePriorities.CRITICAL:
+            self._send(text, use_markdown=use_markdown, priority=priority)
+            return
+
+        with self._lock:
+            now = time.monotonic()
+
+            if self._timer is not None or (self._window_ends_at is not None and now < self._window_ends_at):
+                self._pending_messages.append((text, use_markdown))
+
+                if self._timer is None:
+                    assert self._window_ends_at is not None
+                    self._timer = threading.Timer(self._window_ends_at - now, self._flush_in_background)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+                return
+
+            self._window_ends_at = now + self.window.total_seconds()
+
+        self._send(text, use_markdown=use_markdown, priority=priority)
+
+    def flush(self) -> None:
+        """
+        Send merged pending messages right away.
+        """
+
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            pending_messages, self._pending_messages = self._pending_messages, []
+
+            if not pending_messages:
+                return
+
+            self._window_ends_at = time.monotonic() + self.window.total_seconds()
+
+        use_markdown = any(use_markdown for _, use_markdown in pending_messages)
+        texts = [
+            text if is_markdown or not use_markdown else escape_markdown(text) for text, is_markdown in pending_messages
+        ]
+
+        for chunk in self._split(texts):
+            self.messenger.send_message(chunk, use_markdown=use_markdown)
+
+    def _send(self, text: str, *, use_markdown: bool, priority: int) -> None:
+        for chunk in self._split_long_texts([text]):
+            self.messenger.send_message(chunk, use_markdown=use_markdown, priority=priority)
+
+    def _flush_in_background(self) -> None:
+        # Exceptions of timers aren't logged otherwise.
+        try:
+            self.flush()
+        except Exception as e:
+            logging.exception(e)
+
+    def _split(self, texts: list[str]) -> typing.Iterator[str]:
+        chunk = ''
+
+        for text in self._split_long_texts(texts):
+            if chunk and len(chunk) + len(text) + 2 > self.max_length:
+                yield chunk
+                chunk = ''
+
+            chunk = f'{chunk}\n\n{text}' if chunk else text
+
+        if chunk:
+            yield chunk
+
+    def _split_long_texts(self, texts: list[str]) -> typing.Iterator[str]:
+        for text in texts:
+            start = 0
+
+            while len(text) - start > self.max_length:
+                end = start + self.max_length
+                backslashes_count = end - start - len(text[start:end].rstrip('\\'))
+
+                if backslashes_count % 2:
+                    # Markdown escapes like `\.` aren't split.
+                    end -= 1
+
+                yield text[start:end]
+                start = end
+
+            yield text[start:]
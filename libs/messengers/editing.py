@@ -0,0 +1,198 @@
+import dataclasses
+import datetime
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+import typing
+
+from .base import BaseMessenger
+from .constants import MessagePriorities
+
+
+__all__ = (
+    'EditCoalescer',
+    'get_content_hash',
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class _Edit:
+    text: str
+    kwargs: dict[str, typing.Any]
+    content_hash: str
+
+
+class EditCoalescer:
+    """
+    Edits messages in the background not more often than once per `min_interval` for every message.
+    Only the latest edit of a message is sent, edits that don't change the message are skipped.
+
+    `fingerprint` of an edit is compared instead of the text, e.g. to ignore a timestamp in it.
+    Edits are sent with the bulk priority, so they don't hold up new messages of the chat.
+    Edits of all messages are sent by one worker, it's started on demand and stops when nothing is scheduled.
+    """
+
+    messenger: BaseMessenger
+    min_interval: datetime.timedelta
+    _pending_edits: dict[typing.Any, _Edit]
+    _sent_hashes: dict[typing.Any, str]
+    _edited_at: dict[typing.Any, float]
+    _due_at: dict[typing.Any, float]
+    _schedule: list[tuple[float, int, typing.Any]]
+    _counter: typing.Iterator[int]
+    _worker: threading.Thread | None = None
+    _lock: threading.RLock
+    _condition: threading.Condition
+    _sending_lock: threading.Lock
+
+    def __init__(self, messenger: BaseMessenger, *, min_interval: datetime.timedelta) -> None:
+        self.messenger = messenger
+        self.min_interval = min_interval
+        self._pending_edits = {}
+        self._sent_hashes = {}
+        self._edited_at = {}
+        self._due_at = {}
+        self._schedule = []
+        # Breaks ties of the schedule, so message ids are never compared.
+        self._counter = itertools.count()
+        self._lock = threading.RLock()
+        self._condition = threading.Condition(self._lock)
+        self._sending_lock = threading.Lock()
+
+    def edit(self, message_id: typing.Any, text: str, *, fingerprint: typing.Any = None, **kwargs) -> None:
+        """
+        Schedule an edit, `kwargs` are passed to `send_message`.
+        """
+
+        content_hash = get_content_hash(text if fingerprint is None else fingerprint, kwargs)
+
+        with self._lock:
+            if content_hash == self._sent_hashes.get(message_id):
+                self._pending_edits.pop(message_id, None)
+                return
+
+            self._pending_edits[message_id] = _Edit(text=text, kwargs=kwargs, content_hash=content_hash)
+
+            if message_id in self._due_at:
+                return
+
+            edited_at = self._edited_at.get(message_id)
+            now = time.monotonic()
+            due_at = now if edited_at is None else max(edited_at + self.min_interval.total_seconds(), now)
+            self._due_at[message_id] = due_at
+            heapq.heappush(self._schedule, (due_at, next(self._counter), message_id))
+
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._send_scheduled_edits, name='EditCoalescer', daemon=True)
+                self._worker.start()
+            else:
+                self._condition.notify()
+
+    def set_sent(self, message_id: typing.Any, text: str, *, fingerprint: typing.Any = None, **kwargs) -> None:
+        """
+        Remember the content of a message that is sent without the coalescer, so the same edit is skipped.
+        """
+
+        with self._lock:
+            self._sent_hashes[message_id] = get_content_hash(text if fingerprint is None else fingerprint, kwargs)
+            self._edited_at[message_id] = time.monotonic()
+
+    def flush(self, message_id: typing.Any) -> None:
+        """
+        Send the pending edit of the message right away.
+        """
+
+        with self._lock:
+            is_scheduled = self._due_at.pop(message_id, None) is not None
+            self._condition.notify()
+
+        if is_scheduled:
+            self._send_pending_edit(message_id)
+
+    def discard(self, message_id: typing.Any) -> None:
+        """
+        Forget the message, e.g. before it's removed. An edit that is being sent is waited for.
+        """
+
+        with self._lock:
+            self._due_at.pop(message_id, None)
+            self._pending_edits.pop(message_id, None)
+            self._sent_hashes.pop(message_id, None)
+            self._edited_at.pop(message_id, None)
+            self._condition.notify()
+
+        with self._sending_lock:
+            pass
+
+    def _send_scheduled_edits(self) -> None:
+        while True:
+            with self._lock:
+                while True:
+                    if not self._schedule:
+                        self._worker = None
+                        return
+
+                    due_at, _, message_id = self._schedule[0]
+
+                    # The edit is already flushed, discarded or scheduled again.
+                    if self._due_at.get(message_id) != due_at:
+                        heapq.heappop(self._schedule)
+                        continue
+
+                    delay = due_at - time.monotonic()
+
+                    if delay <= 0:
+                        break
+
+                    self._condition.wait(delay)
+
+                heapq.heappop(self._schedule)
+                del self._due_at[message_id]
+
+            self._send_pending_edit(message_id)
+
+    def _send_pending_edit(self, message_id: typing.Any) -> None:
+        with self._sending_lock:
+            with self._lock:
+                edit = self._pending_edits.pop(message_id, None)
+
+                if edit is None or edit.content_hash == self._sent_hashes.get(message_id):
+                    return
+
+                # The interval is counted from the dispatch, so a slow sending doesn't let the next edit come early.
+                self._edited_at[message_id] = time.monotonic()
+
+            try:
+                self.messenger.send_message(
+                    edit.text,
+                    message_id=message_id,
+                    priority=MessagePriorities.BULK,
+                    **edit.kwargs,
+                )
+            except Exception as e:
+                logging.exception(e)
+                return
+
+            with self._lock:
+                self._sent_hashes[message_id] = edit.content_hash
+
+
+def get_content_hash(*values: typing.Any) -> str:
+    """
+    Hash of texts and Telegram objects like keyboards, they are compared by their content.
+    """
+
+    dumped_values = json.dumps(values, sort_keys=True, default=_to_json_value)
+
+    return hashlib.blake2b(dumped_values.encode(), digest_size=16).hexdigest()
+
+
+def _to_json_value(value: typing.Any) -> typing.Any:
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+
+    return repr(value)
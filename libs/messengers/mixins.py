@@ -1,68 +1,89 @@
 import abc
 import io
 import os
-import tempfile
+import typing
 
 import cv2
 import numpy as np
-import telegram
+
+from ..camera.artifacts import BaseMediaArtifact, EncodedClip
+from ..camera.clips import write_clip
 
 
 class BaseCVMixin(abc.ABC):
     @abc.abstractmethod
-    def send_frame(self, frame: np.ndarray, caption: str | None = None) -> None:
+    def send_frame(self, frame: np.ndarray, caption: str | None = None, *, priority: int | None = None) -> None:
         pass
 
     @abc.abstractmethod
     def send_frames_as_video(
-        self, frames: list[np.ndarray], *, fps: int, caption: str | None = None,
+        self,
+        frames: typing.Sequence[np.ndarray],
+        *,
+        fps: int,
+        caption: str | None = None,
+        priority: int | None = None,
+    ) -> None:
+        pass
+
+    @abc.abstractmethod
+    def send_video_file(self, path: str, *, caption: str | None = None, priority: int | None = None) -> None:
+        pass
+
+    @abc.abstractmethod
+    def send_media(
+        self,
+        artifact: BaseMediaArtifact,
+        *,
+        caption: str | None = None,
+        priority: int | None = None,
     ) -> None:
         pass
 
 
 class CVMixin(BaseCVMixin):
-    _bot: telegram.Bot
-    chat_id: int
+    # They are implemented by messengers.
+    send_image: typing.Callable[..., None]
+    send_video: typing.Callable[..., None]
 
-    def send_frame(self, frame: np.ndarray, caption: str | None = None) -> None:
+    def send_frame(self, frame: np.ndarray, caption: str | None = None, *, priority: int | None = None) -> None:
         is_success, buffer = cv2.imencode('.jpg', frame)
-        io_buf = io.BytesIO(buffer)
-        self._bot.send_photo(
-            self.chat_id,
-            photo=io_buf,
-            caption=caption,
-        )
+        self.send_image(io.BytesIO(buffer), caption=caption, priority=priority)
 
     def send_frames_as_video(
-        self, frames: list[np.ndarray], *, fps: int, caption: str | None = None,
+        self,
+        frames: typing.Sequence[np.ndarray],
+        *,
+        fps: int,
+        caption: str | None = None,
+        priority: int | None = None,
     ) -> None:
-        if not frames:
+        if len(frames) == 0:
+            return
+
+        path = write_clip(frames, fps=fps)
+
+        if path is None:
             return
 
-        height, width, layers = frames[0].shape
-        size = (
-            width,
-            height,
-        )
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            filename = os.path.join(temp_dir, 'video.avi')
-
-            video_writer = cv2.VideoWriter(
-                filename=filename,
-                fourcc=cv2.VideoWriter_fourcc(*'DIVX'),
-                fps=fps,
-                frameSize=size,
-            )
-
-            for frame in frames:
-                video_writer.write(frame)
-
-            video_writer.release()
-
-            with open(filename, 'rb') as file:
-                self._bot.send_video(
-                    self.chat_id,
-                    video=file,
-                    caption=caption,
-                )
+        try:
+            self.send_video_file(path, caption=caption, priority=priority)
+        finally:
+            os.remove(path)
+
+    def send_video_file(self, path: str, *, caption: str | None = None, priority: int | None = None) -> None:
+        with open(path, 'rb') as file:
+            self.send_video(file, caption=caption, priority=priority)
+
+    def send_media(
+        self,
+        artifact: BaseMediaArtifact,
+        *,
+        caption: str | None = None,
+        priority: int | None = None,
+    ) -> None:
+        with artifact.open() as file:
+            if isinstance(artifact, EncodedClip):
+                self.send_video(file, caption=caption, priority=priority)
+            else:
+                self.send_image(file, caption=caption, priority=priority)
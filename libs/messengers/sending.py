@@ -0,0 +1,333 @@
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import dataclasses
+import datetime
+import heapq
+import itertools
+import logging
+import threading
+import time
+import typing
+
+from telegram.error import RetryAfter
+
+from ..casual_utils.parallel_computing import synchronized_method
+from .constants import MessagePriorities
+
+
+__all__ = (
+    'RateLimiter',
+    'SendingQueue',
+    'SendingStats',
+)
+
+
+class RateLimiter:
+    """
+    Token bucket: `rate` requests per second with bursts up to `burst` requests.
+    """
+
+    rate: float
+    burst: float
+    _tokens: float
+    _updated_at: float
+    _paused_until: float = 0
+
+    def __init__(self, *, rate: float, burst: float = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated_at = time.monotonic()
+
+    def get_delay(self) -> float:
+        """
+        Seconds until a token is available.
+        """
+
+        now = time.monotonic()
+
+        if now < self._paused_until:
+            return self._paused_until - now + max(1 - self._tokens, 0) / self.rate
+
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+        return max(1 - self._tokens, 0) / self.rate
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        """
+        Give only one token after `seconds`, e.g. when Telegram asks to wait.
+        """
+
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._updated_at = self._paused_until
+        self._tokens = min(self._tokens, 1)
+
+
+@dataclasses.dataclass(frozen=True)
+class SendingStats:
+    queue_size: int
+    sent_count: int
+    mean_latency: float | None
+    max_latency: float | None
+
+
+@dataclasses.dataclass(order=True)
+class _Request:
+    priority: int
+    index: int
+    make_request: typing.Callable[[], typing.Awaitable] = dataclasses.field(compare=False)
+    chat_id: typing.Any = dataclasses.field(compare=False)
+    future: concurrent.futures.Future = dataclasses.field(compare=False)
+    submitted_at: float = dataclasses.field(compare=False)
+    attempt: int = dataclasses.field(default=0, compare=False)
+
+
+class SendingQueue:
+    """
+    Runs requests to Telegram in the event loop `loop` instead of the threads that send messages.
+
+    Up to `max_concurrency` requests are run at once, so a big upload doesn't hold up short messages.
+    Requests are limited by `global_rate` per second for the bot and by `chat_rate` per second for every chat
+    (Telegram allows about 30 and 1). If Telegram still asks to wait, the chat is paused
+    and the request is repeated up to `max_retries` times.
+
+    Queued requests are started by priority, then in the order they were submitted.
+    Bulk requests can't take the last free slot, so alerts don't wait for running uploads.
+    The order of messages of one chat isn't kept: a request with a higher priority overtakes queued ones,
+    and requests that are run at once or repeated can finish in any order.
+    """
+
+    max_concurrency: int
+    max_retries: int
+    chat_rate: float
+    chat_burst: float
+    _loop: asyncio.AbstractEventLoop
+    _requests: list[_Request]
+    _indexes: itertools.count
+    _running_count: int = 0
+    _running_bulk_count: int = 0
+    _has_changes: asyncio.Event
+    _dispatcher: asyncio.Task | None = None
+    _global_limiter: RateLimiter
+    _chat_limiters: dict[typing.Any, RateLimiter]
+    _queue_sizes: collections.Counter[int]
+    _latencies: collections.defaultdict[int, list[float]]
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        *,
+        loop: asyncio.AbstractEventLoop,
+        max_concurrency: int = 4,
+        global_rate: float = 30,
+        chat_rate: float = 1,
+        chat_burst: float = 3,
+        max_retries: int = 3,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self._loop = loop
+        self._requests = []
+        self._indexes = itertools.count()
+        self._has_changes = asyncio.Event()
+        self._global_limiter = RateLimiter(rate=global_rate, burst=global_rate)
+        self._chat_limiters = {}
+        self._queue_sizes = collections.Counter()
+        self._latencies = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        make_request: typing.Callable[[], typing.Awaitable],
+        *,
+        chat_id: typing.Any,
+        priority: int = MessagePriorities.NORMAL,
+    ) -> concurrent.futures.Future:
+        """
+        `make_request` creates a new coroutine for every attempt. It can be called from any thread.
+        """
+
+        request = _Request(
+            priority=priority,
+            index=next(self._indexes),
+            make_request=make_request,
+            chat_id=chat_id,
+            future=concurrent.futures.Future(),
+            submitted_at=time.monotonic(),
+        )
+
+        self._update_queue_size(priority, 1)
+        self._loop.call_soon_threadsafe(self._put, request)
+
+        return request.future
+
+    def close(self) -> None:
+        """
+        Stop the dispatcher and cancel requests that aren't started. It can be called from any thread.
+        """
+
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+
+    @synchronized_method
+    def collect_stats(self) -> dict[int, SendingStats]:
+        """
+        Return the current numbers of requests that wait to be started and latencies (from submitting to the end)
+        of requests that are finished since the previous call.
+        """
+
+        stats = {}
+
+        for priority in sorted(self._queue_sizes.keys() | self._latencies.keys()):
+            latencies = self._latencies.pop(priority, ())
+            stats[priority] = SendingStats(
+                queue_size=self._queue_sizes[priority],
+                sent_count=len(latencies),
+                mean_latency=sum(latencies) / len(latencies) if latencies else None,
+                max_latency=max(latencies, default=None),
+            )
+
+        return stats
+
+    @property
+    def _max_bulk_count(self) -> int:
+        return max(self.max_concurrency - 1, 1)
+
+    def _put(self, request: _Request) -> None:
+        heapq.heappush(self._requests, request)
+        self._has_changes.set()
+
+        if self._dispatcher is None:
+            self._dispatcher = self._loop.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._has_changes.clear()
+            delay = self._start_ready_requests()
+
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._has_changes.wait(), timeout=delay)
+
+    async def _close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._dispatcher
+
+            self._dispatcher = None
+
+        while self._requests:
+            request = heapq.heappop(self._requests)
+            request.future.cancel()
+            self._update_queue_size(request.priority, -1)
+
+    def _start_ready_requests(self) -> float | None:
+        """
+        Start requests that fit the limits and return seconds until the next one can be started.
+        """
+
+        delay = None
+        waiting_requests = []
+
+        while self._requests and self._running_count < self.max_concurrency:
+            request = heapq.heappop(self._requests)
+
+            if request.future.cancelled():
+                self._update_queue_size(request.priority, -1)
+                continue
+
+            if request.priority >= MessagePriorities.BULK and self._running_bulk_count >= self._max_bulk_count:
+                waiting_requests.append(request)
+                continue
+
+            chat_limiter = self._get_chat_limiter(request.chat_id)
+            request_delay = max(chat_limiter.get_delay(), self._global_limiter.get_delay())
+
+            if request_delay > 0:
+                waiting_requests.append(request)
+                delay = request_delay if delay is None else min(delay, request_delay)
+                continue
+
+            chat_limiter.take()
+            self._global_limiter.take()
+            self._update_queue_size(request.priority, -1)
+            self._running_count += 1
+
+            if request.priority >= MessagePriorities.BULK:
+                self._running_bulk_count += 1
+
+            self._loop.create_task(self._run(request))
+
+        for request in waiting_requests:
+            heapq.heappush(self._requests, request)
+
+        return delay
+
+    async def _run(self, request: _Request) -> None:
+        try:
+            if request.attempt == 0 and not request.future.set_running_or_notify_cancel():
+                return
+
+            try:
+                result = await request.make_request()
+            except RetryAfter as e:
+                if request.attempt >= self.max_retries:
+                    self._finish(request, exception=e)
+                    return
+
+                retry_after = e.retry_after
+
+                if isinstance(retry_after, datetime.timedelta):
+                    retry_after = retry_after.total_seconds()
+
+                logging.warning('Telegram asked to wait %s seconds before the next request', retry_after)
+                self._get_chat_limiter(request.chat_id).pause(retry_after)
+                request.attempt += 1
+                self._update_queue_size(request.priority, 1)
+                heapq.heappush(self._requests, request)
+            except Exception as e:
+                self._finish(request, exception=e)
+            else:
+                self._finish(request, result=result)
+        finally:
+            self._running_count -= 1
+
+            if request.priority >= MessagePriorities.BULK:
+                self._running_bulk_count -= 1
+
+            self._has_changes.set()
+
+    def _finish(
+        self,
+        request: _Request,
+        *,
+        result: typing.Any = None,
+        exception: BaseException | None = None,
+    ) -> None:
+        with self._lock:
+            self._latencies[request.priority].append(time.monotonic() - request.submitted_at)
+
+        if exception is None:
+            request.future.set_result(result)
+        else:
+            request.future.set_exception(exception)
+
+    def _update_queue_size(self, priority: int, diff: int) -> None:
+        with self._lock:
+            self._queue_sizes[priority] += diff
+
+    def _get_chat_limiter(self, chat_id: typing.Any) -> RateLimiter:
+        chat_limiter = self._chat_limiters.get(chat_id)
+
+        if chat_limiter is None:
+            chat_limiter = self._chat_limiters[chat_id] = RateLimiter(rate=self.chat_rate, burst=self.chat_burst)
+
+        return chat_limiter
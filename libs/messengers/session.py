@@ -0,0 +1,48 @@
+import importlib.util
+import typing
+
+import httpx
+from telegram.request import HTTPXRequest
+
+
+__all__ = (
+    'create_bot_request',
+    'is_http2_available',
+)
+
+
+def is_http2_available() -> bool:
+    # HTTP/2 needs `h2` that is an optional dependency of `httpx`.
+    return importlib.util.find_spec('h2') is not None
+
+
+def create_bot_request(
+    *,
+    pool_size: int,
+    keep_alive: float = 60,
+    http2: bool | None = None,
+    **kwargs: typing.Any,
+) -> HTTPXRequest:
+    """
+    One HTTP client is shared by all requests of the bot, so connections are reused instead of
+    a new TCP + TLS handshake for every message.
+
+    `pool_size` should match the number of concurrent requests, so they don't wait for a free connection.
+    Idle connections are kept open for `keep_alive` seconds. HTTP/2 is used if it's available.
+    """
+
+    if http2 is None:
+        http2 = is_http2_available()
+
+    return HTTPXRequest(
+        connection_pool_size=pool_size,
+        http_version='2' if http2 else '1.1',
+        httpx_kwargs={
+            'limits': httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=keep_alive,
+            ),
+        },
+        **kwargs,
+    )
@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import functools
 import json
@@ -23,11 +24,15 @@ from telegram.error import (
 
 from project import config
 
-from ..casual_utils.aio import async_to_sync
+from ..casual_utils.aio import async_thread
 from ..casual_utils.parallel_computing import synchronized_method
 from ..casual_utils.time import get_current_time
 from .base import BaseMessenger, ChatInfo, MessageInfo, UserInfo
+from .constants import MessagePriorities
+from .digest import MessageDigest
 from .mixins import CVMixin
+from .sending import SendingQueue, SendingStats
+from .session import create_bot_request
 from .utils import escape_markdown
 
 
@@ -44,9 +49,9 @@ class DEFAULT:
 
 def handel_telegram_exceptions(func: typing.Callable) -> typing.Callable:
     @functools.wraps(func)
-    def wrap_func(*args, **kwargs) -> typing.Any:
+    async def wrap_func(*args, **kwargs) -> typing.Any:
         try:
-            return func(*args, **kwargs)
+            return await func(*args, **kwargs)
         except TelegramNetworkError as e:
             if isinstance(e.__cause__, urllib3.exceptions.HTTPError):
                 logging.warning(e, exc_info=True)
@@ -57,10 +62,62 @@ def handel_telegram_exceptions(func: typing.Callable) -> typing.Callable:
     return wrap_func
 
 
+def queued_request(*, priority: int) -> typing.Callable:
+    """
+    The coroutine is run by the sending queue of the messenger, the method waits for its result.
+    With `wait=False` the method returns a future right away, files must stay open until it's done.
+    `priority` of the method can be changed by callers, e.g. for alerts.
+    """
+
+    default_priority = priority
+
+    def decorator(func: typing.Callable) -> typing.Callable:
+        @functools.wraps(func)
+        def wrap_func(
+            self: 'TelegramMessenger',
+            *args,
+            wait: bool = True,
+            priority: int | None = None,
+            **kwargs,
+        ) -> typing.Any:
+            future = self._sending_queue.submit(
+                functools.partial(func, self, *args, **kwargs),
+                chat_id=self.chat_id,
+                priority=default_priority if priority is None else priority,
+            )
+            return future.result() if wait else future
+
+        return wrap_func
+
+    return decorator
+
+
+def _rewind(file: typing.Any) -> typing.Any:
+    # A request can be repeated, so files are read from the start every time.
+    if hasattr(file, 'seek'):
+        file.seek(0)
+
+    return file
+
+
+def _connect_to_amqp() -> pika.BlockingConnection:
+    return pika.BlockingConnection(
+        pika.ConnectionParameters(host=config.TELEHOOKS_HOST, heartbeat=600),
+    )
+
+
 class TelegramMessenger(CVMixin, BaseMessenger):
+    """
+    Updates are consumed from AMQP, where they are put by the webhook, messages are sent by the sending queue.
+    `api_url`, `amqp_connection_factory` and `sending_queue` can be replaced to run the bot without Telegram
+    and RabbitMQ, see `libs.messengers.testing`.
+    """
+
     chat_id: int = config.TELEGRAM_CHAT_ID
     default_reply_markup: typing.Callable | None
     _bot: telegram.Bot
+    _sending_queue: SendingQueue
+    _digest: MessageDigest
     _updates_offset: int | None = None
     _lock: threading.RLock
     _update_queue: queue.Queue
@@ -68,16 +125,38 @@ class TelegramMessenger(CVMixin, BaseMessenger):
     _last_message_id: typing.Any = None
     _last_sent_at: datetime.datetime | None = None
     _message_handler: typing.Callable
+    _amqp_connection_factory: typing.Callable[[], pika.BlockingConnection]
 
     def __init__(
-        self, *, message_handler: typing.Callable, default_reply_markup: typing.Callable | None = None,
+        self,
+        *,
+        message_handler: typing.Callable,
+        default_reply_markup: typing.Callable | None = None,
+        api_url: str = config.TELEGRAM_API_URL,
+        amqp_connection_factory: typing.Callable[[], pika.BlockingConnection] | None = None,
+        sending_queue: SendingQueue | None = None,
     ) -> None:
         self.default_reply_markup = default_reply_markup
-        self._bot = telegram.Bot(token=config.TELEGRAM_TOKEN)
+        self._sending_queue = sending_queue or SendingQueue(
+            loop=async_thread.get_loop(),
+            max_concurrency=config.TELEGRAM_MAX_CONCURRENT_REQUESTS,
+        )
+        self._bot = telegram.Bot(
+            token=config.TELEGRAM_TOKEN,
+            base_url=api_url,
+            request=create_bot_request(
+                # One more connection for requests that are sent without the queue, e.g. `get_me`.
+                pool_size=self._sending_queue.max_concurrency + 1,
+                keep_alive=config.TELEGRAM_KEEP_ALIVE.total_seconds(),
+            ),
+        )
+        asyncio.run_coroutine_threadsafe(self._open_session(), async_thread.get_loop())
+        self._digest = MessageDigest(self, window=config.TELEGRAM_DIGEST_WINDOW)
         self._lock = threading.RLock()
         self._update_queue = queue.Queue()
-        self._run_worker()
         self._message_handler = message_handler
+        self._amqp_connection_factory = amqp_connection_factory or _connect_to_amqp
+        self._run_worker()
 
     @property
     @synchronized_method
@@ -89,13 +168,22 @@ class TelegramMessenger(CVMixin, BaseMessenger):
     def last_sent_at(self) -> datetime.datetime | None:
         return self._last_sent_at
 
-    @synchronized_method
+    def collect_sending_stats(self) -> dict[int, SendingStats]:
+        return self._sending_queue.collect_stats()
+
     def close(self) -> None:
+        # Not synchronized: requests that are finished in the event loop take the lock, so it can't be held here
+        # while the loop is waited for.
+        self._digest.flush()
         self._worker.join(0)
+        self._sending_queue.close()
+        asyncio.run_coroutine_threadsafe(self._bot.shutdown(), async_thread.get_loop()).result()
 
-    @synchronized_method
+    def notify(self, text: str, *, use_markdown: bool = False, priority: int = MessagePriorities.NORMAL) -> None:
+        self._digest.add(text, use_markdown=use_markdown, priority=priority)
+
+    @queued_request(priority=MessagePriorities.NORMAL)
     @handel_telegram_exceptions
-    @async_to_sync
     async def send_message(
         self,
         text: str,
@@ -126,49 +214,52 @@ class TelegramMessenger(CVMixin, BaseMessenger):
             logging.info('Not sent telegram message: %s', text)
             raise
 
-        self._last_message_id = message_id or result.message_id
-        self._last_sent_at = get_current_time()
+        self._set_last_message(message_id or result.message_id)
 
         return message_id or result.message_id
 
-    @synchronized_method
+    @queued_request(priority=MessagePriorities.BULK)
     @handel_telegram_exceptions
-    @async_to_sync
     async def send_image(self, image: typing.Any, *, caption: str | None = None) -> None:
         result = await self._bot.send_photo(
             self.chat_id,
-            photo=image,
+            photo=_rewind(image),
             caption=caption,
         )
-        self._last_message_id = result.message_id
-        self._last_sent_at = get_current_time()
+        self._set_last_message(result.message_id)
 
-    @synchronized_method
+    @queued_request(priority=MessagePriorities.BULK)
     @handel_telegram_exceptions
-    @async_to_sync
     async def send_images(self, images: typing.Any) -> None:
         if not images:
             return
 
         results = await self._bot.send_media_group(
             self.chat_id,
-            media=[InputMediaPhoto(media=image) for image in images],
+            media=[InputMediaPhoto(media=_rewind(image)) for image in images],
         )
 
-        self._last_message_id = results[-1].message_id
-        self._last_sent_at = get_current_time()
+        self._set_last_message(results[-1].message_id)
 
-    @synchronized_method
+    @queued_request(priority=MessagePriorities.BULK)
+    @handel_telegram_exceptions
+    async def send_video(self, video: typing.Any, *, caption: str | None = None) -> None:
+        result = await self._bot.send_video(
+            self.chat_id,
+            video=_rewind(video),
+            caption=caption,
+        )
+        self._set_last_message(result.message_id)
+
+    @queued_request(priority=MessagePriorities.BULK)
     @handel_telegram_exceptions
-    @async_to_sync
     async def send_file(self, file: typing.Any, *, caption: str | None = None) -> None:
         result = await self._bot.send_document(
             self.chat_id,
-            document=file,
+            document=_rewind(file),
             caption=caption,
         )
-        self._last_message_id = result.message_id
-        self._last_sent_at = get_current_time()
+        self._set_last_message(result.message_id)
 
     def error(self, text: str, *, title: str = 'Error') -> None:
         logging.warning(text)
@@ -179,7 +270,7 @@ class TelegramMessenger(CVMixin, BaseMessenger):
 
     def warning(self, text: str) -> None:
         logging.warning(text)
-        self.send_message(
+        self.notify(
             f'{emojize(":warning:")} *Warning* ```\n{escape_markdown(text, entity_type="pre")}\n```',
             use_markdown=True,
         )
@@ -190,29 +281,41 @@ class TelegramMessenger(CVMixin, BaseMessenger):
             title='Exception',
         )
 
-    @synchronized_method
+    @queued_request(priority=MessagePriorities.NORMAL)
     @handel_telegram_exceptions
-    @async_to_sync
     async def start_typing(self) -> None:
         await self._bot.send_chat_action(chat_id=self.chat_id, action=ChatAction.TYPING)
 
-    @synchronized_method
+    @queued_request(priority=MessagePriorities.NORMAL)
     @handel_telegram_exceptions
-    @async_to_sync
     async def remove_message(self, message_id: int) -> None:
         await self._bot.delete_message(chat_id=self.chat_id, message_id=message_id)
 
-        if self._last_message_id == message_id:
-            self._last_message_id = None
+        with self._lock:
+            if self._last_message_id == message_id:
+                self._last_message_id = None
+
+    def _set_last_message(self, message_id: int) -> None:
+        # Requests are run concurrently and finish in any order, an older message mustn't replace a newer one.
+        with self._lock:
+            if self._last_message_id is None or message_id > self._last_message_id:
+                self._last_message_id = message_id
+
+            self._last_sent_at = get_current_time()
+
+    async def _open_session(self) -> None:
+        # Connection to the Bot API is opened in advance, so the first message doesn't wait for it.
+        try:
+            await self._bot.initialize()
+        except Exception as e:
+            logging.warning('Bot is not initialized: %r', e)
 
     def _run_worker(self) -> None:
         def _worker() -> typing.NoReturn:
             connection = None
             while connection is None:
                 try:
-                    connection = pika.BlockingConnection(
-                        pika.ConnectionParameters(host=config.TELEHOOKS_HOST, heartbeat=600),
-                    )
+                    connection = self._amqp_connection_factory()
                 except AMQPConnectionError as e:
                     logging.warning(e)
                     logging.info('Waiting AMQP...')
@@ -0,0 +1,257 @@
+import collections
+import http.server
+import itertools
+import json
+import queue
+import threading
+import time
+import typing
+import urllib.parse
+
+from pika.spec import Basic, BasicProperties
+
+
+__all__ = (
+    'FakeTelegramServer',
+    'MemoryAMQPChannel',
+    'MemoryAMQPConnection',
+    'create_update_data',
+)
+
+
+class FakeTelegramServer:
+    """
+    Local HTTP server that answers like the Bot API, so the send path can be run without Telegram.
+    It's used as `base_url` of `telegram.Bot`, every request waits for `latency` seconds.
+
+    Usage:
+        with FakeTelegramServer() as server:
+            bot = telegram.Bot(token='1:x', base_url=server.base_url)
+    """
+
+    latency: float
+    on_request: typing.Callable[[str, dict[str, str]], None] | None
+    requests_count: int
+    connections_count: int
+    _server: http.server.ThreadingHTTPServer
+    _thread: threading.Thread | None = None
+    _message_id: int
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0,
+        on_request: typing.Callable[[str, dict[str, str]], None] | None = None,
+    ) -> None:
+        self.latency = latency
+        self.on_request = on_request
+        self.requests_count = 0
+        self.connections_count = 0
+        self._message_id = 0
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), self._create_handler())
+        self._server.daemon_threads = True
+
+    def __enter__(self) -> 'FakeTelegramServer':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/bot'
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+        if self._thread is not None:
+            self._thread.join()
+
+    def get_result(self, method: str, params: dict[str, str]) -> typing.Any:
+        if method == 'getMe':
+            return {'id': 1, 'is_bot': True, 'first_name': 'Bot', 'username': 'fake_bot'}
+
+        if method == 'sendMediaGroup':
+            return [self._create_message(params)]
+
+        if method.startswith(('send', 'edit')) and method != 'sendChatAction':
+            return self._create_message(params)
+
+        return True
+
+    def _create_message(self, params: dict[str, str]) -> dict[str, typing.Any]:
+        with self._lock:
+            self._message_id += 1
+            message_id = self._message_id
+
+        return {
+            'message_id': int(params.get('message_id', message_id)),
+            'date': int(time.time()),
+            'chat': {'id': int(params.get('chat_id', 1)), 'type': 'private'},
+            'text': params.get('text', ''),
+        }
+
+    def _create_handler(self) -> type[http.server.BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            # Connections are kept alive like on the real server.
+            protocol_version = 'HTTP/1.1'
+            # Otherwise small responses wait for delayed ACKs, that is slower than the code that is measured.
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+
+                with server._lock:
+                    server.connections_count += 1
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                method = self.path.rsplit('/', 1)[-1]
+
+                if self.headers.get('Content-Type', '').startswith('application/x-www-form-urlencoded'):
+                    params = dict(urllib.parse.parse_qsl(body.decode()))
+                else:
+                    # Files are sent as multipart, their content isn't needed.
+                    params = {}
+
+                with server._lock:
+                    server.requests_count += 1
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if server.on_request is not None:
+                    server.on_request(method, params)
+
+                response = json.dumps({'ok': True, 'result': server.get_result(method, params)}).encode()
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+class MemoryAMQPConnection:
+    """
+    In-memory stand-in of `pika.BlockingConnection` with only what the messenger uses.
+    Queues are shared by all channels of the connection, so updates can be published from another thread.
+
+    Usage:
+        connection = MemoryAMQPConnection()
+        messenger = TelegramMessenger(..., amqp_connection_factory=lambda: connection)
+        connection.publish('telehooks', json.dumps(create_update_data('/status')).encode())
+    """
+
+    _queues: collections.defaultdict[str, queue.Queue]
+    _channels: list['MemoryAMQPChannel']
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        self._queues = collections.defaultdict(queue.Queue)
+        self._channels = []
+        self._lock = threading.Lock()
+
+    def channel(self) -> 'MemoryAMQPChannel':
+        channel = MemoryAMQPChannel(connection=self)
+
+        with self._lock:
+            self._channels.append(channel)
+
+        return channel
+
+    def get_queue(self, name: str) -> queue.Queue:
+        with self._lock:
+            return self._queues[name]
+
+    def publish(self, queue_name: str, body: bytes) -> None:
+        self.get_queue(queue_name).put(body)
+
+    def close(self) -> None:
+        with self._lock:
+            channels = tuple(self._channels)
+
+        for channel in channels:
+            channel.stop_consuming()
+
+
+class MemoryAMQPChannel:
+    connection: MemoryAMQPConnection
+    _consumers: dict[str, typing.Callable]
+    _is_consuming: threading.Event
+    _delivery_tags: itertools.count
+
+    def __init__(self, *, connection: MemoryAMQPConnection) -> None:
+        self.connection = connection
+        self._consumers = {}
+        self._is_consuming = threading.Event()
+        self._delivery_tags = itertools.count(1)
+
+    def queue_declare(self, queue: str, **kwargs) -> None:
+        self.connection.get_queue(queue)
+
+    def basic_publish(self, exchange: str, routing_key: str, body: bytes, **kwargs) -> None:
+        self.connection.publish(routing_key, body)
+
+    def basic_consume(self, queue: str, on_message_callback: typing.Callable, auto_ack: bool = False, **kwargs) -> str:
+        self._consumers[queue] = on_message_callback
+        return queue
+
+    def start_consuming(self) -> None:
+        """
+        Deliver messages until `stop_consuming`, like the blocking channel of pika.
+        """
+
+        self._is_consuming.set()
+
+        while self._is_consuming.is_set():
+            for queue_name, callback in tuple(self._consumers.items()):
+                try:
+                    body = self.connection.get_queue(queue_name).get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                method = Basic.Deliver(delivery_tag=next(self._delivery_tags), routing_key=queue_name)
+                callback(self, method, BasicProperties(), body)
+
+    def stop_consuming(self) -> None:
+        self._is_consuming.clear()
+
+
+def create_update_data(
+    text: str,
+    *,
+    update_id: int = 1,
+    chat_id: int = 1,
+    username: str = 'user',
+) -> dict[str, typing.Any]:
+    """
+    Bot API update with a text message, like the ones that the webhook puts into AMQP.
+    """
+
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': username, 'username': username},
+            'text': text,
+        },
+    }
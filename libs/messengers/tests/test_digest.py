@@ -0,0 +1,76 @@
+import datetime
+import time
+from unittest.mock import Mock, call
+
+from libs.messengers.constants import MessagePriorities
+from libs.messengers.digest import MessageDigest
+
+
+def test_burst_is_merged():
+    messenger = Mock()
+    digest = MessageDigest(messenger, window=datetime.timedelta(seconds=0.1))
+
+    digest.add('First')
+    digest.add('*Second*', use_markdown=True)
+    digest.add('Third.')
+    digest.add('Water leak!', priority=MessagePriorities.CRITICAL)
+
+    assert messenger.send_message.call_args_list == [
+        call('First', use_markdown=False, priority=MessagePriorities.NORMAL),
+        call('Water leak!', use_markdown=False, priority=MessagePriorities.CRITICAL),
+    ]
+
+    time.sleep(0.15)
+
+    assert messenger.send_message.call_args_list[2:] == [call('*Second*\n\nThird\\.', use_markdown=True)]
+
+    # The next message waits for the end of the window after the merged one.
+    digest.add('Fourth')
+    assert messenger.send_message.call_count == 3
+    digest.flush()
+    assert messenger.send_message.call_args_list[3:] == [call('Fourth', use_markdown=False)]
+
+
+def test_long_digest_is_split():
+    messenger = Mock()
+    digest = MessageDigest(messenger, window=datetime.timedelta(seconds=10), max_length=25)
+
+    for i in range(4):
+        digest.add(f'Message {i}')
+
+    digest.flush()
+
+    assert messenger.send_message.call_args_list[1:] == [
+        call('Message 1\n\nMessage 2', use_markdown=False),
+        call('Message 3', use_markdown=False),
+    ]
+
+
+def test_long_message_is_split():
+    messenger = Mock()
+    digest = MessageDigest(messenger, window=datetime.timedelta(seconds=10), max_length=10)
+
+    digest.add('a' * 25)
+    digest.add('b' * 9 + '\\.', use_markdown=True)
+    digest.flush()
+
+    assert messenger.send_message.call_args_list == [
+        call('a' * 10, use_markdown=False, priority=MessagePriorities.NORMAL),
+        call('a' * 10, use_markdown=False, priority=MessagePriorities.NORMAL),
+        call('a' * 5, use_markdown=False, priority=MessagePriorities.NORMAL),
+        # The escape isn't split.
+        call('b' * 9, use_markdown=True),
+        call('\\.', use_markdown=True),
+    ]
+
+
+def test_failed_flush_is_logged(caplog):
+    messenger = Mock()
+    messenger.send_message.side_effect = [None, RuntimeError('Network is down')]
+    digest = MessageDigest(messenger, window=datetime.timedelta(seconds=0.05))
+
+    digest.add('First')
+    digest.add('Second')
+    time.sleep(0.1)
+
+    assert 'Network is down' in caplog.text
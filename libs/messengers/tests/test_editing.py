@@ -0,0 +1,95 @@
+import datetime
+import threading
+import time
+from unittest.mock import Mock, call
+
+from libs.messengers.constants import MessagePriorities
+from libs.messengers.editing import EditCoalescer
+from libs.messengers.utils import ProgressBar
+
+
+def test_only_latest_edit_is_sent():
+    messenger = Mock()
+    edit_coalescer = EditCoalescer(messenger, min_interval=datetime.timedelta(seconds=0.2))
+
+    edit_coalescer.edit(1, 'first')
+    time.sleep(0.05)
+
+    for i in range(10):
+        edit_coalescer.edit(1, f'second {i}')
+
+    edit_coalescer.edit(2, 'other message')
+    time.sleep(0.3)
+
+    assert messenger.send_message.call_args_list == [
+        call('first', message_id=1, priority=MessagePriorities.BULK),
+        call('other message', message_id=2, priority=MessagePriorities.BULK),
+        call('second 9', message_id=1, priority=MessagePriorities.BULK),
+    ]
+
+
+def test_unchanged_edits_are_skipped():
+    messenger = Mock()
+    edit_coalescer = EditCoalescer(messenger, min_interval=datetime.timedelta(seconds=0))
+
+    edit_coalescer.set_sent(1, 'status', use_markdown=True)
+    edit_coalescer.edit(1, 'status\nUpdated at: 10:00', fingerprint='status', use_markdown=True)
+    edit_coalescer.edit(1, 'status', use_markdown=False)
+    time.sleep(0.05)
+    edit_coalescer.edit(1, 'status', use_markdown=False)
+    time.sleep(0.05)
+
+    assert messenger.send_message.call_args_list == [
+        call('status', message_id=1, priority=MessagePriorities.BULK, use_markdown=False),
+    ]
+
+
+def test_progress_bar():
+    messenger = Mock()
+    messenger.send_message.return_value = 1
+
+    with ProgressBar(messenger, min_edit_interval=datetime.timedelta(seconds=10)) as progress_bar:
+        for i in range(100):
+            progress_bar.set(i / 100)
+
+        time.sleep(0.05)
+
+    # The first edit is delayed after the message is sent, so the bar is removed before it.
+    assert messenger.send_message.call_count == 1
+    messenger.remove_message.assert_called_once_with(1)
+
+
+def test_interval_is_counted_from_dispatch():
+    messenger = Mock()
+    messenger.send_message.side_effect = lambda *args, **kwargs: time.sleep(0.15)
+    edit_coalescer = EditCoalescer(messenger, min_interval=datetime.timedelta(seconds=0.2))
+
+    edit_coalescer.edit(1, 'first')
+    time.sleep(0.05)
+    edit_coalescer.edit(1, 'second')
+    time.sleep(0.1)
+
+    # The second edit is due 0.2 seconds after the first one is dispatched, not after it's sent.
+    assert messenger.send_message.call_count == 1
+    time.sleep(0.15)
+    assert messenger.send_message.call_count == 2
+
+
+def test_one_worker_sends_edits_of_all_messages():
+    messenger = Mock()
+    edit_coalescer = EditCoalescer(messenger, min_interval=datetime.timedelta(seconds=0.1))
+    workers_count = _get_workers_count()
+
+    for message_id in range(20):
+        edit_coalescer.edit(message_id, 'text')
+
+    assert _get_workers_count() <= workers_count + 1
+
+    time.sleep(0.05)
+
+    assert messenger.send_message.call_count == 20
+    assert edit_coalescer._worker is None  # noqa: SLF001
+
+
+def _get_workers_count() -> int:
+    return sum(thread.name == 'EditCoalescer' for thread in threading.enumerate())
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+import typing
+
+import pytest
+from telegram.error import RetryAfter
+
+from libs.messengers.constants import MessagePriorities
+from libs.messengers.sending import SendingQueue
+
+
+@pytest.fixture
+def loop() -> typing.Iterator[asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    yield loop
+
+    async def cancel_tasks() -> None:
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(cancel_tasks(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_slow_request_does_not_block_others(loop: asyncio.AbstractEventLoop) -> None:
+    sending_queue = SendingQueue(loop=loop, max_concurrency=2, chat_rate=100, chat_burst=10)
+    upload_is_done = threading.Event()
+
+    async def upload() -> str:
+        await asyncio.sleep(0.5)
+        upload_is_done.set()
+        return 'video'
+
+    async def send_message() -> str:
+        return 'message'
+
+    upload_future = sending_queue.submit(upload, chat_id=1)
+    message_future = sending_queue.submit(send_message, chat_id=1)
+
+    assert message_future.result(timeout=1) == 'message'
+    assert not upload_is_done.is_set()
+    assert upload_future.result(timeout=1) == 'video'
+
+
+def test_concurrency_is_bounded(loop: asyncio.AbstractEventLoop) -> None:
+    sending_queue = SendingQueue(loop=loop, max_concurrency=2, chat_rate=100, chat_burst=10)
+    running = 0
+    max_running = 0
+
+    async def request() -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+
+    futures = [sending_queue.submit(request, chat_id=1) for _ in range(6)]
+
+    for future in futures:
+        future.result(timeout=1)
+
+    assert max_running == 2
+
+
+def test_chat_rate_limit(loop: asyncio.AbstractEventLoop) -> None:
+    sending_queue = SendingQueue(loop=loop, chat_rate=10, chat_burst=2)
+    started_at: dict[int, list[float]] = {1: [], 2: []}
+
+    def create_request(chat_id: int) -> typing.Callable:
+        async def request() -> None:
+            started_at[chat_id].append(time.monotonic())
+
+        return request
+
+    futures = [sending_queue.submit(create_request(chat_id), chat_id=chat_id) for chat_id in (1, 1, 1, 1, 2, 2)]
+
+    for future in futures:
+        future.result(timeout=1)
+
+    # Two requests are sent right away, the next ones wait for the rate, other chats don't wait.
+    assert started_at[1][3] - started_at[1][0] >= 0.15
+    assert started_at[2][1] - started_at[1][0] < 0.05
+
+
+def test_retry_after(loop: asyncio.AbstractEventLoop) -> None:
+    sending_queue = SendingQueue(loop=loop, max_retries=1)
+    attempts = 0
+
+    async def request() -> int:
+        nonlocal attempts
+        attempts += 1
+
+        if attempts == 1:
+            raise RetryAfter(1)
+
+        return attempts
+
+    started_at = time.monotonic()
+
+    assert sending_queue.submit(request, chat_id=1).result(timeout=3) == 2
+    assert time.monotonic() - started_at >= 1
+
+    async def failed_request() -> None:
+        raise RetryAfter(0)
+
+    with pytest.raises(RetryAfter):
+        sending_queue.submit(failed_request, chat_id=2).result(timeout=1)
+
+
+def test_critical_requests_go_first(loop: asyncio.AbstractEventLoop) -> None:
+    sending_queue = SendingQueue(loop=loop, max_concurrency=2, chat_rate=100, chat_burst=10)
+    started: list[str] = []
+
+    def create_request(name: str, duration: float) -> typing.Callable:
+        async def request() -> None:
+            started.append(name)
+            await asyncio.sleep(duration)
+
+        return request
+
+    futures = [
+        sending_queue.submit(create_request(f'video_{i}', 0.2), chat_id=1, priority=MessagePriorities.BULK)
+        for i in range(3)
+    ]
+    time.sleep(0.05)
+    futures.append(
+        sending_queue.submit(create_request('alert', 0), chat_id=1, priority=MessagePriorities.CRITICAL),
+    )
+
+    # Bulk requests don't take the last slot, so the alert is sent while the first video is uploaded.
+    assert futures[-1].result(timeout=0.1) is None
+    assert started == ['video_0', 'alert']
+
+    stats = sending_queue.collect_stats()
+    assert stats[MessagePriorities.BULK].queue_size == 2
+    assert stats[MessagePriorities.CRITICAL].queue_size == 0
+    assert stats[MessagePriorities.CRITICAL].sent_count == 1
+    assert stats[MessagePriorities.CRITICAL].mean_latency is not None
+
+    for future in futures:
+        future.result(timeout=1)
+
+    assert started == ['video_0', 'alert', 'video_1', 'video_2']
+
+    stats = sending_queue.collect_stats()
+    assert stats[MessagePriorities.BULK].queue_size == 0
+    assert stats[MessagePriorities.BULK].sent_count == 3
+    assert stats[MessagePriorities.CRITICAL].sent_count == 0
+
+
+def test_close(loop: asyncio.AbstractEventLoop) -> None:
+    sending_queue = SendingQueue(loop=loop, max_concurrency=1)
+
+    async def request() -> None:
+        await asyncio.sleep(0.1)
+
+    running_future = sending_queue.submit(request, chat_id=1)
+    queued_future = sending_queue.submit(request, chat_id=1)
+    time.sleep(0.05)
+
+    sending_queue.close()
+
+    assert queued_future.cancelled()
+    assert running_future.result(timeout=1) is None
+    assert sending_queue.collect_stats()[MessagePriorities.NORMAL].queue_size == 0
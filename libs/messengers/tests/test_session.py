@@ -0,0 +1,24 @@
+import asyncio
+
+import telegram
+
+from libs.messengers.session import create_bot_request
+from libs.messengers.testing import FakeTelegramServer
+
+
+def test_connections_are_reused() -> None:
+    async def send_messages(base_url: str) -> None:
+        bot = telegram.Bot(token='1:x', base_url=base_url, request=create_bot_request(pool_size=2))  # noqa: S106
+
+        async with bot:
+            await asyncio.gather(*(bot.send_message(chat_id=1, text=f'Message {i}') for i in range(10)))
+            message = await bot.send_message(chat_id=1, text='Last message')
+
+        assert message.text == 'Last message'
+
+    with FakeTelegramServer(latency=0.01) as server:
+        asyncio.run(send_messages(server.base_url))
+
+    # `getMe` + 11 messages, concurrent requests don't open more connections than the pool has.
+    assert server.requests_count == 12
+    assert server.connections_count <= 2
@@ -0,0 +1,68 @@
+import json
+import threading
+
+from libs.casual_utils.aio import async_thread
+from libs.messengers.base import MessageInfo
+from libs.messengers.sending import SendingQueue
+from libs.messengers.telegram import TelegramMessenger
+from libs.messengers.testing import FakeTelegramServer, MemoryAMQPConnection, create_update_data
+from project import config
+
+
+def test_updates_are_replayed() -> None:
+    updates_count = 100
+    replies: list[str] = []
+    all_replied = threading.Event()
+
+    def on_request(method: str, params: dict[str, str]) -> None:
+        if method == 'sendMessage':
+            replies.append(params['text'])
+
+            if len(replies) == updates_count:
+                all_replied.set()
+
+    def reply(message: MessageInfo, *, messanger: TelegramMessenger) -> None:
+        messanger.send_message(f'Reply to {message.text}')
+
+    amqp_connection = MemoryAMQPConnection()
+
+    with FakeTelegramServer(on_request=on_request) as server:
+        messenger = TelegramMessenger(
+            message_handler=reply,
+            api_url=server.base_url,
+            amqp_connection_factory=lambda: amqp_connection,
+            sending_queue=SendingQueue(loop=async_thread.get_loop(), chat_rate=1_000, global_rate=1_000),
+        )
+
+        for i in range(updates_count):
+            update_data = create_update_data(f'/command_{i}', update_id=i, chat_id=config.TELEGRAM_CHAT_ID)
+            amqp_connection.publish(config.TELEHOOKS_QUEUE_NAME, json.dumps(update_data).encode())
+
+        assert all_replied.wait(5)
+
+        amqp_connection.close()
+        messenger.close()
+
+    assert sorted(replies) == sorted(f'Reply to /command_{i}' for i in range(updates_count))
+
+
+def test_last_message_id_is_not_moved_back() -> None:
+    amqp_connection = MemoryAMQPConnection()
+
+    with FakeTelegramServer() as server:
+        messenger = TelegramMessenger(
+            message_handler=lambda *args, **kwargs: None,
+            api_url=server.base_url,
+            amqp_connection_factory=lambda: amqp_connection,
+            sending_queue=SendingQueue(loop=async_thread.get_loop(), chat_rate=1_000, global_rate=1_000),
+        )
+
+        try:
+            first_message_id = messenger.send_message('First')
+            second_message_id = messenger.send_message('Second')
+            messenger.send_message('First, edited', message_id=first_message_id)
+        finally:
+            amqp_connection.close()
+            messenger.close()
+
+    assert messenger.last_message_id == second_message_id
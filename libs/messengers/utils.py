@@ -1,31 +1,40 @@
+import datetime
 
 from telegram.helpers import escape_markdown as telegram_escape_markdown
 
 from .base import BaseMessenger
+from .editing import EditCoalescer
 
 
 class ProgressBar:
+    """
+    Progress in a message, it's edited in the background, so frequent updates don't slow down the work.
+    """
+
     messenger: BaseMessenger
     title: str
     message_id: int
-    _last_progress: float
-    _last_title: str
-
-    def __init__(self, messenger: BaseMessenger, *, title: str | None = None) -> None:
+    _edit_coalescer: EditCoalescer
+
+    def __init__(
+        self,
+        messenger: BaseMessenger,
+        *,
+        title: str | None = None,
+        min_edit_interval: datetime.timedelta = datetime.timedelta(seconds=1),
+    ) -> None:
         self.messenger = messenger
         self.title = '' if title is None else f'{title}\n'
+        self._edit_coalescer = EditCoalescer(messenger, min_interval=min_edit_interval)
 
     def __enter__(self) -> 'ProgressBar':
-        self.message_id = self.messenger.send_message(
-            f'{self.title}{self._generate_bar(0)}',
-            reply_markup=None,
-            use_markdown=True,
-        )
-        self._last_progress = 0
-        self._last_title = self.title
+        text = f'{self.title}{self._generate_bar(0)}'
+        self.message_id = self.messenger.send_message(text, reply_markup=None, use_markdown=True)
+        self._edit_coalescer.set_sent(self.message_id, text, reply_markup=None, use_markdown=True)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._edit_coalescer.discard(self.message_id)
         self.messenger.remove_message(self.message_id)
 
     def set(self, progress: float, *, title: str | None = None) -> None:
@@ -35,17 +44,12 @@ class ProgressBar:
             else:
                 self.title = f'{title}\n'
 
-        progress = round(progress, 2)
-
-        if self._last_title != self.title or self._last_progress != progress:
-            self.messenger.send_message(
-                f'{self.title}{self._generate_bar(progress)}',
-                message_id=self.message_id,
-                reply_markup=None,
-                use_markdown=True,
-            )
-            self._last_progress = progress
-            self._last_title = self.title
+        self._edit_coalescer.edit(
+            self.message_id,
+            f'{self.title}{self._generate_bar(progress)}',
+            reply_markup=None,
+            use_markdown=True,
+        )
 
     @staticmethod
     def _generate_bar(progress: float) -> str:
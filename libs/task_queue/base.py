@@ -17,6 +17,9 @@ class BaseTaskQueue(abc.ABC):
     def __len__(self) -> int:
         pass
 
+    def count_ready(self) -> int:
+        return len(self)
+
     def put(
         self,
         target: typing.Callable,
@@ -25,6 +28,7 @@ class BaseTaskQueue(abc.ABC):
         *,
         priority: int = TaskPriorities.MEDIUM,
         run_after: datetime.datetime | None = None,
+        options: dict[str, typing.Any] | None = None,
     ) -> Task | None:
         if run_after is None:
             run_after = datetime.datetime.now()
@@ -35,6 +39,7 @@ class BaseTaskQueue(abc.ABC):
             args=args,
             kwargs=kwargs,
             run_after=run_after,
+            options=options,
         )
 
         self.put_task(task)
@@ -49,6 +54,9 @@ class BaseTaskQueue(abc.ABC):
     def get(self) -> Task | None:
         pass
 
+    def close(self) -> None:
+        pass
+
 
 class BaseWorker(abc.ABC):
     @property
@@ -56,6 +64,10 @@ class BaseWorker(abc.ABC):
     def is_run(self) -> bool:
         pass
 
+    @property
+    def workers_count(self) -> int:
+        return 1
+
     @abc.abstractmethod
     def run(self) -> None:
         pass
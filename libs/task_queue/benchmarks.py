@@ -0,0 +1,342 @@
+"""
+Synthetic workloads for `MemTaskQueue` + `ThreadWorker`.
+
+Usage:
+    python3 -m libs.task_queue.benchmarks --duration 30 --output task_queue.json
+
+The result is JSON, so runs of different versions can be compared.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import typing
+
+from .base import BaseTaskQueue
+from .constants import TaskPriorities
+from .dto import IntervalTask, Task
+from .implementation import MemTaskQueue, ThreadWorker
+from .middlewares import BaseMiddleware, ConcreteRetries, ExceptionLogging, SupportOfRetries
+
+
+__all__ = (
+    'DispatchTracking',
+    'run_benchmark',
+    'run_task_cost_benchmark',
+)
+
+
+class DispatchTracking(BaseMiddleware):
+    """
+    Collects the delay between `run_after` and the real start of a task, grouped by priority.
+    """
+
+    latencies: dict[int, list[float]]
+    finished: int
+    _lock: threading.Lock
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self.latencies = {}
+        self.finished = 0
+        self._lock = threading.Lock()
+
+    def process(self, *, task: Task, task_queue: BaseTaskQueue, handler: typing.Callable) -> typing.Any:
+        latency = (datetime.datetime.now() - task.run_after).total_seconds()
+
+        with self._lock:
+            self.latencies.setdefault(task.priority, []).append(latency)
+
+        try:
+            return handler(task=task)
+        finally:
+            with self._lock:
+                self.finished += 1
+
+
+class FastRetries(ConcreteRetries):
+    # The real policy waits for minutes, that is too long for a benchmark.
+    @staticmethod
+    def _get_retry_delay(retries: int) -> datetime.timedelta:
+        return datetime.timedelta(milliseconds=50 * retries)
+
+
+class FlakyTarget:
+    failures: int
+    _lock: threading.Lock
+
+    def __init__(self, *, failures: int) -> None:
+        self.failures = failures
+        self._lock = threading.Lock()
+
+    def __call__(self) -> None:
+        with self._lock:
+            if self.failures > 0:
+                self.failures -= 1
+                raise ConnectionError('Synthetic failure')
+
+        _io_work(0.005)
+
+
+def _io_work(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def _cpu_work(seconds: float) -> None:
+    finished_at = time.perf_counter() + seconds
+
+    while time.perf_counter() < finished_at:
+        pass
+
+
+def _sensor_task() -> None:
+    _io_work(random.uniform(0.001, 0.01))
+
+
+def _interval_task() -> None:
+    _cpu_work(0.0005)
+    _io_work(0.002)
+
+
+def _maintenance_task() -> None:
+    _cpu_work(0.2)
+    _io_work(random.uniform(0.5, 1.5))
+
+
+def _get_percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+
+    values = sorted(values)
+
+    if len(values) == 1:
+        quantiles = [values[0]] * 99
+    else:
+        quantiles = statistics.quantiles(values, n=100, method='inclusive')
+
+    return {
+        'count': len(values),
+        'p50_ms': round(quantiles[49] * 1_000, 3),
+        'p90_ms': round(quantiles[89] * 1_000, 3),
+        'p99_ms': round(quantiles[98] * 1_000, 3),
+        'max_ms': round(values[-1] * 1_000, 3),
+    }
+
+
+def run_benchmark(
+    *,
+    duration: float = 30,
+    interval_tasks: int = 300,
+    interval: datetime.timedelta = datetime.timedelta(seconds=10),
+    sensor_bursts: int = 10,
+    sensor_burst_size: int = 50,
+    maintenance_tasks: int = 5,
+    flaky_tasks: int = 20,
+    workers_count: int = 2,
+    max_workers_count: int | None = None,
+) -> dict[str, typing.Any]:
+    random.seed(0)
+
+    task_queue = MemTaskQueue()
+    dispatch_tracking = DispatchTracking()
+    worker = ThreadWorker(
+        task_queue=task_queue,
+        middlewares=(
+            dispatch_tracking,
+            ExceptionLogging(),
+            SupportOfRetries(),
+            FastRetries(exceptions=(ConnectionError,)),
+        ),
+        count=workers_count,
+        max_count=max_workers_count,
+    )
+
+    now = datetime.datetime.now()
+    repeatable_tasks = []
+
+    for i in range(interval_tasks):
+        repeatable_task = IntervalTask(
+            target=_interval_task,
+            priority=TaskPriorities.LOW if i % 3 else TaskPriorities.MEDIUM,
+            interval=interval,
+            run_after=now + interval * random.random(),
+        )
+        repeatable_tasks.append(repeatable_task)
+        task_queue.put_task(repeatable_task)
+
+    for i in range(maintenance_tasks):
+        task_queue.put(
+            _maintenance_task,
+            priority=TaskPriorities.LOW,
+            run_after=now + datetime.timedelta(seconds=duration * i / maintenance_tasks),
+        )
+
+    for i in range(flaky_tasks):
+        task_queue.put(
+            FlakyTarget(failures=i % 4),
+            priority=TaskPriorities.MEDIUM,
+            run_after=now + datetime.timedelta(seconds=duration * i / flaky_tasks / 2),
+        )
+
+    started_at = time.perf_counter()
+    started_cpu_at = time.process_time()
+    worker.run()
+
+    for i in range(sensor_bursts):
+        time.sleep(max(0.0, started_at + duration * i / sensor_bursts - time.perf_counter()))
+
+        for _ in range(sensor_burst_size):
+            task_queue.put(_sensor_task, priority=TaskPriorities.HIGH)
+
+    time.sleep(max(0.0, started_at + duration - time.perf_counter()))
+
+    for repeatable_task in repeatable_tasks:
+        repeatable_task.cancel()
+
+    worker.stop()
+
+    elapsed = time.perf_counter() - started_at
+    cpu_time = time.process_time() - started_cpu_at
+    all_latencies = [latency for latencies in dispatch_tracking.latencies.values() for latency in latencies]
+
+    return {
+        'created_at': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'params': {
+            'duration': duration,
+            'interval_tasks': interval_tasks,
+            'interval_sec': interval.total_seconds(),
+            'sensor_bursts': sensor_bursts,
+            'sensor_burst_size': sensor_burst_size,
+            'maintenance_tasks': maintenance_tasks,
+            'flaky_tasks': flaky_tasks,
+            'workers_count': workers_count,
+            'max_workers_count': max_workers_count,
+        },
+        'elapsed_sec': round(elapsed, 3),
+        'executed_tasks': dispatch_tracking.finished,
+        'throughput_per_sec': round(dispatch_tracking.finished / elapsed, 3),
+        'cpu_sec': round(cpu_time, 3),
+        'cpu_percent': round(cpu_time / elapsed * 100, 2),
+        'not_executed_tasks': len(task_queue),
+        'dispatch_latency': {
+            'all': _get_percentiles(all_latencies),
+            **{
+                f'priority_{priority}': _get_percentiles(latencies)
+                for priority, latencies in sorted(dispatch_tracking.latencies.items())
+            },
+        },
+    }
+
+
+def run_task_cost_benchmark(*, count: int = 100_000) -> dict[str, typing.Any]:
+    """
+    Cost of one task on the hot path: creating + enqueuing, dequeuing and running.
+    """
+
+    run_after = datetime.datetime.now() - datetime.timedelta(seconds=1)
+
+    task_queue = MemTaskQueue()
+    tracemalloc.start()
+
+    for _ in range(count):
+        task_queue.put(_noop, priority=TaskPriorities.MEDIUM, run_after=run_after)
+
+    allocated_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    task_queue = MemTaskQueue()
+    started_at = time.perf_counter_ns()
+
+    for _ in range(count):
+        task_queue.put(_noop, priority=TaskPriorities.MEDIUM, run_after=run_after)
+
+    enqueue_time = time.perf_counter_ns() - started_at
+
+    tasks = []
+    started_at = time.perf_counter_ns()
+
+    for _ in range(count):
+        tasks.append(task_queue.get())
+
+    dequeue_time = time.perf_counter_ns() - started_at
+    started_at = time.perf_counter_ns()
+
+    for task in tasks:
+        task.run()
+
+    run_time = time.perf_counter_ns() - started_at
+
+    return {
+        'count': count,
+        'enqueue_ns_per_task': round(enqueue_time / count),
+        'dequeue_ns_per_task': round(dequeue_time / count),
+        'run_ns_per_task': round(run_time / count),
+        'bytes_per_queued_task': round(allocated_memory / count),
+    }
+
+
+def _noop() -> None:
+    pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of the task queue.')
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--interval-tasks', type=int, default=300)
+    parser.add_argument('--interval', type=float, default=10, help='Interval of repeatable tasks in seconds.')
+    parser.add_argument('--sensor-bursts', type=int, default=10)
+    parser.add_argument('--sensor-burst-size', type=int, default=50)
+    parser.add_argument('--maintenance-tasks', type=int, default=5)
+    parser.add_argument('--flaky-tasks', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-workers', type=int, default=None)
+    parser.add_argument('--task-cost-count', type=int, default=100_000)
+    parser.add_argument('--mode', choices=('all', 'workload', 'task_cost'), default='all')
+    parser.add_argument('--output', help='Path to save JSON, stdout by default.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    result: dict[str, typing.Any] = {}
+
+    if args.mode in ('all', 'task_cost'):
+        result['task_cost'] = run_task_cost_benchmark(count=args.task_cost_count)
+
+    if args.mode in ('all', 'workload'):
+        result['workload'] = _run_workload_benchmark(args)
+
+    dumped_result = json.dumps(result, indent=4)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(dumped_result)
+    else:
+        sys.stdout.write(f'{dumped_result}\n')
+
+
+def _run_workload_benchmark(args: argparse.Namespace) -> dict[str, typing.Any]:
+    return run_benchmark(
+        duration=args.duration,
+        interval_tasks=args.interval_tasks,
+        interval=datetime.timedelta(seconds=args.interval),
+        sensor_bursts=args.sensor_bursts,
+        sensor_burst_size=args.sensor_burst_size,
+        maintenance_tasks=args.maintenance_tasks,
+        flaky_tasks=args.flaky_tasks,
+        workers_count=args.workers,
+        max_workers_count=args.max_workers,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,6 @@ from dataclasses import dataclass, field
 
 from crontab import CronTab
 
-from ..casual_utils.parallel_computing import synchronized_method
 from . import constants, exceptions
 
 
@@ -20,44 +19,49 @@ __all__ = (
 )
 
 
-@dataclass(kw_only=True, eq=False)
+# Status transitions are tiny, so one lock for all tasks is cheaper than a lock per task.
+_status_lock = threading.Lock()
+
+
+@dataclass(kw_only=True, eq=False, slots=True)
 class Task:
     priority: int
     target: typing.Callable
-    args: tuple = field(
-        default_factory=tuple,
-    )
+    args: tuple = ()
     kwargs: dict[str, typing.Any] = field(
         default_factory=dict,
     )
     run_after: datetime.datetime = field(
         default_factory=datetime.datetime.now,
     )
-    result: typing.Any = field(
-        default=None,
-    )
-    error: Exception | None = field(
-        default=None,
-    )
-    options: dict[str, typing.Any] = field(
-        default_factory=dict,
-    )
-    _status: str = field(
-        default=constants.TaskStatuses.CREATED,
-    )
-    _lock: threading.RLock = field(
-        default_factory=threading.RLock,
-    )
+    result: typing.Any = None
+    error: Exception | None = None
+    options: dict[str, typing.Any] | None = None
+    status: str = constants.TaskStatuses.CREATED
+
+    def set_status(self, status: str, *, unless: str | None = None) -> bool:
+        """
+        Set the status atomically. It's skipped if the current status is `unless`.
+        """
+
+        with _status_lock:
+            if unless is not None and self.status == unless:
+                return False
+
+            self.status = status
+            return True
 
-    @property
-    @synchronized_method
-    def status(self) -> str:
-        return self._status
+    def get_option(self, name: str, default: typing.Any = None) -> typing.Any:
+        if self.options is None:
+            return default
 
-    @status.setter
-    @synchronized_method
-    def status(self, value: str) -> None:
-        self._status = value
+        return self.options.get(name, default)
+
+    def set_option(self, name: str, value: typing.Any) -> None:
+        if self.options is None:
+            self.options = {}
+
+        self.options[name] = value
 
     @classmethod
     def create(
@@ -78,38 +82,35 @@ class Task:
         return task
 
     def run(self) -> None:
-        with self._lock:
-            if self._status == constants.TaskStatuses.CANCELED:
-                return
+        if not self.set_status(constants.TaskStatuses.STARTED, unless=constants.TaskStatuses.CANCELED):
+            return
 
-            self._status = constants.TaskStatuses.STARTED
-            self.result = None
-            self.error = None
+        self.result = None
+        self.error = None
 
         try:
             self.result = self.call()
         except exceptions.BaseTaskQueueException:
-            self.status = constants.TaskStatuses.FINISHED
+            self.set_status(constants.TaskStatuses.FINISHED, unless=constants.TaskStatuses.CANCELED)
             raise
         except Exception as e:
-            with self._lock:
-                self.error = e
-                self._status = constants.TaskStatuses.FAILED
-
+            self.error = e
+            self.set_status(constants.TaskStatuses.FAILED, unless=constants.TaskStatuses.CANCELED)
             raise
         else:
-            self.status = constants.TaskStatuses.FINISHED
+            self.set_status(constants.TaskStatuses.FINISHED, unless=constants.TaskStatuses.CANCELED)
 
     def call(self) -> typing.Any:
         return self.target(*self.args, **self.kwargs)
 
-    @synchronized_method
     def cancel(self) -> bool:
-        is_success = self._status in (
-            constants.TaskStatuses.CREATED,
-            constants.TaskStatuses.PENDING,
-        )
-        self._status = constants.TaskStatuses.CANCELED
+        with _status_lock:
+            is_success = self.status in (
+                constants.TaskStatuses.CREATED,
+                constants.TaskStatuses.PENDING,
+            )
+            self.status = constants.TaskStatuses.CANCELED
+
         return is_success
 
     def __lt__(self, other: 'Task') -> bool:
@@ -118,10 +119,10 @@ class Task:
 
 
 class RepeatableTask(Task, abc.ABC):
-    pass
+    __slots__ = ()
 
 
-@dataclass(kw_only=True, eq=False)
+@dataclass(kw_only=True, eq=False, slots=True)
 class IntervalTask(RepeatableTask):
     interval: datetime.timedelta
     run_immediately: bool = field(
@@ -136,17 +137,17 @@ class IntervalTask(RepeatableTask):
         logging.debug('Run interval %s', self)
 
         try:
-            super().run()
+            # Zero-argument `super()` doesn't work in slotted dataclasses.
+            super(IntervalTask, self).run()
         except Exception as e:
             logging.exception(e)
 
-        with self._lock:
-            if self._status != constants.TaskStatuses.CANCELED:
-                logging.debug('Repeat %s after %s', self, self.run_after)
-                raise exceptions.RepeatTask(delay=self.interval)
+        if self.status != constants.TaskStatuses.CANCELED:
+            logging.debug('Repeat %s after %s', self, self.run_after)
+            raise exceptions.RepeatTask(delay=self.interval)
 
 
-@dataclass(kw_only=True, eq=False)
+@dataclass(kw_only=True, eq=False, slots=True)
 class DelayedTask(RepeatableTask):
     delay: datetime.timedelta
 
@@ -154,7 +155,7 @@ class DelayedTask(RepeatableTask):
         self.run_after = self.run_after + self.delay
 
 
-@dataclass(kw_only=True, eq=False)
+@dataclass(kw_only=True, eq=False, slots=True)
 class ScheduledTask(RepeatableTask):
     crontab: CronTab
 
@@ -165,11 +166,11 @@ class ScheduledTask(RepeatableTask):
         logging.debug('Run scheduled %s', self)
 
         try:
-            super().run()
+            # Zero-argument `super()` doesn't work in slotted dataclasses.
+            super(ScheduledTask, self).run()
         except Exception as e:
             logging.exception(e)
 
-        with self._lock:
-            if self._status != constants.TaskStatuses.CANCELED:
-                logging.debug('Repeat %s after %s', self, self.run_after)
-                raise exceptions.RepeatTask(after=self.crontab.next(default_utc=False, return_datetime=True))
+        if self.status != constants.TaskStatuses.CANCELED:
+            logging.debug('Repeat %s after %s', self, self.run_after)
+            raise exceptions.RepeatTask(after=self.crontab.next(default_utc=False, return_datetime=True))
@@ -1 +1,2 @@
+from .sqlite import *
 from .thread import *
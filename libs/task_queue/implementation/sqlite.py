@@ -0,0 +1,215 @@
+import datetime
+import importlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import typing
+import uuid
+
+from .. import constants
+from ..dto import Task
+from .thread import MemTaskQueue
+
+
+__all__ = (
+    'SQLiteTaskQueue',
+    'get_target_path',
+    'resolve_target_path',
+)
+
+
+def get_target_path(target: typing.Callable) -> str | None:
+    """
+    Return `module:qualname` for a module-level function or a static/class method.
+    Returns `None` for lambdas, closures and bound methods of instances, because they can't be restored.
+    """
+
+    module_name = getattr(target, '__module__', None)
+    qualname = getattr(target, '__qualname__', None)
+
+    if not module_name or not qualname or '<' in qualname:
+        return None
+
+    target_path = f'{module_name}:{qualname}'
+
+    try:
+        resolved_target = resolve_target_path(target_path)
+    except (ImportError, AttributeError):
+        return None
+
+    if resolved_target != target:
+        return None
+
+    return target_path
+
+
+def resolve_target_path(target_path: str) -> typing.Callable:
+    module_name, qualname = target_path.split(':', 1)
+    target = importlib.import_module(module_name)
+
+    for attr in qualname.split('.'):
+        target = getattr(target, attr)
+
+    return target
+
+
+class SQLiteTaskQueue(MemTaskQueue):
+    """
+    In-memory queue that mirrors serializable tasks into SQLite, so they survive restarts.
+
+    Only plain `Task` objects with an importable target and JSON-serializable args are stored.
+    Writes are collected in memory and flushed in one transaction from the consumer side.
+
+    A task is removed from SQLite when it's taken from the queue, not when it's done, so delivery is at-most-once:
+    a task that is running while the process stops isn't restored.
+    """
+
+    batch_size: int
+    flush_interval: datetime.timedelta
+    _storage_lock: threading.Lock
+    _flush_lock: threading.Lock
+    _connection: sqlite3.Connection
+    _pending_writes: dict[str, tuple | None]
+    _last_flushed_at: datetime.datetime
+    _storage_id_key: str = 'storage_id'
+
+    def __init__(
+        self,
+        *,
+        path: str | os.PathLike,
+        batch_size: int = 50,
+        flush_interval: datetime.timedelta = datetime.timedelta(seconds=1),
+    ) -> None:
+        super().__init__()
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._storage_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending_writes = {}
+        self._last_flushed_at = datetime.datetime.now()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS tasks ('
+            'id TEXT PRIMARY KEY, '
+            'target TEXT NOT NULL, '
+            'args TEXT NOT NULL, '
+            'kwargs TEXT NOT NULL, '
+            'priority INTEGER NOT NULL, '
+            'run_after TEXT NOT NULL'
+            ')',
+        )
+        self._connection.commit()
+
+        self._load()
+
+    def put_task(self, task: Task) -> None:
+        super().put_task(task)
+
+        row = self._serialize(task)
+
+        if row is None:
+            return
+
+        with self._storage_lock:
+            self._pending_writes[row[0]] = row
+            need_to_flush = len(self._pending_writes) >= self.batch_size
+
+        if need_to_flush:
+            self.flush()
+
+    def get(self) -> Task | None:
+        task = super().get()
+
+        storage_id = None if task is None else task.get_option(self._storage_id_key)
+
+        if storage_id is not None:
+            with self._storage_lock:
+                self._pending_writes[storage_id] = None
+
+        if datetime.datetime.now() - self._last_flushed_at >= self.flush_interval:
+            self.flush()
+
+        return task
+
+    def flush(self) -> None:
+        # Flushes are written one by one, otherwise an older snapshot can overwrite a newer one.
+        # `_storage_lock` is held only to take the snapshot, so `put_task` and `get` don't wait for SQLite.
+        with self._flush_lock:
+            with self._storage_lock:
+                pending_writes = self._pending_writes
+                self._pending_writes = {}
+                self._last_flushed_at = datetime.datetime.now()
+
+            if not pending_writes:
+                return
+
+            rows_to_save = tuple(row for row in pending_writes.values() if row is not None)
+            ids_to_remove = tuple((storage_id,) for storage_id, row in pending_writes.items() if row is None)
+
+            with self._connection:
+                self._connection.executemany('INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?)', rows_to_save)
+                self._connection.executemany('DELETE FROM tasks WHERE id = ?', ids_to_remove)
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+
+    def _serialize(self, task: Task) -> tuple | None:
+        if type(task) is not Task or task.status == constants.TaskStatuses.CANCELED:
+            return None
+
+        target_path = get_target_path(task.target)
+
+        if target_path is None:
+            return None
+
+        try:
+            args = json.dumps(task.args)
+            kwargs = json.dumps(task.kwargs)
+        except (TypeError, ValueError):
+            logging.debug('Task %s is not serializable, keep it only in memory', task)
+            return None
+
+        storage_id = task.get_option(self._storage_id_key)
+
+        if storage_id is None:
+            storage_id = uuid.uuid4().hex
+            task.set_option(self._storage_id_key, storage_id)
+
+        return (
+            storage_id,
+            target_path,
+            args,
+            kwargs,
+            task.priority,
+            task.run_after.isoformat(),
+        )
+
+    def _load(self) -> None:
+        rows = self._connection.execute(
+            'SELECT id, target, args, kwargs, priority, run_after FROM tasks ORDER BY run_after',
+        ).fetchall()
+
+        for storage_id, target_path, args, kwargs, priority, run_after in rows:
+            try:
+                target = resolve_target_path(target_path)
+            except (ImportError, AttributeError, ValueError):
+                logging.warning('Cannot restore task with target "%s", skip it', target_path)
+                self._pending_writes[storage_id] = None
+                continue
+
+            task = Task.create(
+                target=target,
+                args=tuple(json.loads(args)),
+                kwargs=json.loads(kwargs),
+                priority=priority,
+                run_after=datetime.datetime.fromisoformat(run_after),
+                options={self._storage_id_key: storage_id},
+            )
+            # Only the in-memory part, the row is already saved.
+            MemTaskQueue.put_task(self, task)
+
+        logging.info('Restored %s tasks from SQLite', len(rows) - len(self._pending_writes))
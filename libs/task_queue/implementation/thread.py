@@ -5,7 +5,7 @@ import threading
 import typing
 from functools import partial
 from heapq import heappop, heappush
-from time import sleep
+from time import perf_counter, sleep, thread_time
 
 from ...casual_utils.parallel_computing import synchronized_method
 from .. import constants
@@ -35,7 +35,7 @@ class MemTaskQueue(BaseTaskQueue):
 
     @synchronized_method
     def put_task(self, task: Task) -> None:
-        task.status = constants.TaskStatuses.PENDING
+        task.set_status(constants.TaskStatuses.PENDING, unless=constants.TaskStatuses.CANCELED)
         logging.debug('Put %s to MemTaskQueue', task)
 
         if task.priority not in self._queue_map:
@@ -65,15 +65,34 @@ class MemTaskQueue(BaseTaskQueue):
 
         return None
 
+    @synchronized_method
+    def count_ready(self) -> int:
+        now = datetime.datetime.now()
+        return sum(1 for queue in self._queue_map.values() for run_after, _ in queue if run_after <= now)
+
 
 class ThreadWorker(BaseWorker):
+    """
+    Runs tasks in a pool of threads.
+    The pool grows up to `max_count` when ready tasks wait and the running tasks mostly block (I/O),
+    and idle threads shrink back to `count` after `idle_timeout`.
+    """
+
     task_queue: BaseTaskQueue
     middlewares: tuple[BaseMiddleware, ...]
+    min_count: int
+    max_count: int
+    idle_timeout: datetime.timedelta
+    blocking_ratio: float
     _middleware_chain: typing.Callable
     _is_run: threading.Event
-    _threads: tuple[threading.Thread, ...]
+    _threads: list[threading.Thread]
+    _busy_count: int
+    _lock: threading.Lock
     _on_close: typing.Callable | None
     _getting_delay: float = 0.1
+    _min_blocking_ratio_for_growth: float = 0.5
+    _blocking_ratio_smoothing: float = 0.1
 
     def __init__(
         self,
@@ -82,11 +101,21 @@ class ThreadWorker(BaseWorker):
         on_close: typing.Callable | None = None,
         middlewares: tuple[BaseMiddleware, ...],
         count: int = 1,
+        max_count: int | None = None,
+        idle_timeout: datetime.timedelta = datetime.timedelta(seconds=30),
     ) -> None:
         self.task_queue = task_queue
         self.middlewares = middlewares
+        self.min_count = count
+        self.max_count = count if max_count is None else max(count, max_count)
+        self.idle_timeout = idle_timeout
+        # Tasks are expected to be I/O-bound until it's measured.
+        self.blocking_ratio = 1
         self._on_close = on_close
         self._is_run = threading.Event()
+        self._threads = []
+        self._busy_count = 0
+        self._lock = threading.Lock()
 
         self._middleware_chain = self._run_task
 
@@ -97,12 +126,15 @@ class ThreadWorker(BaseWorker):
                 task_queue=self.task_queue,
             )
 
-        self._threads = tuple(threading.Thread(target=self._process_tasks) for _ in range(count))
-
     @property
     def is_run(self) -> bool:
         return self._is_run.is_set()
 
+    @property
+    @synchronized_method
+    def workers_count(self) -> int:
+        return len(self._threads)
+
     def run(self) -> None:
         if self.is_run:
             return
@@ -110,8 +142,9 @@ class ThreadWorker(BaseWorker):
         logging.debug(f'Run {self.__class__.__name__}...')
         self._is_run.set()
 
-        for thread in self._threads:
-            thread.start()
+        with self._lock:
+            for _ in range(self.min_count):
+                self._start_thread()
 
         logging.debug(f'{self.__class__.__name__} is ready.')
 
@@ -124,30 +157,98 @@ class ThreadWorker(BaseWorker):
         if len(self.task_queue):
             logging.warning(f'TaskQueue is stopped, but there are {len(self.task_queue)} tasks in queue.')
 
-        for thread in self._threads:
+        with self._lock:
+            threads = tuple(self._threads)
+
+        for thread in threads:
             thread.join()
 
+    def _start_thread(self) -> None:
+        thread = threading.Thread(target=self._process_tasks)
+        self._threads.append(thread)
+        thread.start()
+
     def _process_tasks(self) -> None:
         logging.debug('Running worker #%s...', threading.get_native_id())
 
+        idle_since = datetime.datetime.now()
+
         while self.is_run:
             task = self.task_queue.get()
 
             if task is None:
+                if self._can_shrink(idle_since=idle_since):
+                    break
+
                 logging.debug('Wait tasks')
                 sleep(self._getting_delay)
                 continue
 
             logging.debug('Get %s from MemTaskQueue', task)
 
+            self._grow_if_needed()
+
+            with self._lock:
+                self._busy_count += 1
+
+            started_at = perf_counter()
+            started_at_in_thread = thread_time()
+
             try:
                 self._middleware_chain(task=task)
             except Exception as e:
                 logging.exception(e)
+            finally:
+                self._update_blocking_ratio(
+                    wall_time=perf_counter() - started_at,
+                    cpu_time=thread_time() - started_at_in_thread,
+                )
+
+                with self._lock:
+                    self._busy_count -= 1
+
+            idle_since = datetime.datetime.now()
 
         if self._on_close is not None:
             self._on_close()
 
+    def _can_shrink(self, *, idle_since: datetime.datetime) -> bool:
+        if datetime.datetime.now() - idle_since < self.idle_timeout:
+            return False
+
+        with self._lock:
+            if len(self._threads) <= self.min_count:
+                return False
+
+            self._threads.remove(threading.current_thread())
+
+        logging.debug('Stop idle worker #%s', threading.get_native_id())
+
+        return True
+
+    def _grow_if_needed(self) -> None:
+        if self.max_count <= self.min_count:
+            return
+
+        with self._lock:
+            if (
+                len(self._threads) < self.max_count
+                and self._busy_count + 1 >= len(self._threads)
+                and self.blocking_ratio >= self._min_blocking_ratio_for_growth
+                and self.task_queue.count_ready() > 0
+            ):
+                logging.debug('Add a worker, %s tasks are ready', self.task_queue.count_ready())
+                self._start_thread()
+
+    def _update_blocking_ratio(self, *, wall_time: float, cpu_time: float) -> None:
+        if wall_time <= 0:
+            return
+
+        blocking_ratio = max(0.0, 1 - cpu_time / wall_time)
+
+        with self._lock:
+            self.blocking_ratio += (blocking_ratio - self.blocking_ratio) * self._blocking_ratio_smoothing
+
     @staticmethod
     def _run_task(*, task: Task) -> typing.Any:
         return task.run()
@@ -23,10 +23,33 @@ class SupportOfRetries(BaseMiddleware):
             return handler(task=task)
         except task_exceptions.RepeatTask as e:
             task.run_after = e.after
+            # It's only increased, so `SupportOfFinalizers` can see that this run is repeated.
+            task.set_option('repeats', task.get_option('repeats', 0) + 1)
             logging.debug('Retrying %s', task)
             task_queue.put_task(task)
 
 
+class SupportOfFinalizers(BaseMiddleware):
+    """
+    Call the `on_done` option of the task once, after its last run, i.e. a run that isn't repeated.
+    Need to be the first one, so the result of all other middlewares is known.
+    """
+
+    def process(self, *, task: Task, task_queue: BaseTaskQueue, handler: typing.Callable) -> typing.Any:
+        repeats = task.get_option('repeats', 0)
+
+        try:
+            return handler(task=task)
+        finally:
+            on_done = task.get_option('on_done')
+
+            if on_done is not None and task.get_option('repeats', 0) == repeats:
+                try:
+                    on_done()
+                except Exception as e:
+                    logging.exception(e)
+
+
 class ConcreteRetries(BaseMiddleware):
     """
     Need to be before `SupportOfRetries`.
@@ -49,22 +72,20 @@ class ConcreteRetries(BaseMiddleware):
         try:
             result = handler(task=task)
         except self.exceptions as e:
-            with task._lock:  # NOQA
-                retries = task.options.setdefault('retries', 0)
-                retries += 1
+            retries = task.get_option('retries', 0) + 1
 
-                task.options['retries'] = retries
-                task.options['exception'] = e
+            task.set_option('retries', retries)
+            task.set_option('exception', e)
 
-                if retries <= self.max_retries:
-                    logging.debug('Retry policy for %s', task)
-                    raise task_exceptions.RepeatTask(delay=self._get_retry_delay(retries)) from e
+            if retries <= self.max_retries:
+                logging.debug('Retry policy for %s', task)
+                raise task_exceptions.RepeatTask(delay=self._get_retry_delay(retries)) from e
 
-                task.error = e
-                task.status = constants.TaskStatuses.FAILED
+            task.error = e
+            task.set_status(constants.TaskStatuses.FAILED, unless=constants.TaskStatuses.CANCELED)
         else:
-            with task._lock:  # NOQA
-                task.options['retries'] = 0
+            if task.get_option('retries'):
+                task.set_option('retries', 0)
 
         return result
 
@@ -90,5 +111,5 @@ class ExceptionLogging(BaseMiddleware):
         except Exception as e:
             logging.exception(e)
             task.error = e
-            task.status = constants.TaskStatuses.FAILED
+            task.set_status(constants.TaskStatuses.FAILED, unless=constants.TaskStatuses.CANCELED)
             return None
@@ -0,0 +1,68 @@
+import datetime
+
+from libs.task_queue import IntervalTask, MemTaskQueue, Task, TaskStatuses
+from libs.task_queue.exceptions import RepeatTask
+from libs.task_queue.middlewares import ExceptionLogging, SupportOfFinalizers, SupportOfRetries
+
+
+def test_task_has_no_dict():
+    task = Task.create(target=print, priority=1)
+
+    assert not hasattr(task, '__dict__')
+    assert task.options is None
+
+
+def test_task_cancel_in_run_is_kept():
+    def _cancel() -> None:
+        task.cancel()
+
+    task = IntervalTask(target=_cancel, priority=1, interval=datetime.timedelta(seconds=1))
+
+    task.run()
+
+    assert task.status == TaskStatuses.CANCELED
+    assert task.set_status(TaskStatuses.PENDING, unless=TaskStatuses.CANCELED) is False
+
+
+def test_failed_task_is_kept_canceled():
+    def _cancel_and_fail() -> None:
+        task.cancel()
+        raise RuntimeError
+
+    task = Task.create(target=_cancel_and_fail, priority=1)
+
+    ExceptionLogging().process(task=task, task_queue=MemTaskQueue(), handler=lambda task: task.run())
+
+    assert task.status == TaskStatuses.CANCELED
+
+
+def test_finalizer_is_called_after_last_run():
+    runs = []
+    finalized_after_runs = []
+
+    def _repeat_once() -> None:
+        runs.append(len(runs))
+
+        if len(runs) == 1:
+            raise RepeatTask
+
+    task_queue = MemTaskQueue()
+    task_queue.put(_repeat_once, options={'on_done': lambda: finalized_after_runs.append(len(runs))})
+
+    def _process(task: Task) -> None:
+        SupportOfFinalizers().process(
+            task=task,
+            task_queue=task_queue,
+            handler=lambda task: SupportOfRetries().process(
+                task=task,
+                task_queue=task_queue,
+                handler=lambda task: task.run(),
+            ),
+        )
+
+    _process(task_queue.get())
+    assert finalized_after_runs == []
+
+    _process(task_queue.get())
+    assert finalized_after_runs == [2]
+    assert task_queue.get() is None
@@ -0,0 +1,38 @@
+import datetime
+
+from libs.task_queue import SQLiteTaskQueue, TaskPriorities
+
+
+calls = []
+
+
+def collect(value: int, *, label: str) -> None:
+    calls.append((value, label))
+
+
+def test_sqlite_task_queue_restores_tasks(tmp_path):
+    path = tmp_path / 'tasks.sqlite3'
+    now = datetime.datetime.now()
+
+    task_queue = SQLiteTaskQueue(path=path)
+    task_queue.put(collect, args=(2,), kwargs={'label': 'b'}, run_after=now - datetime.timedelta(seconds=1))
+    task_queue.put(collect, args=(1,), kwargs={'label': 'a'}, run_after=now - datetime.timedelta(seconds=2))
+    task_queue.put(lambda: None, priority=TaskPriorities.HIGH)
+    task_queue.close()
+
+    task_queue = SQLiteTaskQueue(path=path)
+    assert len(task_queue) == 2
+
+    task_queue.get().run()
+    task_queue.close()
+    assert calls == [(1, 'a')]
+
+    task_queue = SQLiteTaskQueue(path=path)
+    assert len(task_queue) == 1
+
+    task_queue.get().run()
+    assert task_queue.get() is None
+    task_queue.close()
+    assert calls == [(1, 'a'), (2, 'b')]
+
+    assert len(SQLiteTaskQueue(path=path)) == 0
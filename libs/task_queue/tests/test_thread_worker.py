@@ -0,0 +1,42 @@
+import datetime
+import threading
+import time
+
+from libs.task_queue import MemTaskQueue, ThreadWorker
+
+
+def test_thread_worker_grows_and_shrinks():
+    task_queue = MemTaskQueue()
+    worker = ThreadWorker(
+        task_queue=task_queue,
+        middlewares=(),
+        count=1,
+        max_count=4,
+        idle_timeout=datetime.timedelta(milliseconds=200),
+    )
+    release = threading.Event()
+
+    for _ in range(8):
+        task_queue.put(release.wait, args=(5,))
+
+    worker.run()
+
+    try:
+        deadline = time.monotonic() + 5
+
+        while worker.workers_count < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert worker.workers_count == 4
+
+        release.set()
+        deadline = time.monotonic() + 5
+
+        while worker.workers_count > 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert worker.workers_count == 1
+        assert len(task_queue) == 0
+    finally:
+        release.set()
+        worker.stop()
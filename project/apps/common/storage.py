@@ -1,12 +1,14 @@
 import io
 import os
-import tempfile
+import typing
 
 import cv2
 import dropbox
 import numpy as np
 from pandas import DataFrame
 
+from libs.camera.artifacts import BaseMediaArtifact
+from libs.camera.clips import write_clip
 from libs.casual_utils.parallel_computing import single_synchronized
 from libs.casual_utils.time import get_current_time
 
@@ -19,7 +21,7 @@ class FileStorage:
     def __init__(self) -> None:
         self._dbx = dropbox.Dropbox(config.DROPBOX_TOKEN, timeout=10)
 
-    def upload(self, file_name: str, content: bytes) -> None:
+    def upload(self, file_name: str, content: bytes | typing.BinaryIO) -> None:
         now = get_current_time()
         file_name = os.path.join('/', now.strftime('%Y-%m-%d'), file_name)
         self._dbx.files_upload(content, file_name)
@@ -35,33 +37,27 @@ class FileStorage:
         io_buf = io.BytesIO(buffer)
         self.upload(file_name=file_name, content=io_buf.read())
 
-    def upload_frames_as_video(self, file_name: str, frames: np.ndarray, fps: int) -> None:
-        if not frames:
+    def upload_frames_as_video(self, file_name: str, frames: typing.Sequence[np.ndarray], fps: int) -> None:
+        if len(frames) == 0:
             return
 
-        height, width, layers = frames[0].shape
-        size = (
-            width,
-            height,
-        )
+        path = write_clip(frames, fps=fps)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            filename = os.path.join(temp_dir, 'video.avi')
-
-            video_writer = cv2.VideoWriter(
-                filename=filename,
-                fourcc=cv2.VideoWriter_fourcc(*'DIVX'),
-                fps=fps,
-                frameSize=size,
-            )
+        if path is None:
+            return
 
-            for frame in frames:
-                video_writer.write(frame)
+        try:
+            self.upload_file(file_name=file_name, path=path)
+        finally:
+            os.remove(path)
 
-            video_writer.release()
+    def upload_file(self, file_name: str, path: str) -> None:
+        with open(path, 'rb') as file:
+            self.upload(file_name=file_name, content=file)
 
-            with open(filename, 'rb') as file:
-                self.upload(file_name=file_name, content=file.read())
+    def upload_media(self, file_name: str, artifact: BaseMediaArtifact) -> None:
+        with artifact.open() as file:
+            self.upload(file_name=file_name, content=file)
 
     @single_synchronized
     def remove_old_folders(self):
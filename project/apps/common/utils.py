@@ -8,7 +8,6 @@ import typing
 from collections import deque, namedtuple
 from contextlib import contextmanager
 
-import cv2
 import matplotlib as mpl
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
@@ -210,14 +209,6 @@ def interpolate_old_values_for_stats(
     return new_stats
 
 
-def camera_is_available(src: int) -> bool:
-    cap = cv2.VideoCapture(src)
-    is_available = cap.isOpened()
-    cap.release()
-
-    return is_available
-
-
 def get_weather() -> dict:
     return requests.get(config.OPENWEATHERMAP_URL, timeout=10).json()
 
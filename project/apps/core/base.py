@@ -7,7 +7,7 @@ from dataclasses import dataclass, field
 from libs.casual_utils.caching import memoized_method
 from libs.messengers.base import BaseMessenger
 from libs.smart_devices.base import BaseSmartDevice
-from libs.task_queue import BaseTaskQueue
+from libs.task_queue import BaseTaskQueue, BaseWorker
 from libs.task_queue.dto import RepeatableTask, ScheduledTask
 from libs.zigbee.base import ZigBee
 
@@ -23,6 +23,7 @@ class ModuleContext:
     messenger: BaseMessenger
     state: State
     task_queue: BaseTaskQueue
+    task_worker: BaseWorker
     zig_bee: ZigBee
     smart_devices_map: dict[str, BaseSmartDevice]
 
@@ -0,0 +1,263 @@
+"""
+Load test of commands: round-trip latency from an update in AMQP to the reply that Telegram gets.
+
+The whole path is run in the process: the AMQP consumer of `TelegramMessenger` -> `process_telegram_message` ->
+`Commander.process_updates` -> modules -> the sending queue -> HTTP. Telegram and RabbitMQ are replaced by
+`FakeTelegramServer` and `MemoryAMQPConnection`, modules that need devices aren't used.
+
+Usage:
+    CONFIG_PATH=config/config.json python3 -m project.apps.core.benchmarks --updates 5000 --output commands.json
+
+Every command of the load test gets exactly one reply, so replies are matched with commands in order.
+"""
+
+import argparse
+import collections
+import datetime
+import json
+import logging
+import platform
+import statistics
+import sys
+import threading
+import time
+import typing
+
+from libs import task_queue as tq
+from libs.casual_utils.aio import async_thread
+from libs.messengers.sending import SendingQueue
+from libs.messengers.telegram import TelegramMessenger
+from libs.messengers.testing import FakeTelegramServer, MemoryAMQPConnection, create_update_data
+from libs.zigbee.base import ZigBee
+
+from ... import config
+from ..common.constants import INITED_AT
+from ..common.state import State
+from . import constants, modules
+from .base import BaseModule, Message
+from .commander import Commander
+from .utils.messages import process_telegram_message
+
+
+__all__ = ('run_load_test',)
+
+DEFAULT_COMMANDS = (
+    constants.PrettyBotCommands.ALL_FUNCS,
+    constants.BotCommands.RETURN,
+    '/unknown_command',
+)
+
+
+class _RoundTrips:
+    """
+    Matches replies that the fake server gets with published updates and limits updates that wait for replies.
+    """
+
+    latencies: list[float]
+    _published_at: collections.deque[float]
+    _in_flight: threading.Semaphore
+    _all_replied: threading.Event
+    _expected_replies: int
+    _lock: threading.Lock
+
+    def __init__(self, *, in_flight: int, expected_replies: int) -> None:
+        self.latencies = []
+        self._published_at = collections.deque()
+        self._in_flight = threading.Semaphore(in_flight)
+        self._all_replied = threading.Event()
+        self._expected_replies = expected_replies
+        self._lock = threading.Lock()
+
+    def publish(self, func: typing.Callable[[], None]) -> None:
+        self._in_flight.acquire()
+
+        with self._lock:
+            self._published_at.append(time.perf_counter())
+
+        func()
+
+    def on_request(self, method: str, params: dict[str, str]) -> None:
+        if method not in ('sendMessage', 'editMessageText'):
+            return
+
+        with self._lock:
+            if not self._published_at:
+                return
+
+            self.latencies.append(time.perf_counter() - self._published_at.popleft())
+
+            if len(self.latencies) >= self._expected_replies:
+                self._all_replied.set()
+
+        self._in_flight.release()
+
+    def wait(self, timeout: float) -> bool:
+        return self._all_replied.wait(timeout)
+
+
+def _get_percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+
+    values = sorted(values)
+
+    if len(values) == 1:
+        quantiles = [values[0]] * 99
+    else:
+        quantiles = statistics.quantiles(values, n=100, method='inclusive')
+
+    return {
+        'count': len(values),
+        'mean_ms': round(statistics.fmean(values) * 1_000, 3),
+        'p50_ms': round(quantiles[49] * 1_000, 3),
+        'p90_ms': round(quantiles[89] * 1_000, 3),
+        'p99_ms': round(quantiles[98] * 1_000, 3),
+        'max_ms': round(values[-1] * 1_000, 3),
+    }
+
+
+def run_load_test(
+    *,
+    updates: int = 2000,
+    in_flight: int = 1,
+    server_latency: float = 0,
+    commands: typing.Sequence[str] = DEFAULT_COMMANDS,
+    module_classes: tuple[type[BaseModule], ...] = (modules.Menu, modules.Utils),
+    timeout: float = 600,
+) -> dict[str, typing.Any]:
+    round_trips = _RoundTrips(in_flight=in_flight, expected_replies=updates)
+    amqp_connection = MemoryAMQPConnection()
+    state = State(
+        {
+            INITED_AT: datetime.datetime.now(),
+            # The menu shows them, they are created by modules that need devices.
+            constants.SECURITY_IS_ENABLED: False,
+            constants.AUTO_SECURITY_IS_ENABLED: False,
+            constants.USE_CAMERA: False,
+            constants.MAIN_LAMP_IS_ON: False,
+        },
+    )
+
+    with FakeTelegramServer(latency=server_latency, on_request=round_trips.on_request) as server:
+        sending_queue = SendingQueue(
+            loop=async_thread.get_loop(),
+            max_concurrency=config.TELEGRAM_MAX_CONCURRENT_REQUESTS,
+            # Rate limits of Telegram are turned off, otherwise they are measured instead of the bot.
+            global_rate=1_000_000,
+            chat_rate=1_000_000,
+        )
+        messenger = TelegramMessenger(
+            message_handler=process_telegram_message,
+            default_reply_markup=modules.TelegramMenu(state=state),
+            api_url=server.base_url,
+            amqp_connection_factory=lambda: amqp_connection,
+            sending_queue=sending_queue,
+        )
+        commander = Commander(
+            messenger=messenger,
+            module_classes=module_classes,
+            state=state,
+            zig_bee=ZigBee(mq_host=config.ZIGBEE_MQ_HOST, mq_port=config.ZIGBEE_MQ_PORT),
+            smart_devices=(),
+            task_queue=tq.MemTaskQueue(),
+        )
+        is_stopped = threading.Event()
+
+        def process_updates() -> None:
+            while not is_stopped.is_set():
+                try:
+                    commander.process_updates()
+                except Exception as e:
+                    logging.exception(e)
+
+        commander_thread = threading.Thread(target=process_updates)
+        commander_thread.start()
+
+        started_at = time.perf_counter()
+        started_cpu_at = time.process_time()
+
+        for i in range(updates):
+            body = json.dumps(
+                create_update_data(
+                    commands[i % len(commands)],
+                    update_id=i + 1,
+                    chat_id=config.TELEGRAM_CHAT_ID,
+                    username=config.TELEGRAM_USERNAME,
+                ),
+            ).encode()
+            round_trips.publish(lambda body=body: amqp_connection.publish(config.TELEHOOKS_QUEUE_NAME, body))
+
+        is_finished = round_trips.wait(timeout)
+        elapsed = time.perf_counter() - started_at
+        cpu_time = time.process_time() - started_cpu_at
+        sending_stats = messenger.collect_sending_stats()
+
+        is_stopped.set()
+        commander.message_queue.put(Message())
+        commander_thread.join()
+        amqp_connection.close()
+        commander.close()
+
+        requests_count = server.requests_count
+        connections_count = server.connections_count
+
+    return {
+        'created_at': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'params': {
+            'updates': updates,
+            'in_flight': in_flight,
+            'server_latency_sec': server_latency,
+            'commands': list(commands),
+            'modules': [module_class.__name__ for module_class in module_classes],
+        },
+        'is_finished': is_finished,
+        'elapsed_sec': round(elapsed, 3),
+        'throughput_per_sec': round(len(round_trips.latencies) / elapsed, 3),
+        'cpu_sec': round(cpu_time, 3),
+        'cpu_percent': round(cpu_time / elapsed * 100, 2),
+        'round_trip': _get_percentiles(round_trips.latencies),
+        'sending': {
+            f'priority_{priority}': {
+                'count': stats.sent_count,
+                'mean_ms': None if stats.mean_latency is None else round(stats.mean_latency * 1_000, 3),
+                'max_ms': None if stats.max_latency is None else round(stats.max_latency * 1_000, 3),
+            }
+            for priority, stats in sending_stats.items()
+            if stats.sent_count
+        },
+        'http_requests': requests_count,
+        'opened_connections': connections_count,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Load test of commands with fake Telegram and AMQP.')
+    parser.add_argument('--updates', type=int, default=2000)
+    parser.add_argument('--in-flight', type=int, default=1, help='Updates that are published before replies.')
+    parser.add_argument('--server-latency', type=float, default=0, help='Delay of every response in seconds.')
+    parser.add_argument('--command', action='append', help='Commands are sent in turn, the default mix by default.')
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--output', help='Path to save JSON, stdout by default.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    result = run_load_test(
+        updates=args.updates,
+        in_flight=args.in_flight,
+        server_latency=args.server_latency,
+        commands=args.command or DEFAULT_COMMANDS,
+        timeout=args.timeout,
+    )
+    dumped_result = json.dumps(result, indent=4)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(dumped_result)
+    else:
+        sys.stdout.write(f'{dumped_result}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,13 +3,15 @@ import queue
 
 from telegram.error import NetworkError
 
+from libs.camera.artifacts import BaseMediaArtifact
 from libs.casual_utils.logging import log_performance
 from libs.messengers.base import BaseMessenger
 from libs.smart_devices.base import BaseSmartDevice
-from libs.task_queue import BaseTaskQueue, BaseWorker, MemTaskQueue, ThreadWorker
-from libs.task_queue.middlewares import ConcreteRetries, ExceptionLogging, SupportOfRetries
+from libs.task_queue import BaseTaskQueue, BaseWorker, SQLiteTaskQueue, ThreadWorker
+from libs.task_queue.middlewares import ConcreteRetries, ExceptionLogging, SupportOfFinalizers, SupportOfRetries
 from libs.zigbee.base import ZigBee
 
+from ... import config
 from ..common.base import BaseReceiver
 from ..common.exceptions import Shutdown
 from ..common.state import State
@@ -38,12 +40,14 @@ class Commander:
         state: State,
         zig_bee: ZigBee,
         smart_devices: tuple[BaseSmartDevice, ...],
+        task_queue: BaseTaskQueue | None = None,
     ) -> None:
         self.message_queue = queue.Queue()
-        self.task_queue = MemTaskQueue()
+        self.task_queue = SQLiteTaskQueue(path=config.TASK_QUEUE_DB_PATH) if task_queue is None else task_queue
         self.task_worker = ThreadWorker(
             task_queue=self.task_queue,
             middlewares=(
+                SupportOfFinalizers(),
                 ExceptionLogging(),
                 ConcreteRetries(
                     exceptions=(
@@ -54,6 +58,7 @@ class Commander:
                 SupportOfRetries(),
             ),
             count=2,
+            max_count=6,
             on_close=close_db_session,
         )
         self.messenger = messenger
@@ -72,6 +77,7 @@ class Commander:
             messenger=self.messenger,
             state=self.state,
             task_queue=self.task_queue,
+            task_worker=self.task_worker,
             zig_bee=self.zig_bee,
             smart_devices_map=smart_devices_map,
         )
@@ -125,18 +131,22 @@ class Commander:
 
         logging.info('[shutdown] Closing task queue...')
         self.task_worker.stop()
+        self.task_queue.close()
 
         logging.info('[shutdown] Sending "shutdown" signal...')
         core_events.shutdown.send()
 
-        logging.info('[shutdown] Closing messenger...')
-        self.messenger.close()
-
         logging.info('[shutdown] Disconnecting receivers...')
         for receiver in self._receivers:
             receiver.disconnect()
 
+        logging.info('[shutdown] Removing media of dropped tasks...')
+        BaseMediaArtifact.free_all()
+
         logging.info('[shutdown] Closing ZigBee...')
         self.zig_bee.close()
 
         self.messenger.send_message('Goodbye!')
+
+        logging.info('[shutdown] Closing messenger...')
+        self.messenger.close()
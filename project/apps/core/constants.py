@@ -9,6 +9,10 @@ WEATHER_HUMIDITY = 'weather_humidity'
 RAM_USAGE = 'ram_usage'
 FREE_DISK_SPACE = 'free_disk_space'
 TASK_QUEUE_DELAY = 'task_queue_delay'
+TASK_WORKERS_COUNT = 'task_workers_count'
+# Signals of them are saved for every message priority, e.g. `messenger_queue_size_critical`.
+MESSENGER_QUEUE_SIZE = 'messenger_queue_size'
+MESSENGER_LATENCY = 'messenger_latency'
 USER_IS_CONNECTED_TO_ROUTER = 'user_is_connected_to_router'
 USER_IS_AT_HOME = 'user_is_at_home'
 CONNECTED_DEVICES_TO_ROUTER = 'connected_devices_to_router'
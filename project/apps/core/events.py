@@ -16,12 +16,7 @@ request_for_statistics = Event(
         'components',
     ),
 )
-frame_from_video_camera = Event(
-    providing_kwargs=(
-        'frame',
-        'fps',
-    ),
-)
 getting_doc = Event()
 input_command = Event(providing_kwargs=('command',))
+scheduled_command = Event(providing_kwargs=('command',))
 new_message = Event(providing_kwargs=('message',))
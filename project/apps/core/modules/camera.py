@@ -1,15 +1,17 @@
 import datetime
 import logging
+import time
 import typing
 from functools import partial
 
 import numpy as np
-from imutils.video import VideoStream
 
 from libs import task_queue
-from libs.camera.base import VideoCamera
+from libs.camera.artifacts import EncodedImage
+from libs.camera.fps_policy import FPSInfo
+from libs.camera.scheduling import DetectionScheduler
 from libs.casual_utils.parallel_computing import synchronized_method
-from libs.image_processing.utils import add_timestamp_in_frame
+from libs.image_processing.annotations import FrameAnnotation
 from libs.task_queue import IntervalTask
 
 from .... import config
@@ -17,20 +19,20 @@ from ...common import interface
 from ...common.constants import OFF, ON
 from ...common.exceptions import Shutdown
 from ...common.storage import file_storage
-from ...common.utils import (
-    camera_is_available,
-    with_throttling,
-)
+from ...common.utils import with_throttling
 from ...core import events
 from ...core.constants import (
     CAMERA_IS_AVAILABLE,
+    CPU_TEMPERATURE,
     CURRENT_FPS,
     SECURITY_IS_ENABLED,
+    TASK_QUEUE_DELAY,
     USE_CAMERA,
     VIDEO_RECORDING_IS_ENABLED,
     VIDEO_SECURITY_IS_ENABLED,
 )
-from ...guard.video_guard import VideoGuard
+from ...guard.cameras import CameraDevice
+from ...guard.settings import get_cameras_settings
 from ..base import BaseModule
 from ..constants import BotCommands, MotionTypeSources
 
@@ -40,24 +42,25 @@ __all__ = ('Camera',)
 
 @interface.module(
     title='Camera',
-    description=('The module provides integration with a camera.'),
+    description=('The module provides integration with cameras.'),
 )
 class Camera(BaseModule):
-    _video_stream: VideoStream | None = None
-    _video_camera: VideoCamera | None = None
-    _camera_is_available: bool = True
-    _video_frames: list
+    _cameras: tuple[CameraDevice, ...]
+    _detection_scheduler: DetectionScheduler
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
 
+        self._cameras = tuple(CameraDevice(settings) for settings in get_cameras_settings())
+        # Cameras capture frames with the full rate, but only frames that fit the budget are checked for motion.
+        self._detection_scheduler = DetectionScheduler(cpu_budget=config.MOTION_DETECTION_CPU_BUDGET)
+
         self._update_camera_status()
-        self._video_frames = []
 
     def get_initial_state(self) -> dict[str, typing.Any]:
         return {
             **super().get_initial_state(),
-            VIDEO_SECURITY_IS_ENABLED: None,
+            VIDEO_SECURITY_IS_ENABLED: False,
             USE_CAMERA: False,
             CAMERA_IS_AVAILABLE: True,
             CURRENT_FPS: None,
@@ -92,7 +95,6 @@ class Camera(BaseModule):
     def subscribe_to_events(self) -> tuple:
         return (
             *super().subscribe_to_events(),
-            events.frame_from_video_camera.connect(self._process_frame),
             events.motion_detected.connect(self._process_motion_detection),
             events.security_is_enabled.connect(self._enable_security),
             events.security_is_disabled.connect(self._disable_security),
@@ -100,24 +102,41 @@ class Camera(BaseModule):
 
     @synchronized_method
     def check(self) -> None:
-        video_guard: VideoGuard | None = self.state[VIDEO_SECURITY_IS_ENABLED]
         use_camera: bool = self.state[USE_CAMERA]
         security_is_enabled: bool = self.state[SECURITY_IS_ENABLED]
 
-        if video_guard:
-            assert self._video_camera is not None
-
-            if self._video_camera.is_run or not use_camera or not security_is_enabled:
+        if self.state[VIDEO_SECURITY_IS_ENABLED]:
+            if not use_camera or not security_is_enabled:
                 self._disable_security()
-                video_guard = None
-
-        if not video_guard and use_camera and security_is_enabled and self.state[CAMERA_IS_AVAILABLE]:
+            else:
+                for camera in self._cameras:
+                    if camera.video_guard is not None and not camera.is_run:
+                        self._stop_guard(camera)
+
+                self._update_video_security_state()
+
+        if (
+            not self.state[VIDEO_SECURITY_IS_ENABLED]
+            and use_camera
+            and security_is_enabled
+            and any(camera.is_run for camera in self._cameras)
+        ):
             self._enable_security()
 
-        if self._video_camera:
-            self.state[CURRENT_FPS] = self._video_camera.fps
-        else:
-            self.state[CURRENT_FPS] = None
+        fps_info = {}
+
+        for camera in self._cameras:
+            target_fps = camera.fps_policy.update(
+                is_active=self.state[VIDEO_RECORDING_IS_ENABLED],
+                cpu_temperature=self.state[CPU_TEMPERATURE] if self.state.has(CPU_TEMPERATURE) else None,
+                task_queue_delay=self.state[TASK_QUEUE_DELAY] if self.state.has(TASK_QUEUE_DELAY) else None,
+            )
+
+            if camera.is_started:
+                camera.set_max_fps(target_fps)
+                fps_info[camera.name] = FPSInfo(current=camera.processing_fps, target=target_fps)
+
+        self.state[CURRENT_FPS] = fps_info or None
 
     @synchronized_method
     def disable(self) -> None:
@@ -147,15 +166,9 @@ class Camera(BaseModule):
 
         self.state[USE_CAMERA] = True
 
-        if self._video_camera is None:
-            self._video_stream = VideoStream(src=config.VIDEO_SRC, resolution=config.IMAGE_RESOLUTION)
-            self._video_stream.start()
-            self._video_camera = VideoCamera(
-                video_stream=self._video_stream,
-                callback=partial(events.frame_from_video_camera.send, source=MotionTypeSources.VIDEO),
-                max_fps=config.FPS,
-            )
-            self._video_camera.start()
+        for camera in self._cameras:
+            if camera.is_available:
+                camera.start(callback=partial(self._process_frame, camera))
 
         self.messenger.send_message('Camera is on')
 
@@ -174,14 +187,8 @@ class Camera(BaseModule):
         if self.state[SECURITY_IS_ENABLED]:
             self._disable_security()
 
-        if self._video_stream is not None:
-            assert self._video_camera is not None
-
-            self._video_camera.stop()
-            self._video_camera = None
-            self._video_stream.stop()
-            self._video_stream.stream.stream.release()
-            self._video_stream = None
+        for camera in self._cameras:
+            camera.stop()
 
         self.messenger.send_message('Camera is off')
 
@@ -190,61 +197,75 @@ class Camera(BaseModule):
         if not self.state[USE_CAMERA]:
             return
 
-        video_guard: VideoGuard = self.state[VIDEO_SECURITY_IS_ENABLED]
-
-        if video_guard:
+        if self.state[VIDEO_SECURITY_IS_ENABLED]:
             self.messenger.send_message('Video security is already enabled')
             return
 
-        if self._video_stream:
-            video_guard = VideoGuard(
-                messenger=self.messenger,
-                task_queue=self.task_queue,
-                motion_detected_callback=events.motion_detected.send,
-            )
-            self.state[VIDEO_SECURITY_IS_ENABLED] = video_guard
-            video_guard.start()
+        for camera in self._cameras:
+            if camera.is_run:
+                camera.start_guard(
+                    messenger=self.messenger,
+                    task_queue=self.task_queue,
+                    motion_detected_callback=self._send_video_motion,
+                )
 
+        self._update_video_security_state()
         self.messenger.send_message('Video security is enabled')
 
     @synchronized_method
     def _disable_security(self) -> None:
-        video_guard: VideoGuard = self.state[VIDEO_SECURITY_IS_ENABLED]
+        if self.state[VIDEO_SECURITY_IS_ENABLED]:
+            for camera in self._cameras:
+                self._stop_guard(camera)
 
-        if video_guard:
-            video_guard.stop()
-            self.state[VIDEO_SECURITY_IS_ENABLED] = None
+            self._update_video_security_state()
             self.messenger.send_message('Video security is stopped')
         elif self.state[USE_CAMERA]:
             self.messenger.send_message('Video security is already disabled')
 
+    def _stop_guard(self, camera: CameraDevice) -> None:
+        camera.stop_guard()
+        self._detection_scheduler.remove(camera.name)
+
+    def _update_video_security_state(self) -> None:
+        self.state[VIDEO_SECURITY_IS_ENABLED] = any(camera.video_guard is not None for camera in self._cameras)
+
     @interface.command(BotCommands.CAMERA, 'photo')
     @synchronized_method
     def _take_photo(self) -> None:
         if not self._can_use_camera():
             return
 
-        assert self._video_stream is not None
+        for camera in self._cameras:
+            frame = camera.capture_snapshot()
 
-        frame = self._video_stream.read()
+            if frame is None:
+                continue
 
-        if frame is None:
-            return
+            now = datetime.datetime.now()
+            image = EncodedImage(frame, sinks_count=2)
 
-        now = datetime.datetime.now()
+            self.task_queue.put(
+                file_storage.upload_media,
+                kwargs={
+                    'file_name': (
+                        f'saved_photos/'
+                        f'{camera.settings.add_name(now.strftime("%Y-%m-%d %H:%M:%S"), separator=" ")}'
+                        f'{image.extension}'
+                    ),
+                    'artifact': image,
+                },
+                priority=task_queue.TaskPriorities.MEDIUM,
+                options={'on_done': image.release},
+            )
 
-        self.messenger.send_frame(
-            frame,
-            caption=f'Captured at {now.strftime("%d.%m.%Y, %H:%M:%S")}',
-        )
-        self.task_queue.put(
-            file_storage.upload_frame,
-            kwargs={
-                'file_name': f'saved_photos/{now.strftime("%Y-%m-%d %H:%M:%S.png")}',
-                'frame': frame,
-            },
-            priority=task_queue.TaskPriorities.MEDIUM,
-        )
+            try:
+                self.messenger.send_media(
+                    image,
+                    caption=camera.settings.add_name(f'Captured at {now.strftime("%d.%m.%Y, %H:%M:%S")}'),
+                )
+            finally:
+                image.release()
 
     @interface.command(BotCommands.CAMERA, 'record', ON)
     @synchronized_method
@@ -256,6 +277,10 @@ class Camera(BaseModule):
         if not self._can_use_camera():
             return
 
+        for camera in self._cameras:
+            if camera.is_started:
+                camera.start_recording()
+
         self.state[VIDEO_RECORDING_IS_ENABLED] = True
         self.messenger.send_message('Start recording...')
 
@@ -270,18 +295,33 @@ class Camera(BaseModule):
             return
 
         self.state[VIDEO_RECORDING_IS_ENABLED] = False
-        video_frames = self._video_frames
-        self._video_frames = []
-
         self.messenger.send_message('Sending the video...')
-        self.task_queue.put(
-            lambda: self.messenger.send_frames_as_video(
-                frames=video_frames,
-                fps=config.FPS,
-                caption='Recorded video',
-            ),
-            priority=task_queue.TaskPriorities.MEDIUM,
-        )
+
+        for camera in self._cameras:
+            video_frames, is_truncated = camera.stop_recording()
+
+            if len(video_frames) == 0:
+                continue
+
+            fps = round(camera.processing_fps) or camera.settings.fps
+            caption = 'Recorded video'
+
+            if is_truncated:
+                logging.warning(
+                    'Recording of camera "%s" is truncated, the buffer is full.',
+                    camera.settings.name,
+                )
+                caption += f' (only the last {len(video_frames) // fps} seconds are kept, the buffer was full)'
+
+            self.task_queue.put(
+                self.messenger.send_frames_as_video,
+                kwargs={
+                    'frames': video_frames,
+                    'fps': fps,
+                    'caption': camera.settings.add_name(caption),
+                },
+                priority=task_queue.TaskPriorities.MEDIUM,
+            )
 
     def _can_use_camera(self) -> bool:
         use_camera: bool = self.state[USE_CAMERA]
@@ -294,64 +334,114 @@ class Camera(BaseModule):
 
     @synchronized_method
     def _save_photo(self) -> None:
-        if not self.state[USE_CAMERA] or not self._video_stream:
+        if not self.state[USE_CAMERA]:
             return
 
-        now = datetime.datetime.now()
+        for camera in self._cameras:
+            frame = camera.read()
 
-        file_storage.upload_frame(
-            file_name=f'photos/{now.strftime("%Y-%m-%d %H:%M:%S.png")}',
-            frame=self._video_stream.read(),
-        )
+            if frame is None:
+                continue
 
-    @synchronized_method
-    def _check_video_stream(self) -> None:
-        if not self._video_stream:
-            return
+            # Only frames that differ from the last uploaded one are uploaded, a static scene isn't saved again.
+            if not camera.photo_change_detector.accept(frame):
+                continue
 
-        frame = self._video_stream.read()
+            now = datetime.datetime.now()
 
-        if frame is None:
-            self.state[CAMERA_IS_AVAILABLE] = False
-            self.messenger.send_message('Camera is not available')
-            self._run_command(BotCommands.CAMERA, OFF)
+            file_storage.upload_frame(
+                file_name=f'photos/{camera.settings.add_name(now.strftime("%Y-%m-%d %H:%M:%S.png"), separator=" ")}',
+                frame=frame,
+            )
 
     @synchronized_method
-    def _update_camera_status(self) -> None:
-        if self._video_stream:
+    def _check_video_stream(self) -> None:
+        started_cameras = tuple(camera for camera in self._cameras if camera.is_started)
+
+        if not started_cameras:
             return
 
-        self.state[CAMERA_IS_AVAILABLE] = camera_is_available(config.VIDEO_SRC)
+        for camera in started_cameras:
+            if camera.read() is not None:
+                continue
 
-    @synchronized_method
-    def _process_frame(self, frame, fps: float) -> None:
-        video_guard: VideoGuard = self.state[VIDEO_SECURITY_IS_ENABLED]
+            camera.is_available = False
+            self.messenger.send_message(camera.settings.add_name('Camera is not available'))
+            self._stop_guard(camera)
+            camera.stop()
 
-        if video_guard:
-            assert video_guard.process_frame is not None
+        self._update_video_security_state()
 
-            try:
-                video_guard.process_frame.send(
-                    (
-                        frame,
-                        fps,
-                    ),
-                )
-            except Shutdown:
-                raise
-            except Exception as e:
-                logging.exception(e)
-                self.messenger.send_message("Can't process the frame")
-                self._disable_camera()
+        if not any(camera.is_started for camera in self._cameras):
+            self.state[CAMERA_IS_AVAILABLE] = any(camera.is_available for camera in self._cameras)
+            self._run_command(BotCommands.CAMERA, OFF)
 
-        if self.state[VIDEO_RECORDING_IS_ENABLED]:
-            new_frame = np.copy(frame)
-            add_timestamp_in_frame(new_frame)
-            self._video_frames.append(new_frame)
+    @synchronized_method
+    def _update_camera_status(self) -> None:
+        for camera in self._cameras:
+            camera.update_status()
+
+        self.state[CAMERA_IS_AVAILABLE] = any(camera.is_available for camera in self._cameras)
+
+    def _process_frame(self, camera: CameraDevice, *, frame: np.ndarray, fps: float) -> None:
+        # It's called by the processing thread of the camera, so only the camera is locked.
+        # Commands take the lock of the module before the lock of the camera, so nothing here waits for the module.
+        is_failed = False
+
+        with camera.lock:
+            video_guard = camera.video_guard
+
+            if video_guard is not None:
+                assert video_guard.process_frame is not None
+
+                need_to_detect = self._detection_scheduler.acquire(camera.name)
+                started_at = time.monotonic()
+
+                try:
+                    video_guard.process_frame.send(
+                        (
+                            frame,
+                            fps,
+                            need_to_detect,
+                        ),
+                    )
+                except Shutdown:
+                    raise
+                except Exception as e:
+                    logging.exception(e)
+                    self._stop_guard(camera)
+                    is_failed = True
+                else:
+                    if need_to_detect:
+                        self._detection_scheduler.report(time.monotonic() - started_at)
+
+                    if video_guard.is_occupied:
+                        camera.speed_up()
+
+            if not is_failed and camera.video_frames is not None:
+                # The timestamp is rendered when the video is sent.
+                camera.video_frames.append(frame, FrameAnnotation(captured_at=datetime.datetime.now()))
+
+        if is_failed:
+            self.messenger.send_message(camera.settings.add_name("Can't process the frame"))
+            # The processing thread is joined when the camera is stopped, so it's done by another thread.
+            self.task_queue.put(self._disable_camera, priority=task_queue.TaskPriorities.HIGH)
+
+    def _send_video_motion(self) -> None:
+        # It's called by the processing thread under the lock of the camera, and receivers of the event
+        # take the lock of their modules, so the event is sent by the task queue.
+        self.task_queue.put(
+            events.motion_detected.send,
+            kwargs={'source': MotionTypeSources.VIDEO},
+            priority=task_queue.TaskPriorities.HIGH,
+        )
 
     @synchronized_method
     @with_throttling(datetime.timedelta(seconds=5), count=1)
     def _process_motion_detection(self, *, source: str) -> None:
+        for camera in self._cameras:
+            camera.speed_up()
+
         if source == MotionTypeSources.SENSORS and self.state[USE_CAMERA]:
             self.task_queue.put(
                 self._take_photo,
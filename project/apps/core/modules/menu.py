@@ -3,6 +3,8 @@ import abc
 from emoji.core import emojize
 from telegram import KeyboardButton, ReplyKeyboardMarkup
 
+from libs.messengers.editing import get_content_hash
+
 from ...common import interface
 from ...common.constants import OFF, ON
 from ...common.state import State
@@ -20,7 +22,7 @@ class TelegramMenu:
     menu_state_name = 'menu'
     home_page_code: str
     state: State
-    _last_result: ReplyKeyboardMarkup | None = None
+    _last_items_hash: str | None = None
 
     def __init__(self, state: State) -> None:
         self.state = state
@@ -45,14 +47,17 @@ class TelegramMenu:
                 if page_code not in self.pages_map:
                     page_code = self.home_page_code
 
-            result = self.pages_map[page_code].get()
+            page = self.pages_map[page_code]
+            items = page.get_items()
+            # It's called for every sent message, so the keyboard is created only if it's changed.
+            items_hash = get_content_hash(page.code, items)
 
-            if result == self._last_result:
+            if items_hash == self._last_items_hash:
                 return None
 
-            self._last_result = result
+            self._last_items_hash = items_hash
 
-            return result
+            return page.create_markup(items)
 
 
 class BasePage(abc.ABC):
@@ -63,15 +68,15 @@ class BasePage(abc.ABC):
     def __init__(self, *, state: State) -> None:
         self.state = state
 
-    def get(self) -> ReplyKeyboardMarkup:
+    def create_markup(self, items: list[list]) -> ReplyKeyboardMarkup:
         return ReplyKeyboardMarkup(
-            keyboard=self._get_items(),
+            keyboard=items,
             resize_keyboard=True,
             input_field_placeholder=f'{self.name}: Choose a command...',
         )
 
     @abc.abstractmethod
-    def _get_items(self) -> list[list]:
+    def get_items(self) -> list[list]:
         pass
 
 
@@ -79,7 +84,7 @@ class MainPage(BasePage):
     name = 'Main menu'
     code = 'main'
 
-    def _get_items(self) -> list[list[KeyboardButton]]:
+    def get_items(self) -> list[list[KeyboardButton]]:
         return [
             [
                 (
@@ -108,7 +113,7 @@ class LampPage(BasePage):
     name = 'Lamp menu'
     code = 'lamp'
 
-    def _get_items(self) -> list[list[KeyboardButton]]:
+    def get_items(self) -> list[list[KeyboardButton]]:
         main_lamp_is_on = self.state[constants.MAIN_LAMP_IS_ON]
 
         first_row = [KeyboardButton(text=f'{constants.BotCommands.LAMP} {OFF if main_lamp_is_on else ON}')]
@@ -150,7 +155,7 @@ class AllFuncsPage(BasePage):
     name = 'All functions'
     code = 'all_funcs'
 
-    def _get_items(self) -> list[list[KeyboardButton]]:
+    def get_items(self) -> list[list[KeyboardButton]]:
         use_camera: bool = self.state[constants.USE_CAMERA]
 
         camera_line = [
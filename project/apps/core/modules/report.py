@@ -8,10 +8,11 @@ from emoji import emojize
 from sqlalchemy import text
 
 from libs.casual_utils.time import get_current_time
+from libs.messengers.editing import EditCoalescer
 from libs.messengers.utils import ProgressBar, escape_markdown
 from libs.task_queue import IntervalTask, TaskPriorities
 
-from ... import db
+from ... import config, db
 from ...common import interface
 from ...common.exceptions import Shutdown
 from ...common.utils import (
@@ -39,11 +40,13 @@ class Report(BaseModule):
     }
     _lock_for_status: threading.RLock
     _message_id_for_status: typing.Any = None
+    _status_editor: EditCoalescer
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
 
         self._lock_for_status = threading.RLock()
+        self._status_editor = EditCoalescer(self.messenger, min_interval=config.TELEGRAM_MIN_EDIT_INTERVAL)
 
     def get_initial_state(self) -> dict[str, typing.Any]:
         return {
@@ -62,7 +65,7 @@ class Report(BaseModule):
 
     def process_command(self, command: Command) -> typing.Any:
         with self._lock_for_status:
-            self._message_id_for_status = None
+            self._forget_status_message()
 
         return super().process_command(command)
 
@@ -114,7 +117,7 @@ class Report(BaseModule):
                     or get_current_time() - self.messenger.last_sent_at >= datetime.timedelta(hours=48)
                 )
             ):
-                self._message_id_for_status = None
+                self._forget_status_message()
 
             if not self._message_id_for_status:
                 if (
@@ -128,10 +131,23 @@ class Report(BaseModule):
                 return
 
             logging.debug('Update status')
-            self._send_status()
+            report = ShortTextReport(state=self.state)
+            message = report.generate()
+            # The status isn't edited if only the time of the update is changed,
+            # so the time shows when the status was changed last.
+            self._status_editor.edit(
+                self._message_id_for_status,
+                f'{message}{self._get_status_updated_at(report)}',
+                fingerprint=message,
+                use_markdown=True,
+            )
 
     def _pipe_for_collecting_stats(self, receivers: typing.Sequence, kwargs: dict) -> typing.Iterator:
-        with ProgressBar(self.messenger, title='Collecting stats\\.\\.\\.') as progress_bar:
+        with ProgressBar(
+            self.messenger,
+            title='Collecting stats\\.\\.\\.',
+            min_edit_interval=config.TELEGRAM_MIN_EDIT_INTERVAL,
+        ) as progress_bar:
             count = len(receivers)
             plots: list[np.ndarray] = []
             exceptions = []
@@ -170,14 +186,18 @@ class Report(BaseModule):
         message = report.generate()
 
         with self._lock_for_status:
-            if self._message_id_for_status:
-                message += f'\nUpdated at: `{escape_markdown(report.now.strftime("%d.%m.%Y, %H:%M:%S"))}`'
+            self._forget_status_message()
+            self._message_id_for_status = self.messenger.send_message(message, use_markdown=True)
+            self._status_editor.set_sent(self._message_id_for_status, message, use_markdown=True)
 
-            self._message_id_for_status = self.messenger.send_message(
-                message,
-                message_id=self._message_id_for_status,
-                use_markdown=True,
-            )
+    def _forget_status_message(self) -> None:
+        if self._message_id_for_status:
+            self._status_editor.discard(self._message_id_for_status)
+            self._message_id_for_status = None
+
+    @staticmethod
+    def _get_status_updated_at(report: ShortTextReport) -> str:
+        return f'\nUpdated at: `{escape_markdown(report.now.strftime("%d.%m.%Y, %H:%M"))}`'
 
     @interface.command(constants.BotCommands.REPORT)
     def _send_report(self) -> None:
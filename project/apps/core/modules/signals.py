@@ -5,10 +5,11 @@ import typing
 from crontab import CronTab
 
 from libs.casual_utils.time import get_current_time
+from libs.messengers.constants import MESSAGE_PRIORITY_NAMES
 from libs.messengers.utils import ProgressBar
 from libs.task_queue import IntervalTask, ScheduledTask, TaskPriorities
 
-from ... import db
+from ... import config, db
 from ...common import interface
 from ...common.utils import create_plot
 from ...signals.models import Signal
@@ -19,6 +20,12 @@ from ..signals.supreme_handler import SupremeSignalHandler
 
 __all__ = ('Signals',)
 
+MESSENGER_SIGNAL_TYPES = tuple(
+    f'{signal_type}_{priority_name}'
+    for signal_type in (constants.MESSENGER_QUEUE_SIZE, constants.MESSENGER_LATENCY)
+    for priority_name in MESSAGE_PRIORITY_NAMES.values()
+)
+
 
 @interface.module(
     title='Signals',
@@ -48,6 +55,7 @@ class Signals(BaseModule):
         return {
             **super().get_initial_state(),
             **self._supreme_signal_handler.get_initial_state(),
+            constants.TASK_QUEUE_DELAY: None,
         }
 
     def init_repeatable_tasks(self) -> tuple:
@@ -90,7 +98,11 @@ class Signals(BaseModule):
 
     @interface.command(constants.BotCommands.COMPRESS_DB)
     def _compress_db_with_progress_bar(self) -> typing.Any:
-        with ProgressBar(self.messenger, title='Checking DB\\.\\.\\.') as progress_bar:
+        with ProgressBar(
+            self.messenger,
+            title='Checking DB\\.\\.\\.',
+            min_edit_interval=config.TELEGRAM_MIN_EDIT_INTERVAL,
+        ) as progress_bar:
             for progress in self._compress_db():
                 progress_bar.set(progress)
 
@@ -99,7 +111,12 @@ class Signals(BaseModule):
     def _ping_task_queue(self, *, sent_at: datetime.datetime) -> None:
         now = datetime.datetime.now()
         diff = datetime.datetime.now() - sent_at - self._timedelta_for_ping
-        Signal.add(signal_type=constants.TASK_QUEUE_DELAY, value=diff.total_seconds(), received_at=now)
+        self.state[constants.TASK_QUEUE_DELAY] = diff
+        Signal.bulk_add((
+            Signal(type=constants.TASK_QUEUE_DELAY, value=diff.total_seconds(), received_at=now),
+            Signal(type=constants.TASK_WORKERS_COUNT, value=self.context.task_worker.workers_count, received_at=now),
+            *self._get_messenger_signals(received_at=now),
+        ))
 
         now = datetime.datetime.now()
 
@@ -110,29 +127,92 @@ class Signals(BaseModule):
             run_after=now + self._timedelta_for_ping,
         )
 
+    def _get_messenger_signals(self, *, received_at: datetime.datetime) -> typing.Iterator[Signal]:
+        for priority, stats in self.messenger.collect_sending_stats().items():
+            priority_name = MESSAGE_PRIORITY_NAMES[priority]
+
+            yield Signal(
+                type=f'{constants.MESSENGER_QUEUE_SIZE}_{priority_name}',
+                value=stats.queue_size,
+                received_at=received_at,
+            )
+
+            if stats.mean_latency is not None:
+                yield Signal(
+                    type=f'{constants.MESSENGER_LATENCY}_{priority_name}',
+                    value=stats.mean_latency,
+                    received_at=received_at,
+                )
+
     @staticmethod
     def _create_task_queue_stats(
         date_range: tuple[datetime.datetime, datetime.datetime],
         components: set[str],
-    ) -> io.BytesIO | None:
+    ) -> tuple[io.BytesIO, ...] | None:
         if 'inner_stats' not in components:
             return None
 
+        plots = []
+
         task_queue_size_stats = Signal.get(
             signal_type=constants.TASK_QUEUE_DELAY,
             datetime_range=date_range,
         )
 
-        if not task_queue_size_stats:
-            return None
+        if task_queue_size_stats:
+            plots.append(
+                create_plot(
+                    title='Task queue delay stats (sec.)',
+                    x_attr='received_at',
+                    y_attr='value',
+                    stats=task_queue_size_stats,
+                ),
+            )
 
-        return create_plot(
-            title='Task queue delay stats (sec.)',
-            x_attr='received_at',
-            y_attr='value',
-            stats=task_queue_size_stats,
+        task_workers_count_stats = Signal.get(
+            signal_type=constants.TASK_WORKERS_COUNT,
+            datetime_range=date_range,
         )
 
+        if task_workers_count_stats:
+            plots.append(
+                create_plot(
+                    title='Task workers',
+                    x_attr='received_at',
+                    y_attr='value',
+                    stats=task_workers_count_stats,
+                ),
+            )
+
+        for title, signal_type in (
+            ('Messenger queue size', constants.MESSENGER_QUEUE_SIZE),
+            ('Messenger latency (sec.)', constants.MESSENGER_LATENCY),
+        ):
+            stats_by_priorities = {
+                priority_name: stats
+                for priority_name in MESSAGE_PRIORITY_NAMES.values()
+                if (stats := Signal.get(signal_type=f'{signal_type}_{priority_name}', datetime_range=date_range))
+            }
+
+            if not stats_by_priorities:
+                continue
+
+            main_stats, *additional_stats = stats_by_priorities.values()
+            plots.append(
+                create_plot(
+                    title=title,
+                    x_attr='received_at',
+                    y_attr='value',
+                    stats=main_stats,
+                    additional_plots=tuple(
+                        {'x_attr': 'received_at', 'y_attr': 'value', 'stats': stats} for stats in additional_stats
+                    ),
+                    legend=tuple(stats_by_priorities.keys()),
+                ),
+            )
+
+        return tuple(plots) or None
+
     def _compress_db(self) -> typing.Generator:
         Signal.remove_old()
 
@@ -143,7 +223,7 @@ class Signals(BaseModule):
 
         with db.session_transaction() as session:
             session.query(Signal).filter(
-                Signal.type == constants.TASK_QUEUE_DELAY,
+                Signal.type.in_((constants.TASK_QUEUE_DELAY, constants.TASK_WORKERS_COUNT, *MESSENGER_SIGNAL_TYPES)),
                 Signal.received_at <= now - datetime.timedelta(days=2),
             ).delete()
 
@@ -158,4 +238,17 @@ class Signals(BaseModule):
             approximation_time=datetime.timedelta(minutes=10),
         )
 
+        Signal.compress(
+            constants.TASK_WORKERS_COUNT,
+            datetime_range=datetime_range,
+            approximation_time=datetime.timedelta(minutes=10),
+        )
+
+        for signal_type in MESSENGER_SIGNAL_TYPES:
+            Signal.compress(
+                signal_type,
+                datetime_range=datetime_range,
+                approximation_time=datetime.timedelta(minutes=10),
+            )
+
         yield 1
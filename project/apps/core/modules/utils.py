@@ -4,6 +4,7 @@ from libs.messengers.utils import escape_markdown
 from libs.task_queue import TaskPriorities
 
 from ...common import interface
+from .. import events
 from ..base import BaseModule, Command
 from ..constants import (
     BotCommands,
@@ -13,11 +14,22 @@ from ..constants import (
 __all__ = ('Utils',)
 
 
+def send_scheduled_command(name: str, args: list[str]) -> None:
+    # Module-level target, so the task can be stored in the persistent task queue.
+    events.scheduled_command.send(command=Command(name=name, args=args))
+
+
 @interface.module(
     title='Utils',
     description='The module provides additional utils.',
 )
 class Utils(BaseModule):
+    def subscribe_to_events(self) -> tuple:
+        return (
+            *super().subscribe_to_events(),
+            events.scheduled_command.connect(self._run_scheduled_command),
+        )
+
     @interface.command(
         BotCommands.TIMER,
         interface.Value('number', python_type=int),
@@ -35,13 +47,11 @@ class Utils(BaseModule):
         run_after = datetime.datetime.now() + delta
 
         self.task_queue.put(
-            lambda: (
-                self.messenger.send_message(
-                    f'Run scheduled command `{escape_markdown(str(command_for_run))}`',
-                    use_markdown=True,
-                ),
-                self._run_command(command_for_run.name, *command_for_run.args),
-            ),
+            send_scheduled_command,
+            kwargs={
+                'name': command_for_run.name,
+                'args': list(command_for_run.args),
+            },
             run_after=run_after,
             priority=TaskPriorities.LOW,
         )
@@ -50,3 +60,10 @@ class Utils(BaseModule):
             f'`{escape_markdown(str(command_for_run))}` is sent\\.\nIt will be run at `{run_after}`\\.',
             use_markdown=True,
         )
+
+    def _run_scheduled_command(self, *, command: Command) -> None:
+        self.messenger.send_message(
+            f'Run scheduled command `{escape_markdown(str(command))}`',
+            use_markdown=True,
+        )
+        self._run_command(command.name, *command.args)
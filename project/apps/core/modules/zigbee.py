@@ -78,17 +78,17 @@ class ZigBeeController(BaseModule):
 
             if device.is_available:
                 if not self._previous_availability_map.get(device.friendly_name, True):
-                    self.messenger.send_message(
+                    self.messenger.notify(
                         f'ZigBee device *{escape_markdown(device.friendly_name)}* is available now',
                         use_markdown=True,
                     )
             elif device.is_available is None:
-                self.messenger.send_message(
+                self.messenger.notify(
                     f'ZigBee device *{escape_markdown(device.friendly_name)}* has unknown availability',
                     use_markdown=True,
                 )
             elif device.friendly_name in SmartDeviceNames.ALL:
-                self.messenger.send_message(
+                self.messenger.notify(
                     f'ZigBee device *{escape_markdown(device.friendly_name)}* is not available',
                     use_markdown=True,
                 )
@@ -100,6 +100,17 @@ class BaseSimpleSignalHandler(SignalNotificationMixin, IntervalNotificationCheck
     signal_type: str
     compress_by_time: bool
     approximation_value: float = 0
+    # The last value is published in the state by this key, if it's set.
+    state_key: str | None = None
+
+    def get_initial_state(self) -> dict[str, typing.Any]:
+        if self.state_key is None:
+            return super().get_initial_state()
+
+        return {
+            **super().get_initial_state(),
+            self.state_key: None,
+        }
 
     def process(self) -> None:
         value = self.get_value()
@@ -108,6 +119,10 @@ class BaseSimpleSignalHandler(SignalNotificationMixin, IntervalNotificationCheck
             return
 
         Signal.add(signal_type=self.signal_type, value=value)
+
+        if self.state_key is not None:
+            self._state[self.state_key] = value
+
         self._check_notifications(value)
 
     @abc.abstractmethod
@@ -11,6 +11,7 @@ from .base import BaseSimpleSignalHandler, NotificationParams
 
 class CpuTempHandler(BaseSimpleSignalHandler):
     signal_type = constants.CPU_TEMPERATURE
+    state_key = constants.CPU_TEMPERATURE
     task_interval = datetime.timedelta(seconds=10)
     compress_by_time = True
     list_of_notification_params = (
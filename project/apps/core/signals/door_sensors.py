@@ -3,10 +3,12 @@ from functools import partial
 
 from libs.casual_utils.parallel_computing import synchronized_method
 from libs.casual_utils.time import get_current_time
+from libs.messengers.constants import MessagePriorities
 from libs.messengers.utils import escape_markdown
 from libs.zigbee.devices import ZigBeeDeviceWithOnlyState
 from project.config import SmartDeviceNames
 
+from ..constants import SECURITY_IS_ENABLED
 from .base import BaseSignalHandler
 from .mixins import ZigBeeDeviceBatteryCheckerMixin
 
@@ -47,12 +49,16 @@ class DoorSensorsHandler(ZigBeeDeviceBatteryCheckerMixin, BaseSignalHandler):
             if not is_initialization_status:
                 str_status = 'has been closed' if current_contact_status else 'has been opened'
 
-                self._messenger.send_message(
+                # Doors are an alarm only when security is enabled, otherwise they are merged with other notifications.
+                self._messenger.notify(
                     (
                         f'*Door "{escape_markdown(device_name)}" {str_status}*\n'
                         f'Timestamp: `{escape_markdown(now.strftime("%Y-%m-%d, %H:%M:%S"))}`'
                     ),
                     use_markdown=True,
+                    priority=(
+                        MessagePriorities.CRITICAL if self._state[SECURITY_IS_ENABLED] else MessagePriorities.NORMAL
+                    ),
                 )
 
         self._check_battery(state['battery'], device_name=device_name)
@@ -6,6 +6,7 @@ from functools import partial
 
 from libs.casual_utils.parallel_computing import synchronized_method
 from libs.casual_utils.time import get_current_time
+from libs.messengers.constants import MessagePriorities
 from libs.messengers.utils import escape_markdown
 from libs.zigbee.devices import ZigBeeDeviceWithOnlyState
 from project.config import SmartDeviceNames
@@ -82,4 +83,5 @@ class MotionSensorsHandler(ZigBeeDeviceBatteryCheckerMixin, BaseSignalHandler):
                 f'Timestamp: `{escape_markdown(received_at.strftime("%Y-%m-%d, %H:%M:%S"))}`'
             ),
             use_markdown=True,
+            priority=MessagePriorities.CRITICAL,
         )
@@ -3,6 +3,7 @@ import threading
 from functools import cached_property
 
 from libs.casual_utils.parallel_computing import synchronized_method
+from libs.messengers.constants import MessagePriorities
 from libs.task_queue import TaskPriorities
 from libs.zigbee.devices import ZigBeeDeviceWithOnlyState
 from project.config import SmartDeviceNames
@@ -50,7 +51,10 @@ class WaterLeakSensorsHandler(ZigBeeDeviceBatteryCheckerMixin, BaseSignalHandler
         water_leak = state.get('water_leak', False)
 
         if water_leak:
-            self._messenger.send_message(f'Detected water leak!\nSensor: {device_name}')
+            self._messenger.send_message(
+                f'Detected water leak!\nSensor: {device_name}',
+                priority=MessagePriorities.CRITICAL,
+            )
             self._state[LAST_CRITICAL_SITUATION_OCCURRED_AT] = datetime.datetime.now()
 
         Signal.add(signal_type=device_name, value=int(water_leak))
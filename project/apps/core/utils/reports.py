@@ -3,6 +3,7 @@ from functools import cached_property
 
 from emoji.core import emojize
 
+from libs.camera.fps_policy import FPSInfo
 from libs.casual_utils.time import get_current_time
 from libs.messengers.utils import escape_markdown
 
@@ -180,12 +181,18 @@ class ShortTextReport:
 
     @property
     def _fps_info(self) -> str:
-        current_fps = self.state[CURRENT_FPS]
+        fps_info: dict[str, FPSInfo] | None = self.state[CURRENT_FPS]
 
-        if current_fps is None:
+        if not fps_info:
             return self.NOTHING
 
-        return str(round(self.state[CURRENT_FPS], 2))
+        if len(fps_info) == 1:
+            info = next(iter(fps_info.values()))
+            return f'{round(info.current, 2)} / {round(info.target, 2)}'
+
+        return ', '.join(
+            f'{name} {round(info.current, 2)} / {round(info.target, 2)}' for name, info in fps_info.items()
+        )
 
     @property
     def _connected_devices_info(self) -> str:
@@ -0,0 +1,195 @@
+"""
+Benchmark of `VideoGuard.process_frames` on synthetic clips with labelled motion.
+
+Usage:
+    CONFIG_PATH=config/config.json python3 -m project.apps.guard.benchmarks --output video_guard.json
+
+Photos and clips are really encoded and read by a fake messenger, uploads to the file storage are skipped.
+"""
+
+import argparse
+import collections
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import typing
+
+import cv2
+
+from libs import task_queue as tq
+from libs.camera.artifacts import BaseMediaArtifact
+from libs.image_processing.benchmarks import (
+    DetectionQuality,
+    LabelledClip,
+    check_quality,
+    generate_synthetic_clips,
+    get_max_rss_mb,
+)
+from libs.image_processing.motion_detector import MotionDetector
+from libs.image_processing.profiling import StageTimer
+from libs.messengers.base import BaseMessenger
+
+from .video_guard import VideoGuard
+
+
+__all__ = ('run_video_guard_benchmark',)
+
+
+class _InlineTaskQueue(tq.BaseTaskQueue):
+    """
+    Runs tasks right away, uploads to the file storage are skipped.
+    """
+
+    def __len__(self) -> int:
+        return 0
+
+    def put_task(self, task: tq.Task) -> None:
+        on_done = task.get_option('on_done')
+
+        try:
+            if task.kwargs.get('artifact') is None:
+                task.target(*task.args, **task.kwargs)
+        finally:
+            if on_done is not None:
+                on_done()
+
+    def get(self) -> tq.Task | None:
+        return None
+
+
+class _FakeMessenger:
+    sent_media: collections.Counter[str]
+    sent_bytes: int
+
+    def __init__(self) -> None:
+        self.sent_media = collections.Counter()
+        self.sent_bytes = 0
+
+    def send_media(
+        self,
+        artifact: BaseMediaArtifact,
+        *,
+        caption: str | None = None,
+        priority: int | None = None,
+    ) -> None:
+        with artifact.open() as file:
+            self.sent_bytes += len(file.read())
+
+        self.sent_media[artifact.extension] += 1
+
+
+def run_video_guard_benchmark(
+    clips: dict[str, LabelledClip],
+    *,
+    fps: float = 10,
+    measure_memory: bool = True,
+) -> dict[str, typing.Any]:
+    results: dict[str, typing.Any] = {}
+
+    for clip_name, clip in clips.items():
+        stage_timer = StageTimer()
+        messenger = _FakeMessenger()
+        quality = DetectionQuality()
+        frames_count = len(clip.frames)
+
+        started_at = time.perf_counter()
+        started_cpu_at = time.process_time()
+        occupancy = _run_video_guard(clip, fps=fps, messenger=messenger, stage_timer=stage_timer)
+        elapsed = time.perf_counter() - started_at
+        cpu_time = time.process_time() - started_cpu_at
+
+        if clip.labels is not None:
+            for is_detected, is_expected in zip(occupancy, clip.labels, strict=True):
+                quality.add(is_detected=is_detected, is_expected=is_expected)
+
+        clip_results = results[clip_name] = {
+            'frames': frames_count,
+            'fps': round(frames_count / elapsed, 2),
+            'cpu_ms_per_frame': round(cpu_time / frames_count * 1_000, 3),
+            'detection_stages_ms_per_frame': stage_timer.get_ms_per_frame(frames_count),
+            'sent_media': dict(messenger.sent_media),
+            'sent_mb': round(messenger.sent_bytes / 2**20, 2),
+            'quality': None if clip.labels is None else quality.as_dict(),
+        }
+
+        if measure_memory:
+            tracemalloc.start()
+
+            try:
+                _run_video_guard(clip, fps=fps, messenger=_FakeMessenger())
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+            clip_results['peak_memory_mb'] = round(peak / 2**20, 2)
+
+    return results
+
+
+def _run_video_guard(
+    clip: LabelledClip,
+    *,
+    fps: float,
+    messenger: _FakeMessenger,
+    stage_timer: StageTimer | None = None,
+) -> list[bool]:
+    video_guard = VideoGuard(
+        messenger=typing.cast(BaseMessenger, messenger),
+        task_queue=_InlineTaskQueue(),
+    )
+
+    if isinstance(video_guard.motion_detector, MotionDetector):
+        video_guard.motion_detector.stage_timer = stage_timer
+
+    video_guard.start()
+    assert video_guard.process_frame is not None
+    occupancy = []
+
+    try:
+        for frame in clip.frames:
+            video_guard.process_frame.send((frame.copy(), fps, True))
+            occupancy.append(video_guard.is_occupied)
+    finally:
+        # The last clip is sent here, so it's measured too.
+        video_guard.stop()
+
+    return occupancy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark of VideoGuard.')
+    parser.add_argument('--fps', type=float, default=10, help='Frame rate that is reported by the camera.')
+    parser.add_argument('--min-precision', type=float, default=0)
+    parser.add_argument('--min-recall', type=float, default=0)
+    parser.add_argument('--output', help='Path to save JSON, stdout by default.')
+    args = parser.parse_args()
+
+    guard_results = run_video_guard_benchmark(generate_synthetic_clips(), fps=args.fps)
+    failures = check_quality(
+        {'video_guard': guard_results},
+        min_precision=args.min_precision,
+        min_recall=args.min_recall,
+    )
+    result = {
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'max_rss_mb': get_max_rss_mb(),
+        'video_guard': guard_results,
+        'failures': failures,
+    }
+    dumped_result = json.dumps(result, indent=4)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(dumped_result)
+    else:
+        sys.stdout.write(f'{dumped_result}\n')
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
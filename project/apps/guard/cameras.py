@@ -0,0 +1,175 @@
+import threading
+import typing
+
+import numpy as np
+
+from libs.camera.base import VideoCamera
+from libs.camera.buffers import AnnotatedFrameBuffer, create_frame_buffer
+from libs.camera.fps_policy import AdaptiveFPSPolicy
+from libs.camera.sources import BaseFrameSource, create_frame_source, frame_source_is_available
+from libs.image_processing.change_detection import FrameChangeDetector
+
+from ... import config
+from .settings import CameraSettings
+from .video_guard import VideoGuard
+
+
+__all__ = ('CameraDevice',)
+
+
+class CameraDevice:
+    """
+    One camera with its own frame source, motion detection, recording and frame rate.
+
+    Frames are handled under `lock` of the camera, so cameras don't wait for each other.
+    The processing thread of the camera can wait for the lock, so it's never joined under it.
+    """
+
+    settings: CameraSettings
+    fps_policy: AdaptiveFPSPolicy
+    photo_change_detector: FrameChangeDetector
+    is_available: bool = True
+    video_guard: VideoGuard | None = None
+    video_frames: AnnotatedFrameBuffer | None = None
+    lock: threading.RLock
+    _frame_source: BaseFrameSource | None = None
+    _video_camera: VideoCamera | None = None
+
+    def __init__(self, settings: CameraSettings) -> None:
+        self.settings = settings
+        self.fps_policy = AdaptiveFPSPolicy(
+            max_fps=settings.fps,
+            idle_fps=settings.idle_fps,
+            min_fps=min(1, settings.idle_fps),
+            max_cpu_temperature=config.FPS_BACKOFF_CPU_TEMPERATURE,
+            max_task_queue_delay=config.FPS_BACKOFF_TASK_QUEUE_DELAY,
+        )
+        self.photo_change_detector = FrameChangeDetector(
+            min_distance=config.PHOTO_UPLOAD_MIN_HASH_DISTANCE,
+            keep_alive_interval=config.PHOTO_UPLOAD_KEEP_ALIVE,
+        )
+        self.lock = threading.RLock()
+
+    @property
+    def name(self) -> str:
+        return self.settings.name
+
+    @property
+    def is_started(self) -> bool:
+        return self._video_camera is not None
+
+    @property
+    def is_run(self) -> bool:
+        video_camera = self._video_camera
+        return video_camera is not None and video_camera.is_run
+
+    @property
+    def processing_fps(self) -> float:
+        video_camera = self._video_camera
+        return 0 if video_camera is None else video_camera.processing_fps
+
+    def start(self, callback: typing.Callable) -> None:
+        with self.lock:
+            if self._video_camera is not None:
+                return
+
+            self._frame_source = create_frame_source(
+                self.settings.video_src,
+                resolution=self.settings.image_resolution,
+                fps=self.settings.fps,
+                realtime=self.settings.realtime_playback,
+                loop=self.settings.loop_playback,
+                snapshot_resolution=self.settings.snapshot_resolution,
+            )
+            self._frame_source.start()
+            self._video_camera = VideoCamera(
+                frame_source=self._frame_source,
+                callback=callback,
+                max_fps=self.fps_policy.target_fps,
+            )
+            self._video_camera.start()
+
+    def stop(self) -> None:
+        with self.lock:
+            video_camera, self._video_camera = self._video_camera, None
+            frame_source, self._frame_source = self._frame_source, None
+
+        if video_camera is not None:
+            video_camera.stop()
+
+        if frame_source is not None:
+            frame_source.stop()
+
+        self.photo_change_detector.reset()
+
+    def read(self) -> np.ndarray | None:
+        """
+        Return the latest frame, frames of the camera aren't taken from the processing.
+        """
+
+        frame_source = self._frame_source
+        return None if frame_source is None else frame_source.last_frame
+
+    def capture_snapshot(self) -> np.ndarray | None:
+        """
+        Return a frame with `snapshot_resolution` if the camera supports it or the latest frame.
+        """
+
+        frame_source = self._frame_source
+        return None if frame_source is None else frame_source.capture_snapshot()
+
+    def update_status(self) -> None:
+        if self._frame_source is None:
+            self.is_available = frame_source_is_available(self.settings.video_src)
+
+    def set_max_fps(self, max_fps: float) -> None:
+        video_camera = self._video_camera
+
+        if video_camera is not None:
+            video_camera.max_fps = max_fps
+
+    def speed_up(self) -> None:
+        self.fps_policy.on_motion()
+        self.set_max_fps(self.fps_policy.target_fps)
+
+    def start_guard(self, **kwargs) -> None:
+        with self.lock:
+            if self.video_guard is not None:
+                return
+
+            self.video_guard = VideoGuard(settings=self.settings, capture_snapshot=self.capture_snapshot, **kwargs)
+            self.video_guard.start()
+
+    def stop_guard(self) -> None:
+        with self.lock:
+            video_guard, self.video_guard = self.video_guard, None
+
+            if video_guard is not None:
+                video_guard.stop()
+
+    def start_recording(self) -> None:
+        with self.lock:
+            self.video_frames = AnnotatedFrameBuffer(
+                create_frame_buffer(
+                    max_bytes=self.settings.get_frame_history_size(config.VIDEO_RECORDING_MAX_DURATION),
+                    jpeg_quality=config.VIDEO_RECORDING_JPEG_QUALITY,
+                ),
+            )
+
+    def stop_recording(self) -> tuple[typing.Sequence[np.ndarray], bool]:
+        """
+        Returns recorded frames and whether the oldest frames were dropped because the buffer was full.
+        """
+
+        with self.lock:
+            video_frames, self.video_frames = self.video_frames, None
+
+        if video_frames is None:
+            return (), False
+
+        # Nothing is appended to the buffer anymore, so views of its frames stay valid.
+        frames = video_frames.get_range(video_frames.first_index)
+        is_truncated = video_frames.first_index > 0
+        video_frames.close()
+
+        return frames, is_truncated
@@ -0,0 +1,71 @@
+import dataclasses
+import datetime
+import typing
+
+from ... import config
+
+
+__all__ = (
+    'CameraSettings',
+    'get_cameras_settings',
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class CameraSettings:
+    name: str
+    video_src: int | str
+    image_resolution: tuple[int, int]
+    fps: int
+    idle_fps: float
+    motion_detection_width: int | None = None
+    motion_detection_regions_of_interest: tuple = ()
+    motion_detection_masks: tuple = ()
+    motion_engine: str = 'target_frame'
+    snapshot_resolution: tuple[int, int] | None = None
+    realtime_playback: bool = True
+    loop_playback: bool = True
+
+    @classmethod
+    def from_config(cls, raw_settings: dict[str, typing.Any]) -> 'CameraSettings':
+        return cls(
+            name=raw_settings['name'],
+            video_src=raw_settings['video_src'],
+            image_resolution=tuple(raw_settings['image_resolution']),
+            fps=raw_settings['fps'],
+            idle_fps=raw_settings['idle_fps'],
+            motion_detection_width=raw_settings['motion_detection_width'],
+            motion_detection_regions_of_interest=tuple(raw_settings['motion_detection_regions_of_interest']),
+            motion_detection_masks=tuple(raw_settings['motion_detection_masks']),
+            motion_engine=raw_settings['motion_engine'],
+            snapshot_resolution=(
+                None if raw_settings['snapshot_resolution'] is None else tuple(raw_settings['snapshot_resolution'])
+            ),
+            realtime_playback=raw_settings['realtime_playback'],
+            loop_playback=raw_settings['loop_playback'],
+        )
+
+    def get_frame_history_size(self, duration: datetime.timedelta) -> int:
+        """
+        Bytes of raw frames for `duration`, it's limited by a half of the share of the camera in the memory budget,
+        the other half is for the other history (VideoGuard or recording).
+        """
+
+        width, height = self.image_resolution
+        size = round(width * height * 3 * self.fps * duration.total_seconds())
+
+        return min(size, config.FRAME_HISTORY_MEMORY_BUDGET // (len(config.CAMERAS) * 2))
+
+    def add_name(self, text: str, *, separator: str = ': ') -> str:
+        """
+        Names are shown only if there are several cameras.
+        """
+
+        if len(config.CAMERAS) == 1:
+            return text
+
+        return f'{self.name}{separator}{text}'
+
+
+def get_cameras_settings() -> tuple[CameraSettings, ...]:
+    return tuple(CameraSettings.from_config(raw_settings) for raw_settings in config.CAMERAS)
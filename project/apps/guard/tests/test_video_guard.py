@@ -1,8 +1,16 @@
+import dataclasses
+import datetime
 from unittest.mock import Mock
 
 import cv2
+import numpy as np
+
+from libs.camera.clips import write_clip
+from libs.image_processing.benchmarks import generate_labelled_clip
 
 from .... import config
+from ..benchmarks import run_video_guard_benchmark
+from ..settings import get_cameras_settings
 from ..video_guard import VideoGuard
 
 
@@ -19,5 +27,112 @@ def test_video_guard():
         (
             cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_1.png')),
             1,
+            True,
         ),
     )
+
+
+def test_video_guard_with_skipped_detection():
+    frame_1 = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_1.png'))
+    frame_2 = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_2.png'))
+    path = write_clip([frame_1] * 4 + [frame_2] * 4, fps=10)
+    assert path is not None
+    motion_detected_callback = Mock()
+
+    task_queue = Mock()
+
+    video_guard = VideoGuard(
+        messenger=Mock(),
+        task_queue=task_queue,
+        motion_detected_callback=motion_detected_callback,
+    )
+    video_guard.start()
+    video_capture = cv2.VideoCapture(path)
+
+    try:
+        frames_count = 0
+
+        while True:
+            is_success, frame = video_capture.read()
+
+            if not is_success:
+                break
+
+            # Only every other frame is checked, as if other cameras took the budget.
+            video_guard.process_frame.send((frame, 10, frames_count % 2 == 0))
+            frames_count += 1
+    finally:
+        video_capture.release()
+        video_guard.stop()
+
+    assert frames_count == 8
+    assert video_guard.is_occupied
+    motion_detected_callback.assert_called_once()
+
+    artifacts = [call.kwargs['args'][0] for call in task_queue.put.call_args_list if 'args' in call.kwargs]
+    assert [artifact.extension for artifact in artifacts] == ['.jpg', '.avi']
+
+    for artifact in artifacts:
+        # Nothing is sent, so both sinks are released here.
+        artifact.release()
+        artifact.release()
+
+
+def test_video_guard_benchmark():
+    clips = {'synthetic': generate_labelled_clip(frames_count=60, width=320, height=240)}
+
+    results = run_video_guard_benchmark(clips, measure_memory=False)
+
+    assert results['synthetic']['quality']['recall'] == 1
+    assert results['synthetic']['sent_media'] == {'.jpg': 1, '.avi': 1}
+
+
+def test_video_guard_sends_snapshot_on_motion():
+    frame_1 = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_1.png'))
+    frame_2 = cv2.imread(str(config.APPS_DIR / 'guard/tests/resources/frame_2.png'))
+    snapshot = cv2.resize(frame_2, (frame_2.shape[1] * 2, frame_2.shape[0] * 2))
+    task_queue = Mock()
+
+    video_guard = VideoGuard(
+        messenger=Mock(),
+        task_queue=task_queue,
+        capture_snapshot=lambda: snapshot,
+    )
+    video_guard.start()
+    video_guard.process_frame.send((frame_1, 10, True))
+    video_guard.process_frame.send((frame_2, 10, True))
+
+    video_guard.stop()
+
+    # The frame is sent by the processing, the snapshot is captured by the task queue after it.
+    send_snapshot, snapshot_kwargs = next(
+        (call.args[0], call.kwargs['kwargs'])
+        for call in task_queue.put.call_args_list
+        if 'frame_shape' in call.kwargs.get('kwargs', {})
+    )
+    send_snapshot(**snapshot_kwargs)
+
+    calls = task_queue.put.call_args_list
+    image, *other_artifacts = [call.kwargs['args'][0] for call in calls if 'args' in call.kwargs]
+
+    with image.open() as file:
+        assert cv2.imdecode(np.frombuffer(file.read(), dtype=np.uint8), cv2.IMREAD_COLOR).shape == frame_2.shape
+
+    high_resolution_image = other_artifacts.pop()
+
+    with high_resolution_image.open() as file:
+        sent_frame = cv2.imdecode(np.frombuffer(file.read(), dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    assert sent_frame.shape == snapshot.shape
+
+    for artifact in (image, high_resolution_image, *other_artifacts):
+        artifact.release()
+        artifact.release()
+
+
+def test_frame_history_size():
+    settings = dataclasses.replace(get_cameras_settings()[0], image_resolution=(640, 480), fps=10)
+    max_size = config.FRAME_HISTORY_MEMORY_BUDGET // (len(config.CAMERAS) * 2)
+
+    assert settings.get_frame_history_size(datetime.timedelta(seconds=1)) == 640 * 480 * 3 * 10
+    assert settings.get_frame_history_size(datetime.timedelta(hours=1)) == max_size
@@ -1,22 +1,43 @@
+import collections
 import datetime
 import typing
 
 import numpy as np
 
 from libs import task_queue as tq
+from libs.camera.artifacts import BaseMediaArtifact, EncodedClip, EncodedImage
+from libs.camera.buffers import AnnotatedFrameBuffer, create_frame_buffer
+from libs.camera.clips import ClipWriter
+from libs.image_processing.annotations import FrameAnnotation
 from libs.image_processing.motion_detector import MotionDetector
+from libs.image_processing.motion_engines import create_motion_engine
+from libs.image_processing.process_motion_detector import ProcessMotionDetector
 from libs.messengers.base import BaseMessenger
+from libs.messengers.constants import MessagePriorities
 
 from ... import config
 from ..common.storage import file_storage
+from .settings import CameraSettings, get_cameras_settings
 
 
 class VideoGuard:
-    motion_detector: MotionDetector
+    """
+    Detects motion in frames of one camera and sends photos and clips of it.
+
+    Frames are sent to `process_frame` as `(frame, fps, need_to_detect)`,
+    frames without detection are only recorded, so clips keep the full frame rate.
+    """
+
+    settings: CameraSettings
+    motion_detector: MotionDetector | ProcessMotionDetector
     messenger: BaseMessenger
     task_queue: tq.BaseTaskQueue
     motion_detected_callback: typing.Callable | None = None
+    capture_snapshot: typing.Callable[[], np.ndarray | None] | None = None
     process_frame: typing.Generator | None = None
+    is_occupied: bool = False
+    max_clip_duration: datetime.timedelta = datetime.timedelta(minutes=2)
+    _pending_frames: collections.deque[np.ndarray]
 
     def __init__(
         self,
@@ -24,11 +45,26 @@ class VideoGuard:
         messenger: BaseMessenger,
         task_queue: tq.BaseTaskQueue,
         motion_detected_callback: typing.Callable | None = None,
+        capture_snapshot: typing.Callable[[], np.ndarray | None] | None = None,
+        settings: CameraSettings | None = None,
     ) -> None:
-        self.motion_detector = MotionDetector(show_frames=config.IMSHOW, max_fps=config.FPS)
+        self.settings = get_cameras_settings()[0] if settings is None else settings
+
+        motion_detector_class = ProcessMotionDetector if config.MOTION_DETECTION_IN_PROCESS else MotionDetector
+        self.motion_detector = motion_detector_class(
+            show_frames=config.IMSHOW,
+            max_fps=self.settings.fps,
+            processing_width=self.settings.motion_detection_width,
+            regions_of_interest=self.settings.motion_detection_regions_of_interest,
+            masks=self.settings.motion_detection_masks,
+            engine=create_motion_engine(self.settings.motion_engine),
+            lazy_annotation=True,
+        )
         self.messenger = messenger
         self.task_queue = task_queue
         self.motion_detected_callback = motion_detected_callback
+        self.capture_snapshot = capture_snapshot
+        self._pending_frames = collections.deque()
 
     def start(self) -> None:
         self.process_frame = self.process_frames()
@@ -41,120 +77,223 @@ class VideoGuard:
         self.motion_detector.realese()
 
     def process_frames(self) -> typing.Generator[None, tuple, None]:
-        last_is_occupied = False
-        frames: list[np.ndarray] = []
-        send_video = False
-        min_frames_for_send_video = None
+        # Raw frames, annotations are rendered only for frames that are sent.
+        frames = AnnotatedFrameBuffer(
+            create_frame_buffer(
+                max_bytes=self.settings.get_frame_history_size(config.VIDEO_GUARD_HISTORY),
+                jpeg_quality=config.FRAME_HISTORY_JPEG_QUALITY,
+            ),
+        )
+        # The clip is encoded while motion goes on, so it's ready when motion ends.
+        clip_writer: ClipWriter | None = None
+        clip_end_index: int | None = None
+        last_saved_index = 0
         last_sent_photo = None
 
-        while True:
-            try:
-                frame, fps = yield
-            except GeneratorExit:
-                break
+        try:
+            while True:
+                try:
+                    frame, fps, need_to_detect = yield
+                except GeneratorExit:
+                    break
+
+                # Clips are written with the real frame rate of the camera.
+                clip_fps = max(1, round(fps)) if fps else self.settings.fps
+
+                for raw_frame, annotation in self._detect_motion(frame, fps=fps, need_to_detect=need_to_detect):
+                    now = datetime.datetime.now()
+
+                    if annotation is not None and annotation.is_occupied:
+                        if not self.is_occupied:
+                            self.is_occupied = True
+                            last_sent_photo = now
+                            clip_end_index = None
+                            self._send_image(
+                                frame=raw_frame,
+                                annotation=annotation,
+                                caption=self.settings.add_name(
+                                    f'Motion detected at {now.strftime("%Y-%m-%d, %H:%M:%S")}',
+                                ),
+                                use_snapshot=True,
+                                priority=MessagePriorities.CRITICAL,
+                            )
+
+                            if clip_writer is None:
+                                clip_writer = ClipWriter(fps=clip_fps)
+                                pre_motion_start_index = max(frames.total_count - clip_fps * 20, last_saved_index)
+
+                                # The writer reads frames on its thread while new ones are appended, so they are copied.
+                                clip_writer.write_many(frames.get_range(pre_motion_start_index, copy=True))
+
+                            if self.motion_detected_callback:
+                                self.motion_detected_callback()
+
+                        assert last_sent_photo is not None
+
+                        if now - last_sent_photo > datetime.timedelta(seconds=5):
+                            self._send_image(
+                                frame=raw_frame,
+                                annotation=annotation,
+                                caption=self.settings.add_name(
+                                    f'Long motion detected at {now.strftime("%Y-%m-%d, %H:%M:%S")}',
+                                ),
+                                priority=MessagePriorities.NORMAL,
+                            )
+                            last_sent_photo = now
+
+                    if annotation is not None and not annotation.is_occupied and self.is_occupied:
+                        self.is_occupied = False
+                        clip_end_index = frames.total_count + clip_fps * 5
 
+                    frames.append(raw_frame, annotation)
+
+                    if clip_writer is None:
+                        continue
+
+                    clip_writer.write(raw_frame, annotation)
+
+                    if clip_writer.frames_count >= clip_writer.fps * self.max_clip_duration.total_seconds():
+                        # Long motion is sent by parts.
+                        clip_end_index = frames.total_count
+
+                    if clip_end_index is not None and frames.total_count >= clip_end_index:
+                        self._send_clip(clip_writer)
+                        last_saved_index = frames.total_count
+                        clip_writer = ClipWriter(fps=clip_fps) if self.is_occupied else None
+                        clip_end_index = None
+        finally:
+            if clip_writer is not None and clip_writer.frames_count:
+                self._send_clip(clip_writer)
+
+            frames.close()
+            self._pending_frames.clear()
+
+    def _detect_motion(
+        self,
+        frame: np.ndarray,
+        *,
+        fps: float,
+        need_to_detect: bool,
+    ) -> typing.Iterator[tuple[np.ndarray, FrameAnnotation | None]]:
+        """
+        Return frames in the order they came, when they are ready.
+
+        A detector in a separate process returns the result of the previous frame,
+        so frames that come after a frame in detection wait for it.
+        """
+
+        self._pending_frames.append(frame)
+
+        if need_to_detect:
             self.motion_detector.process_new_frame(frame, fps=fps)
 
-            if self.motion_detector.marked_frame is None:
-                if frames:
-                    frames = []
-
-                continue
-
-            now = datetime.datetime.now()
-
-            if self.motion_detector.is_occupied:
-                if not last_is_occupied:
-                    last_is_occupied = True
-                    last_sent_photo = now
-                    frames = frames[-config.FPS * 20 :]
-                    self._send_image_to_messenger(
-                        frame=self.motion_detector.marked_frame,
-                        caption=f'Motion detected at {now.strftime("%Y-%m-%d, %H:%M:%S")}',
-                    )
-                    self._save_image(frame=self.motion_detector.marked_frame)
-                    self._save_video(frames=frames)
-                    self._send_video_to_messenger(
-                        frames=frames,
-                        caption=f'Motion detected at {now.strftime("%Y-%m-%d, %H:%M:%S")}',
-                    )
-
-                    if self.motion_detected_callback:
-                        self.motion_detected_callback()
-
-                assert last_sent_photo is not None
-
-                if now - last_sent_photo > datetime.timedelta(seconds=5):
-                    self._save_image(frame=self.motion_detector.marked_frame)
-                    self._send_image_to_messenger(
-                        frame=self.motion_detector.marked_frame,
-                        caption=f'Long motion detected at {now.strftime("%Y-%m-%d, %H:%M:%S")}',
-                    )
-                    last_sent_photo = now
-
-            if not self.motion_detector.is_occupied and last_is_occupied:
-                last_is_occupied = False
-                send_video = True
-                min_frames_for_send_video = len(frames) + config.FPS * 5
-
-            frames.append(self.motion_detector.marked_frame)
-
-            if len(frames) > config.FPS * 60 * 10:
-                if self.motion_detector.is_occupied:
-                    send_video = True
-                    min_frames_for_send_video = 0
-                else:
-                    frames = frames[-self.motion_detector.is_occupied * 60 * 5 :]
-
-            if send_video:
-                assert min_frames_for_send_video is not None
-
-                if len(frames) >= min_frames_for_send_video:
-                    send_video = False
-                    min_frames_for_send_video = None
-                    self._save_video(frames)
-                    frames = []
-
-    def _send_image_to_messenger(self, frame: np.ndarray, caption: str) -> None:
-        self.task_queue.put(
-            self.messenger.send_frame,
-            args=(frame,),
-            kwargs={'caption': caption},
-            priority=tq.TaskPriorities.HIGH,
-        )
+        while self._pending_frames and self._pending_frames[0] is not self.motion_detector.frame_in_detection:
+            pending_frame = self._pending_frames.popleft()
+            # Frames without detection and frames that weren't compared by the detector go without annotations.
+            yield (
+                pending_frame,
+                self.motion_detector.annotation if pending_frame is self.motion_detector.frame else None,
+            )
 
-    def _send_video_to_messenger(self, frames: list[np.ndarray], caption: str) -> None:
-        self.task_queue.put(
-            self.messenger.send_frames_as_video,
-            args=(frames,),
-            kwargs={
-                'fps': config.FPS,
-                'caption': caption,
-            },
-            priority=tq.TaskPriorities.HIGH,
+    def _send_image(
+        self,
+        *,
+        frame: np.ndarray,
+        annotation: FrameAnnotation,
+        caption: str,
+        use_snapshot: bool = False,
+        priority: int | None = None,
+    ) -> None:
+        """
+        With `use_snapshot` the photo is also captured in the high resolution if the camera supports it.
+        The frame is sent right away and the snapshot after it, capturing takes a few frames, so it's done
+        by the task queue instead of the thread that processes frames.
+        """
+
+        image = EncodedImage(frame, annotation=annotation, sinks_count=2)
+        self._send_media(image, caption=caption, priority=priority, file_name=self._get_image_file_name(image))
+
+        if use_snapshot and self.capture_snapshot is not None:
+            self.task_queue.put(
+                self._send_snapshot,
+                kwargs={
+                    'frame_shape': frame.shape,
+                    'annotation': annotation,
+                    'caption': caption,
+                    'priority': priority,
+                },
+                priority=tq.TaskPriorities.HIGH,
+            )
+
+    def _send_snapshot(
+        self,
+        *,
+        frame_shape: tuple[int, ...],
+        annotation: FrameAnnotation,
+        caption: str,
+        priority: int | None = None,
+    ) -> None:
+        assert self.capture_snapshot is not None
+
+        snapshot = self.capture_snapshot()
+
+        # The camera doesn't support the high resolution, the frame is already sent.
+        if snapshot is None or snapshot.shape == frame_shape:
+            return
+
+        height, width = frame_shape[:2]
+        annotation = annotation.scale(snapshot.shape[1] / width, snapshot.shape[0] / height)
+        image = EncodedImage(snapshot, annotation=annotation, sinks_count=2)
+        self._send_media(
+            image,
+            caption=caption,
+            priority=priority,
+            # The frame of the same second is already saved.
+            file_name=self._get_image_file_name(image, suffix=' snapshot'),
         )
 
-    def _save_image(self, frame: np.ndarray) -> None:
+    def _get_image_file_name(self, image: EncodedImage, *, suffix: str = '') -> str:
         now = datetime.datetime.now()
 
-        self.task_queue.put(
-            file_storage.upload_frame,
-            kwargs={
-                'file_name': f'marked_images/{now.strftime("%Y-%m-%d %H:%M:%S.png")}',
-                'frame': frame,
-            },
-            priority=tq.TaskPriorities.MEDIUM,
+        return (
+            f'marked_images/{self.settings.add_name(now.strftime("%Y-%m-%d %H:%M:%S"), separator=" ")}'
+            f'{suffix}{image.extension}'
         )
 
-    def _save_video(self, frames: list[np.ndarray]) -> None:
+    def _send_clip(self, clip_writer: ClipWriter) -> None:
         now = datetime.datetime.now()
+        clip = EncodedClip(clip_writer, sinks_count=2)
+
+        self._send_media(
+            clip,
+            caption=self.settings.add_name(f'Motion recorded at {now.strftime("%Y-%m-%d, %H:%M:%S")}'),
+            file_name=(
+                f'videos/{self.settings.add_name(now.strftime("%Y-%m-%d %H:%M:%S"), separator=" ")}{clip.extension}'
+            ),
+        )
 
+    def _send_media(
+        self,
+        artifact: BaseMediaArtifact,
+        *,
+        caption: str,
+        file_name: str,
+        priority: int | None = None,
+    ) -> None:
+        # Both tasks share one encoded artifact, it's released after the last run of the last one.
+        self.task_queue.put(
+            self.messenger.send_media,
+            args=(artifact,),
+            kwargs={'caption': caption, 'priority': priority},
+            priority=tq.TaskPriorities.HIGH,
+            options={'on_done': artifact.release},
+        )
         self.task_queue.put(
-            file_storage.upload_frames_as_video,
+            file_storage.upload_media,
             kwargs={
-                'file_name': f'videos/{now.strftime("%Y-%m-%d %H:%M:%S.avi")}',
-                'frames': frames,
-                'fps': config.FPS,
+                'file_name': file_name,
+                'artifact': artifact,
             },
             priority=tq.TaskPriorities.MEDIUM,
+            options={'on_done': artifact.release},
         )
@@ -31,6 +31,15 @@ DEBUG = json_config['debug']
 TELEGRAM_CHAT_ID = json_config['telegram_chat_id']
 TELEGRAM_TOKEN = json_config['telegram_token']
 TELEGRAM_USERNAME = json_config['telegram_username']
+# Messages are sent by a queue, so a big upload doesn't hold up other messages.
+TELEGRAM_MAX_CONCURRENT_REQUESTS = json_config.get('telegram_max_concurrent_requests', 4)
+# Progress bars and the status message are edited not more often than once per this interval.
+TELEGRAM_MIN_EDIT_INTERVAL = datetime.timedelta(seconds=json_config.get('telegram_min_edit_interval', 1))
+# Notifications that come within this window after a sent one are merged into one message, alerts aren't delayed.
+TELEGRAM_DIGEST_WINDOW = datetime.timedelta(seconds=json_config.get('telegram_digest_window', 10))
+# Idle connections to the Bot API are kept open for this time, so messages don't wait for a new TLS handshake.
+TELEGRAM_KEEP_ALIVE = datetime.timedelta(seconds=json_config.get('telegram_keep_alive', 60))
+TELEGRAM_API_URL = json_config.get('telegram_api_url', 'https://api.telegram.org/bot')
 TELEHOOKS_QUEUE_NAME = json_config['telehooks_queue_name']
 TELEHOOKS_HOST = json_config['telehooks_host']
 
@@ -41,7 +50,58 @@ OPENWEATHERMAP_URL = json_config['openweathermap_url']
 VIDEO_SRC = json_config['video_src']
 IMSHOW = json_config['imshow']
 IMAGE_RESOLUTION = json_config['image_resolution']
+# Photos on motion and by request are captured with this resolution, the stream keeps `IMAGE_RESOLUTION`.
+SNAPSHOT_RESOLUTION = json_config.get('snapshot_resolution')
 FPS = json_config['fps']
+# The camera works with this frame rate when nothing is moving.
+IDLE_FPS = json_config.get('idle_fps', FPS)
+FPS_BACKOFF_CPU_TEMPERATURE = json_config.get('fps_backoff_cpu_temperature', 75)
+FPS_BACKOFF_TASK_QUEUE_DELAY = datetime.timedelta(seconds=json_config.get('fps_backoff_task_queue_delay', 5))
+MOTION_DETECTION_WIDTH = json_config.get('motion_detection_width')
+MOTION_DETECTION_REGIONS_OF_INTEREST = json_config.get('motion_detection_regions_of_interest', [])
+MOTION_DETECTION_MASKS = json_config.get('motion_detection_masks', [])
+MOTION_ENGINE = json_config.get('motion_engine', 'target_frame')
+MOTION_DETECTION_IN_PROCESS = json_config.get('motion_detection_in_process', False)
+# Frame history of a camera is sized by the frame size, the frame rate and these durations.
+# Clips of VideoGuard take up to 20 seconds before motion from the history.
+VIDEO_GUARD_HISTORY = datetime.timedelta(seconds=json_config.get('video_guard_history', 20))
+VIDEO_RECORDING_MAX_DURATION = datetime.timedelta(seconds=json_config.get('video_recording_max_duration', 300))
+# Frame history of all cameras is limited by this budget, every camera gets an equal share for VideoGuard and recording.
+FRAME_HISTORY_MEMORY_BUDGET = json_config.get('frame_history_memory_budget_mb', 512) * 1024 * 1024
+# Frame history is kept as raw frames if it's not set.
+FRAME_HISTORY_JPEG_QUALITY = json_config.get('frame_history_jpeg_quality')
+# Recorded videos are always kept as JPEG frames, raw frames of a long recording don't fit the budget.
+VIDEO_RECORDING_JPEG_QUALITY = json_config.get('video_recording_jpeg_quality', 80)
+# Every camera can override the settings above, the first one is the main camera.
+# `video_src` is a camera index, a stream URL, a video file, a directory with images or `synthetic`.
+# Files and generated frames are played in real time and in a loop by default.
+CAMERAS = tuple(
+    {
+        'name': 'main' if i == 0 else f'camera_{i + 1}',
+        'video_src': VIDEO_SRC,
+        'image_resolution': IMAGE_RESOLUTION,
+        'snapshot_resolution': SNAPSHOT_RESOLUTION,
+        'fps': FPS,
+        'idle_fps': IDLE_FPS,
+        'motion_detection_width': MOTION_DETECTION_WIDTH,
+        'motion_detection_regions_of_interest': MOTION_DETECTION_REGIONS_OF_INTEREST,
+        'motion_detection_masks': MOTION_DETECTION_MASKS,
+        'motion_engine': MOTION_ENGINE,
+        'realtime_playback': True,
+        'loop_playback': True,
+        **camera,
+    }
+    for i, camera in enumerate(json_config.get('cameras', [{}]))
+)
+# Seconds of motion detection per second for all cameras, it isn't limited if it's not set.
+MOTION_DETECTION_CPU_BUDGET = json_config.get('motion_detection_cpu_budget')
+# Periodic photos are uploaded only if the perceptual hash differs from the last uploaded one by this number of bits
+# (of 256) or if the keep-alive interval is passed, keep-alive uploads are disabled if it's `null`.
+PHOTO_UPLOAD_MIN_HASH_DISTANCE = json_config.get('photo_upload_min_hash_distance', 6)
+_photo_upload_keep_alive_minutes = json_config.get('photo_upload_keep_alive_minutes', 60)
+PHOTO_UPLOAD_KEEP_ALIVE = (
+    datetime.timedelta(minutes=_photo_upload_keep_alive_minutes) if _photo_upload_keep_alive_minutes else None
+)
 
 # Arduino
 ARDUINO_TTY = json_config['arduino_tty']
@@ -51,6 +111,7 @@ DATABASE_URL = json_config['database_url']
 DATABASE_DEBUG = DEBUG
 _raw_storage_time = json_config['storage_time'].split(' ')
 STORAGE_TIME = datetime.timedelta(**{_raw_storage_time[1]: int(_raw_storage_time[0])})
+TASK_QUEUE_DB_PATH = ROOT_DIR / json_config.get('task_queue_db_path', 'config/task_queue.sqlite3')
 
 # Time
 TZ = json_config['tz']